@@ -0,0 +1,121 @@
+"""initial schema
+
+Tables as first shipped, before the user contact fields were added.
+Databases created earlier with create_all or setup_db should be stamped
+instead of upgraded (see README).
+
+Revision ID: 0001
+Revises:
+Create Date: 2025-09-25 21:53:30
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = "0001"
+down_revision: Union[str, None] = None
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+user_role = sa.Enum("PATIENT", "DOCTOR", name="UserRole")
+appointment_status = sa.Enum("SCHEDULED", "COMPLETED", "CANCELED", "PENDING", name="AppointmentStatus")
+
+
+def upgrade() -> None:
+    op.create_table(
+        "User",
+        sa.Column("id", sa.String(), nullable=False),
+        sa.Column("name", sa.String(), nullable=True),
+        sa.Column("email", sa.String(), nullable=False),
+        sa.Column("emailVerified", sa.DateTime(), nullable=True),
+        sa.Column("image", sa.String(), nullable=True),
+        sa.Column("password", sa.String(), nullable=True),
+        sa.Column("role", user_role, nullable=False),
+        sa.Column("createdAt", sa.DateTime(), nullable=False),
+        sa.Column("updatedAt", sa.DateTime(), nullable=False),
+        sa.PrimaryKeyConstraint("id"),
+    )
+    op.create_index(op.f("ix_User_email"), "User", ["email"], unique=True)
+    op.create_index(op.f("ix_User_id"), "User", ["id"], unique=False)
+    
+    op.create_table(
+        "DoctorProfile",
+        sa.Column("id", sa.String(), nullable=False),
+        sa.Column("userId", sa.String(), nullable=False),
+        sa.Column("specialty", sa.String(), nullable=True),
+        sa.Column("credentials", sa.String(), nullable=True),
+        sa.Column("officeAddress", sa.String(), nullable=True),
+        sa.ForeignKeyConstraint(["userId"], ["User.id"]),
+        sa.PrimaryKeyConstraint("id"),
+        sa.UniqueConstraint("userId"),
+    )
+    op.create_index(op.f("ix_DoctorProfile_id"), "DoctorProfile", ["id"], unique=False)
+    
+    op.create_table(
+        "PatientProfile",
+        sa.Column("id", sa.String(), nullable=False),
+        sa.Column("userId", sa.String(), nullable=False),
+        sa.Column("dateOfBirth", sa.DateTime(), nullable=True),
+        sa.Column("address", sa.String(), nullable=True),
+        sa.Column("emergencyContactName", sa.String(), nullable=True),
+        sa.Column("emergencyContactPhone", sa.String(), nullable=True),
+        sa.ForeignKeyConstraint(["userId"], ["User.id"]),
+        sa.PrimaryKeyConstraint("id"),
+        sa.UniqueConstraint("userId"),
+    )
+    op.create_index(op.f("ix_PatientProfile_id"), "PatientProfile", ["id"], unique=False)
+    
+    op.create_table(
+        "Appointment",
+        sa.Column("id", sa.String(), nullable=False),
+        sa.Column("appointmentDate", sa.DateTime(), nullable=False),
+        sa.Column("duration", sa.Integer(), nullable=False),
+        sa.Column("reasonForVisit", sa.String(), nullable=False),
+        sa.Column("notes", sa.String(), nullable=True),
+        sa.Column("status", appointment_status, nullable=False),
+        sa.Column("createdAt", sa.DateTime(), nullable=False),
+        sa.Column("patientId", sa.String(), nullable=False),
+        sa.Column("doctorId", sa.String(), nullable=False),
+        sa.ForeignKeyConstraint(["doctorId"], ["DoctorProfile.id"]),
+        sa.ForeignKeyConstraint(["patientId"], ["PatientProfile.id"]),
+        sa.PrimaryKeyConstraint("id"),
+    )
+    op.create_index(op.f("ix_Appointment_id"), "Appointment", ["id"], unique=False)
+    
+    op.create_table(
+        "Prescription",
+        sa.Column("id", sa.String(), nullable=False),
+        sa.Column("medication", sa.String(), nullable=False),
+        sa.Column("dosage", sa.String(), nullable=False),
+        sa.Column("frequency", sa.String(), nullable=False),
+        sa.Column("startDate", sa.DateTime(), nullable=False),
+        sa.Column("endDate", sa.DateTime(), nullable=True),
+        sa.Column("refillsAvailable", sa.Integer(), nullable=False),
+        sa.Column("createdAt", sa.DateTime(), nullable=False),
+        sa.Column("patientId", sa.String(), nullable=False),
+        sa.Column("doctorId", sa.String(), nullable=False),
+        sa.ForeignKeyConstraint(["doctorId"], ["DoctorProfile.id"]),
+        sa.ForeignKeyConstraint(["patientId"], ["PatientProfile.id"]),
+        sa.PrimaryKeyConstraint("id"),
+    )
+    op.create_index(op.f("ix_Prescription_id"), "Prescription", ["id"], unique=False)
+
+
+def downgrade() -> None:
+    op.drop_index(op.f("ix_Prescription_id"), table_name="Prescription")
+    op.drop_table("Prescription")
+    op.drop_index(op.f("ix_Appointment_id"), table_name="Appointment")
+    op.drop_table("Appointment")
+    op.drop_index(op.f("ix_PatientProfile_id"), table_name="PatientProfile")
+    op.drop_table("PatientProfile")
+    op.drop_index(op.f("ix_DoctorProfile_id"), table_name="DoctorProfile")
+    op.drop_table("DoctorProfile")
+    op.drop_index(op.f("ix_User_id"), table_name="User")
+    op.drop_index(op.f("ix_User_email"), table_name="User")
+    op.drop_table("User")
+    appointment_status.drop(op.get_bind(), checkfirst=True)
+    user_role.drop(op.get_bind(), checkfirst=True)
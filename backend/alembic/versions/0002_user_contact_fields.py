@@ -0,0 +1,35 @@
+"""user contact fields
+
+Adds phoneNumber, age and gender to User (formerly
+app/scripts/add_user_fields_migration.py).
+
+Revision ID: 0002
+Revises: 0001
+Create Date: 2025-10-05 10:00:00
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = "0002"
+down_revision: Union[str, None] = "0001"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    with op.batch_alter_table("User") as batch_op:
+        batch_op.add_column(sa.Column("phoneNumber", sa.String(), nullable=True))
+        batch_op.add_column(sa.Column("age", sa.Integer(), nullable=True))
+        batch_op.add_column(sa.Column("gender", sa.String(), nullable=True))
+
+
+def downgrade() -> None:
+    with op.batch_alter_table("User") as batch_op:
+        batch_op.drop_column("gender")
+        batch_op.drop_column("age")
+        batch_op.drop_column("phoneNumber")
@@ -0,0 +1,42 @@
+"""refresh tokens
+
+Revision ID: 0003
+Revises: 0002
+Create Date: 2026-10-18 09:00:00
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = "0003"
+down_revision: Union[str, None] = "0002"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        "RefreshToken",
+        sa.Column("id", sa.String(), nullable=False),
+        sa.Column("tokenHash", sa.String(), nullable=False),
+        sa.Column("userId", sa.String(), nullable=False),
+        sa.Column("expiresAt", sa.DateTime(), nullable=False),
+        sa.Column("revokedAt", sa.DateTime(), nullable=True),
+        sa.Column("createdAt", sa.DateTime(), nullable=False),
+        sa.ForeignKeyConstraint(["userId"], ["User.id"]),
+        sa.PrimaryKeyConstraint("id"),
+    )
+    op.create_index(op.f("ix_RefreshToken_id"), "RefreshToken", ["id"], unique=False)
+    op.create_index(op.f("ix_RefreshToken_tokenHash"), "RefreshToken", ["tokenHash"], unique=True)
+    op.create_index(op.f("ix_RefreshToken_userId"), "RefreshToken", ["userId"], unique=False)
+
+
+def downgrade() -> None:
+    op.drop_index(op.f("ix_RefreshToken_userId"), table_name="RefreshToken")
+    op.drop_index(op.f("ix_RefreshToken_tokenHash"), table_name="RefreshToken")
+    op.drop_index(op.f("ix_RefreshToken_id"), table_name="RefreshToken")
+    op.drop_table("RefreshToken")
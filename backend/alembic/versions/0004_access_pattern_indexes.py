@@ -0,0 +1,72 @@
+"""access pattern indexes
+
+Composite indexes for appointment lookups by doctor/patient and date,
+prescriptions by patient and doctor, users by role, and a partial index
+over pending appointments. Built CONCURRENTLY on PostgreSQL so existing
+tables stay writable while they build, and skipped where create_all already
+made them.
+
+Revision ID: 0004
+Revises: 0003
+Create Date: 2026-10-18 10:00:00
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = "0004"
+down_revision: Union[str, None] = "0003"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+PENDING = sa.text("status = 'PENDING'")
+
+
+def upgrade() -> None:
+    # CREATE INDEX CONCURRENTLY cannot run inside a transaction
+    with op.get_context().autocommit_block():
+        op.create_index(
+            "Appointment_doctorId_appointmentDate_idx", "Appointment",
+            ["doctorId", "appointmentDate"], postgresql_concurrently=True, if_not_exists=True,
+        )
+        op.create_index(
+            "Appointment_patientId_appointmentDate_idx", "Appointment",
+            ["patientId", "appointmentDate"], postgresql_concurrently=True, if_not_exists=True,
+        )
+        op.create_index(
+            "Appointment_doctorId_pending_idx", "Appointment", ["doctorId"],
+            postgresql_where=PENDING, sqlite_where=PENDING,
+            postgresql_concurrently=True, if_not_exists=True,
+        )
+        op.create_index(
+            "Prescription_patientId_doctorId_idx", "Prescription",
+            ["patientId", "doctorId"], postgresql_concurrently=True, if_not_exists=True,
+        )
+        op.create_index(
+            "User_role_idx", "User", ["role"], postgresql_concurrently=True, if_not_exists=True,
+        )
+
+
+def downgrade() -> None:
+    with op.get_context().autocommit_block():
+        op.drop_index("User_role_idx", table_name="User", postgresql_concurrently=True)
+        op.drop_index(
+            "Prescription_patientId_doctorId_idx", table_name="Prescription",
+            postgresql_concurrently=True,
+        )
+        op.drop_index(
+            "Appointment_doctorId_pending_idx", table_name="Appointment",
+            postgresql_concurrently=True,
+        )
+        op.drop_index(
+            "Appointment_patientId_appointmentDate_idx", table_name="Appointment",
+            postgresql_concurrently=True,
+        )
+        op.drop_index(
+            "Appointment_doctorId_appointmentDate_idx", table_name="Appointment",
+            postgresql_concurrently=True,
+        )
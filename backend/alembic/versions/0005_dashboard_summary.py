@@ -0,0 +1,44 @@
+"""dashboard summary
+
+Revision ID: 0005
+Revises: 0004
+Create Date: 2026-10-18 12:00:00
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = "0005"
+down_revision: Union[str, None] = "0004"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # Rows are filled by writes and on first read; backfill existing profiles
+    # with python -m app.scripts.rebuild_dashboard_summaries
+    op.create_table(
+        "DashboardSummary",
+        sa.Column("profileId", sa.String(), nullable=False),
+        sa.Column("role", sa.String(), nullable=False),
+        sa.Column("scheduledCount", sa.Integer(), nullable=False),
+        sa.Column("completedCount", sa.Integer(), nullable=False),
+        sa.Column("canceledCount", sa.Integer(), nullable=False),
+        sa.Column("pendingCount", sa.Integer(), nullable=False),
+        sa.Column("nextAppointmentId", sa.String(), nullable=True),
+        sa.Column("nextAppointmentDate", sa.DateTime(), nullable=True),
+        sa.Column("todayStart", sa.DateTime(), nullable=True),
+        sa.Column("todayCount", sa.Integer(), nullable=False),
+        sa.Column("activePrescriptionCount", sa.Integer(), nullable=False),
+        sa.Column("activePrescriptionsUntil", sa.DateTime(), nullable=True),
+        sa.Column("updatedAt", sa.DateTime(), nullable=False),
+        sa.PrimaryKeyConstraint("profileId", "role"),
+    )
+
+
+def downgrade() -> None:
+    op.drop_table("DashboardSummary")
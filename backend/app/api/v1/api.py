@@ -1,5 +1,5 @@
 from fastapi import APIRouter
-from app.api.v1.endpoints import auth, users, appointments, doctors, me, prescriptions
+from app.api.v1.endpoints import auth, users, appointments, doctors, me, prescriptions, internal
 
 api_router = APIRouter()
 
@@ -9,3 +9,4 @@ api_router.include_router(appointments.router, prefix="/appointments", tags=["ap
 api_router.include_router(doctors.router, prefix="/doctors", tags=["doctors"])
 api_router.include_router(me.router, prefix="/me", tags=["me"])
 api_router.include_router(prescriptions.router, prefix="/prescriptions", tags=["prescriptions"])
+api_router.include_router(internal.router, prefix="/internal", tags=["internal"], include_in_schema=False)
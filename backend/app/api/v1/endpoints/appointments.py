@@ -1,20 +1,30 @@
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, HTTPException, Query, status
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import select
-from sqlalchemy.orm import selectinload
-from typing import List, Optional
+from sqlalchemy import insert
+from typing import List, Literal, Optional, Union
 from datetime import datetime
 import uuid
 
-from app.db.session import get_db
-from app.models.user import User
-from app.models.appointment import Appointment
-from app.models.patient_profile import PatientProfile
-from app.models.doctor_profile import DoctorProfile
-from app.schemas.appointment import AppointmentCreate, AppointmentUpdate, AppointmentResponse
-from app.api.v1.endpoints.auth import get_current_user
-from pydantic import BaseModel
-from typing import Optional
+from app.core.cache import invalidate_dashboards
+from app.core.config import settings
+from app.core.pagination import decode_cursor, encode_cursor
+from app.core.recurrence import expand_recurrence
+from app.db import queries
+from app.db.availability import find_conflicts, invalidate_availability, is_available, naive_utc, record_booking
+from app.db.session import begin_write, get_db, get_read_db
+from app.db.summary import record_appointment_change, record_appointments_added
+from app.models.appointment import Appointment, AppointmentStatus
+from app.schemas.appointment import (
+    AppointmentCreate,
+    AppointmentPage,
+    AppointmentResponse,
+    AppointmentUpdate,
+    DoctorAppointmentItem,
+    PatientAppointmentItem,
+)
+from app.api.v1.endpoints.auth import get_current_principal
+from app.schemas.token import Principal
+from pydantic import BaseModel, Field
 
 router = APIRouter()
 
@@ -23,83 +33,126 @@ class DoctorAppointmentCreate(BaseModel):
     """Schema for doctors to create appointments for patients"""
     patientId: str
     appointmentDate: datetime
-    duration: int = 30
+    duration: int = Field(30, gt=0, le=settings.APPOINTMENT_MAX_DURATION_MINUTES)
     reasonForVisit: Optional[str] = None
     notes: Optional[str] = None
 
 
-@router.get("/", response_model=List[AppointmentResponse])
+class DoctorAppointmentSeriesCreate(DoctorAppointmentCreate):
+    """Schema for doctors to book a recurring series; appointmentDate is the first occurrence"""
+    frequency: Literal["DAILY", "WEEKLY", "MONTHLY"]
+    interval: int = Field(1, ge=1, le=365)
+    count: Optional[int] = Field(None, ge=1)
+    until: Optional[datetime] = None
+
+
+@router.get("/", response_model=AppointmentPage)
 async def get_appointments(
-    current_user: User = Depends(get_current_user),
-    db: AsyncSession = Depends(get_db)
+    from_: Optional[datetime] = Query(None, alias="from", description="Only appointments at or after this time"),
+    to: Optional[datetime] = Query(None, description="Only appointments before this time"),
+    status: Optional[AppointmentStatus] = None,
+    order: Literal["asc", "desc"] = Query("asc", description="Date order; desc pages back through history"),
+    cursor: Optional[str] = None,
+    limit: int = Query(50, ge=1, le=200),
+    principal: Principal = Depends(get_current_principal),
+    db: AsyncSession = Depends(get_read_db)
 ):
-    """Get all appointments for current user"""
-    if current_user.role.value == "PATIENT":
-        # Get patient profile
-        result = await db.execute(
-            select(PatientProfile).where(PatientProfile.userId == current_user.id)
-        )
-        patient = result.scalar_one_or_none()
-        if not patient:
+    """Get a page of the current user's appointments, ordered by date"""
+    after = None
+    if cursor:
+        try:
+            after_date, after_id = decode_cursor(cursor, 2)
+            after = (datetime.fromisoformat(after_date), str(after_id))
+        except (ValueError, TypeError):
+            raise HTTPException(status_code=400, detail="Invalid cursor")
+    
+    start, end = naive_utc(from_), naive_utc(to)
+    descending = order == "desc"
+    # Fetch one extra row to know whether another page follows
+    if principal.role.value == "PATIENT":
+        if not principal.patientId:
             raise HTTPException(status_code=404, detail="Patient profile not found")
         
-        # Get appointments for this patient
-        result = await db.execute(
-            select(Appointment)
-            .options(
-                selectinload(Appointment.doctor).selectinload(DoctorProfile.user)
-            )
-            .where(Appointment.patientId == patient.id)
+        item_schema = PatientAppointmentItem
+        stmt = queries.patient_appointments_page(
+            principal.patientId, limit + 1, start, end, status, after, descending
         )
     else:  # DOCTOR
-        # Get doctor profile
-        result = await db.execute(
-            select(DoctorProfile).where(DoctorProfile.userId == current_user.id)
-        )
-        doctor = result.scalar_one_or_none()
-        if not doctor:
+        if not principal.doctorId:
             raise HTTPException(status_code=404, detail="Doctor profile not found")
         
-        # Get appointments for this doctor
-        result = await db.execute(
-            select(Appointment)
-            .options(
-                selectinload(Appointment.patient).selectinload(PatientProfile.user)
-            )
-            .where(Appointment.doctorId == doctor.id)
+        item_schema = DoctorAppointmentItem
+        stmt = queries.doctor_appointments_page(
+            principal.doctorId, limit + 1, start, end, status, after, descending
+        )
+    
+    appointments = (await db.execute(stmt)).scalars().all()
+    
+    next_cursor = None
+    if len(appointments) > limit:
+        last = appointments[limit - 1]
+        next_cursor = encode_cursor(last.appointmentDate.isoformat(), last.id)
+    
+    return AppointmentPage(
+        items=[item_schema.model_validate(appointment) for appointment in appointments[:limit]],
+        nextCursor=next_cursor,
+    )
+
+
+@router.get("/{appointment_id}", response_model=Union[PatientAppointmentItem, DoctorAppointmentItem])
+async def get_appointment(
+    appointment_id: str,
+    principal: Principal = Depends(get_current_principal),
+    db: AsyncSession = Depends(get_read_db)
+):
+    """Get one of the current user's appointments"""
+    if principal.role.value == "PATIENT":
+        item_schema = PatientAppointmentItem
+        stmt = queries.patient_appointment(appointment_id, principal.patientId)
+    else:  # DOCTOR
+        item_schema = DoctorAppointmentItem
+        stmt = queries.doctor_appointment(appointment_id, principal.doctorId)
+    
+    appointment = (await db.execute(stmt)).scalar_one_or_none()
+    if not appointment:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Appointment not found"
         )
     
-    appointments = result.scalars().all()
-    return appointments
+    return item_schema.model_validate(appointment)
 
 
 @router.post("/", response_model=AppointmentResponse, status_code=status.HTTP_201_CREATED)
 async def create_appointment(
     appointment_in: AppointmentCreate,
-    current_user: User = Depends(get_current_user),
+    principal: Principal = Depends(get_current_principal),
     db: AsyncSession = Depends(get_db)
 ):
     """Create a new appointment (for patients)"""
-    # Get patient profile
-    result = await db.execute(
-        select(PatientProfile).where(PatientProfile.userId == current_user.id)
-    )
-    patient = result.scalar_one_or_none()
-    if not patient:
+    if not principal.patientId:
         raise HTTPException(status_code=404, detail="Patient profile not found")
     
+    await begin_write(db)
+    start = naive_utc(appointment_in.appointmentDate)
+    if not await is_available(db, appointment_in.doctorId, start, appointment_in.duration):
+        raise HTTPException(status_code=409, detail="The doctor is already booked at that time")
+    
     appointment = Appointment(
         id=str(uuid.uuid4()),
-        patientId=patient.id,
+        patientId=principal.patientId,
         doctorId=appointment_in.doctorId,
-        appointmentDate=appointment_in.appointmentDate,
+        appointmentDate=start,
         duration=appointment_in.duration,
         reasonForVisit=appointment_in.reasonForVisit,
         notes=appointment_in.notes
     )
     
     db.add(appointment)
+    await record_appointment_change(db, appointment)
     await db.commit()
+    invalidate_dashboards(appointment.patientId, appointment.doctorId)
+    record_booking(appointment.doctorId, start, appointment.duration)
     await db.refresh(appointment)
     
     return appointment
@@ -108,58 +161,130 @@ async def create_appointment(
 @router.post("/doctor/create", response_model=AppointmentResponse, status_code=status.HTTP_201_CREATED)
 async def create_appointment_for_patient(
     appointment_in: DoctorAppointmentCreate,
-    current_user: User = Depends(get_current_user),
+    principal: Principal = Depends(get_current_principal),
     db: AsyncSession = Depends(get_db)
 ):
     """Create a new appointment for a patient (doctors only)"""
     # Check if user is a doctor
-    if current_user.role != "DOCTOR":
+    if principal.role != "DOCTOR":
         raise HTTPException(status_code=403, detail="Only doctors can create appointments for patients")
     
-    # Get doctor profile
-    result = await db.execute(
-        select(DoctorProfile).where(DoctorProfile.userId == current_user.id)
-    )
-    doctor = result.scalar_one_or_none()
-    if not doctor:
+    if not principal.doctorId:
         raise HTTPException(status_code=404, detail="Doctor profile not found")
     
+    await begin_write(db)
+    
     # Verify patient exists
-    result = await db.execute(
-        select(PatientProfile).where(PatientProfile.id == appointment_in.patientId)
-    )
+    result = await db.execute(queries.patient_profile_by_id(appointment_in.patientId))
     patient = result.scalar_one_or_none()
     if not patient:
         raise HTTPException(status_code=404, detail="Patient not found")
     
+    start = naive_utc(appointment_in.appointmentDate)
+    if not await is_available(db, principal.doctorId, start, appointment_in.duration):
+        raise HTTPException(status_code=409, detail="You are already booked at that time")
+    
     appointment = Appointment(
         id=str(uuid.uuid4()),
         patientId=appointment_in.patientId,
-        doctorId=doctor.id,
-        appointmentDate=appointment_in.appointmentDate,
+        doctorId=principal.doctorId,
+        appointmentDate=start,
         duration=appointment_in.duration,
         reasonForVisit=appointment_in.reasonForVisit,
         notes=appointment_in.notes
     )
     
     db.add(appointment)
+    await record_appointment_change(db, appointment)
     await db.commit()
+    invalidate_dashboards(appointment.patientId, appointment.doctorId)
+    record_booking(appointment.doctorId, start, appointment.duration)
     await db.refresh(appointment)
     
     return appointment
 
 
+@router.post("/doctor/series", response_model=List[AppointmentResponse], status_code=status.HTTP_201_CREATED)
+async def create_appointment_series(
+    series_in: DoctorAppointmentSeriesCreate,
+    principal: Principal = Depends(get_current_principal),
+    db: AsyncSession = Depends(get_db)
+):
+    """Create a recurring series of appointments for a patient (doctors only)"""
+    if principal.role != "DOCTOR":
+        raise HTTPException(status_code=403, detail="Only doctors can create appointments for patients")
+    
+    if not principal.doctorId:
+        raise HTTPException(status_code=404, detail="Doctor profile not found")
+    
+    try:
+        starts = expand_recurrence(
+            naive_utc(series_in.appointmentDate),
+            series_in.frequency,
+            series_in.interval,
+            settings.APPOINTMENT_SERIES_MAX_OCCURRENCES,
+            count=series_in.count,
+            until=naive_utc(series_in.until),
+        )
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    if not starts:
+        raise HTTPException(status_code=400, detail="The recurrence has no occurrences")
+    
+    await begin_write(db)
+    
+    # Verify patient exists
+    result = await db.execute(queries.patient_profile_by_id(series_in.patientId))
+    if result.scalar_one_or_none() is None:
+        raise HTTPException(status_code=404, detail="Patient not found")
+    
+    # Every occurrence against the doctor's bookings in one range query
+    conflicts = await find_conflicts(db, principal.doctorId, starts, series_in.duration)
+    if conflicts:
+        raise HTTPException(
+            status_code=409,
+            detail=f"You are already booked at: {', '.join(start.isoformat() for start in conflicts)}"
+        )
+    
+    created_at = datetime.utcnow()
+    rows = [
+        {
+            "id": str(uuid.uuid4()),
+            "patientId": series_in.patientId,
+            "doctorId": principal.doctorId,
+            "appointmentDate": start,
+            "duration": series_in.duration,
+            "reasonForVisit": series_in.reasonForVisit,
+            "notes": series_in.notes,
+            "status": AppointmentStatus.PENDING,
+            "createdAt": created_at,
+        }
+        for start in starts
+    ]
+    # A single INSERT ... VALUES statement carrying every row; at most
+    # APPOINTMENT_SERIES_MAX_OCCURRENCES * 9 parameters
+    await db.execute(insert(Appointment).values(rows))
+    await record_appointments_added(db, series_in.patientId, principal.doctorId, AppointmentStatus.PENDING, len(rows))
+    await db.commit()
+    invalidate_dashboards(series_in.patientId, principal.doctorId)
+    for start in starts:
+        record_booking(principal.doctorId, start, series_in.duration)
+    
+    return rows
+
+
 @router.patch("/{appointment_id}", response_model=AppointmentResponse)
 async def update_appointment(
     appointment_id: str,
     appointment_update: AppointmentUpdate,
-    current_user: User = Depends(get_current_user),
+    principal: Principal = Depends(get_current_principal),
     db: AsyncSession = Depends(get_db)
 ):
     """Update an appointment"""
-    result = await db.execute(
-        select(Appointment).where(Appointment.id == appointment_id)
-    )
+    await begin_write(db)
+    # Lock the row: previous_status below decides the summary deltas, so a
+    # concurrent update must wait and then read the status this one writes
+    result = await db.execute(queries.appointment_by_id_for_update(appointment_id))
     appointment = result.scalar_one_or_none()
     
     if not appointment:
@@ -169,24 +294,43 @@ async def update_appointment(
         )
     
     # Check authorization
-    if current_user.role.value == "PATIENT":
-        # Get patient profile
-        result = await db.execute(
-            select(PatientProfile).where(PatientProfile.userId == current_user.id)
-        )
-        patient = result.scalar_one_or_none()
-        if not patient or appointment.patientId != patient.id:
+    if principal.role.value == "PATIENT":
+        if not principal.patientId or appointment.patientId != principal.patientId:
             raise HTTPException(
                 status_code=status.HTTP_403_FORBIDDEN,
                 detail="Not authorized to update this appointment"
             )
     
     # Update fields
+    previous_status = appointment.status
+    previous_date, previous_duration = appointment.appointmentDate, appointment.duration
     update_data = appointment_update.dict(exclude_unset=True)
+    if update_data.get("appointmentDate") is not None:
+        update_data["appointmentDate"] = naive_utc(update_data["appointmentDate"])
     for field, value in update_data.items():
         setattr(appointment, field, value)
     
+    moved = appointment.appointmentDate != previous_date or appointment.duration != previous_duration
+    canceled = appointment.status == AppointmentStatus.CANCELED
+    was_canceled = previous_status == AppointmentStatus.CANCELED
+    # Moving an appointment, or reviving a canceled one, must not double-book
+    # the doctor; other status changes (e.g. completing it) leave the slot as is
+    rescheduled = moved or canceled != was_canceled
+    if not canceled and (moved or was_canceled) and not await is_available(
+        db, appointment.doctorId, naive_utc(appointment.appointmentDate), appointment.duration,
+        exclude_id=appointment.id,
+    ):
+        raise HTTPException(
+            status_code=status.HTTP_409_CONFLICT,
+            detail="The doctor is already booked at that time"
+        )
+    
+    await record_appointment_change(db, appointment, previous_status)
     await db.commit()
+    invalidate_dashboards(appointment.patientId, appointment.doctorId)
+    if rescheduled:
+        invalidate_availability(appointment.doctorId, previous_date, previous_duration)
+        invalidate_availability(appointment.doctorId, naive_utc(appointment.appointmentDate), appointment.duration)
     await db.refresh(appointment)
     
     return appointment
@@ -1,22 +1,98 @@
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, HTTPException, Request, status
 from fastapi.security import OAuth2PasswordBearer, OAuth2PasswordRequestForm
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import select
-from datetime import timedelta
+from sqlalchemy import update
+from datetime import datetime, timedelta
+from typing import Optional
 from jose import JWTError, jwt
+from pydantic import ValidationError
 import uuid
 
+from app.core.cache import principal_cache, invalidate_principal
 from app.core.config import settings
-from app.core.security import create_access_token, verify_password, get_password_hash
-from app.db.session import get_db
-from app.models.user import User
+from app.core.throttle import login_throttle
+from app.core.revocation import access_token_revocations
+from app.core.security import (
+    create_access_token,
+    create_refresh_token,
+    hash_refresh_token,
+    verify_and_update_password_async,
+    get_password_hash_async,
+)
+from app.db import queries
+from app.db.session import begin_write, get_db
+from app.models.user import User, UserRole
 from app.models.patient_profile import PatientProfile
-from app.schemas.token import Token
+from app.models.refresh_token import RefreshToken
+from app.schemas.token import Token, TokenPayload, Principal, RefreshRequest
 from app.schemas.user import UserCreate, UserResponse
 
 router = APIRouter()
 
 oauth2_scheme = OAuth2PasswordBearer(tokenUrl="/api/v1/auth/login")
+optional_oauth2_scheme = OAuth2PasswordBearer(tokenUrl="/api/v1/auth/login", auto_error=False)
+
+
+credentials_exception = HTTPException(
+    status_code=status.HTTP_401_UNAUTHORIZED,
+    detail="Could not validate credentials",
+    headers={"WWW-Authenticate": "Bearer"},
+)
+
+
+def decode_access_token(token: str) -> TokenPayload:
+    """Decode and validate a bearer token"""
+    try:
+        payload = jwt.decode(token, settings.SECRET_KEY, algorithms=[settings.ALGORITHM])
+        token_data = TokenPayload(**payload)
+    except (JWTError, ValidationError):
+        raise credentials_exception
+    
+    if token_data.sub is None:
+        raise credentials_exception
+    
+    # Logged-out tokens are rejected from the in-process revocation list, not the database
+    if access_token_revocations.is_revoked(token_data.jti):
+        raise credentials_exception
+    
+    return token_data
+
+
+def issue_tokens(
+    db: AsyncSession, user: User, patient_id: Optional[str], doctor_id: Optional[str]
+) -> dict:
+    """
+    Create an access token carrying role/profile claims and a new refresh token.
+    The refresh token row is added to the session; the caller commits.
+    """
+    claims = {"role": user.role.value}
+    profile_id = patient_id if user.role == UserRole.PATIENT else doctor_id
+    if profile_id:
+        claims["pid"] = profile_id
+    access_token = create_access_token(
+        subject=user.id,
+        expires_delta=timedelta(minutes=settings.ACCESS_TOKEN_EXPIRE_MINUTES),
+        claims=claims,
+    )
+    
+    refresh_token, token_hash = create_refresh_token()
+    db.add(RefreshToken(
+        id=str(uuid.uuid4()),
+        tokenHash=token_hash,
+        userId=user.id,
+        expiresAt=datetime.utcnow() + timedelta(days=settings.REFRESH_TOKEN_EXPIRE_DAYS),
+    ))
+    
+    return {"access_token": access_token, "refresh_token": refresh_token, "token_type": "bearer"}
+
+
+async def revoke_refresh_tokens(db: AsyncSession, user_id: str) -> None:
+    """Revoke every outstanding refresh token for a user. The caller commits."""
+    await db.execute(
+        update(RefreshToken)
+        .where(RefreshToken.userId == user_id, RefreshToken.revokedAt.is_(None))
+        .values(revokedAt=datetime.utcnow())
+    )
 
 
 async def get_current_user(
@@ -24,29 +100,57 @@ async def get_current_user(
     db: AsyncSession = Depends(get_db)
 ) -> User:
     """Get current authenticated user"""
-    credentials_exception = HTTPException(
-        status_code=status.HTTP_401_UNAUTHORIZED,
-        detail="Could not validate credentials",
-        headers={"WWW-Authenticate": "Bearer"},
-    )
+    user_id = decode_access_token(token).sub
     
-    try:
-        payload = jwt.decode(token, settings.SECRET_KEY, algorithms=[settings.ALGORITHM])
-        user_id: str = payload.get("sub")
-        if user_id is None:
-            raise credentials_exception
-    except JWTError:
-        raise credentials_exception
+    # Serve the user from the in-process cache when possible
+    user = principal_cache.get(user_id)
+    if user is not None:
+        return user
     
-    result = await db.execute(select(User).where(User.id == user_id))
+    result = await db.execute(queries.user_by_id(user_id))
     user = result.scalar_one_or_none()
     
     if user is None:
         raise credentials_exception
     
+    # Detach so the cached instance is never mutated or flushed by a request session
+    db.expunge(user)
+    principal_cache.set(user_id, user)
+    
     return user
 
 
+async def get_current_principal(
+    token: str = Depends(oauth2_scheme),
+    db: AsyncSession = Depends(get_db)
+) -> Principal:
+    """
+    Get the current caller's id, role and profile id.
+    Tokens issued by login carry these as claims, so no query is needed;
+    older tokens (or ones issued before the profile existed) fall back to
+    a single joined lookup.
+    """
+    token_data = decode_access_token(token)
+    
+    if token_data.role is not None and token_data.pid is not None:
+        if token_data.role == UserRole.PATIENT:
+            return Principal(id=token_data.sub, role=token_data.role, patientId=token_data.pid)
+        return Principal(id=token_data.sub, role=token_data.role, doctorId=token_data.pid)
+    
+    result = await db.execute(queries.user_with_profiles_by_id(token_data.sub))
+    row = result.one_or_none()
+    
+    if row is None:
+        raise credentials_exception
+    
+    return Principal(
+        id=row.User.id,
+        role=row.User.role,
+        patientId=row.patientId,
+        doctorId=row.doctorId,
+    )
+
+
 @router.post("/register", response_model=UserResponse, status_code=status.HTTP_201_CREATED)
 async def register(
     user_in: UserCreate,
@@ -54,7 +158,7 @@ async def register(
 ):
     """Register a new user"""
     # Check if user exists
-    result = await db.execute(select(User).where(User.email == user_in.email))
+    result = await db.execute(queries.user_by_email(user_in.email))
     existing_user = result.scalar_one_or_none()
     
     if existing_user:
@@ -63,12 +167,15 @@ async def register(
             detail="Email already registered"
         )
     
+    # End the read so bcrypt does not hold the primary connection
+    await db.commit()
+    
     # Create user
     user = User(
         id=str(uuid.uuid4()),
         email=user_in.email,
         name=user_in.name,
-        password=get_password_hash(user_in.password),
+        password=await get_password_hash_async(user_in.password),
         role=user_in.role,
         phoneNumber=user_in.phoneNumber,
         age=user_in.age,
@@ -93,13 +200,28 @@ async def register(
 
 @router.post("/login", response_model=Token)
 async def login(
+    request: Request,
     form_data: OAuth2PasswordRequestForm = Depends(),
     db: AsyncSession = Depends(get_db)
 ):
     """Login user and return access token"""
-    # Find user by email (OAuth2 uses username field for email)
-    result = await db.execute(select(User).where(User.email == form_data.username))
-    user = result.scalar_one_or_none()
+    # Reject over-budget attempts before touching the database or bcrypt
+    client_ip = request.client.host if request.client else None
+    retry_after = await login_throttle.hit(form_data.username, client_ip)
+    if retry_after:
+        raise HTTPException(
+            status_code=status.HTTP_429_TOO_MANY_REQUESTS,
+            detail="Too many login attempts, please try again later",
+            headers={"Retry-After": str(retry_after)},
+        )
+    
+    # Find user by email (OAuth2 uses username field for email), along with
+    # the profile id that will be embedded in the token
+    result = await db.execute(
+        queries.user_with_profiles_by_email(form_data.username)
+    )
+    row = result.one_or_none()
+    user = row.User if row else None
     
     if not user or not user.password:
         raise HTTPException(
@@ -108,21 +230,102 @@ async def login(
             headers={"WWW-Authenticate": "Bearer"},
         )
     
+    # End the read so bcrypt does not hold the primary connection
+    await db.commit()
+    
     # Verify password
-    if not verify_password(form_data.password, user.password):
+    valid, new_hash = await verify_and_update_password_async(form_data.password, user.password)
+    if not valid:
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="Incorrect email or password",
             headers={"WWW-Authenticate": "Bearer"},
         )
     
-    # Create access token
-    access_token_expires = timedelta(minutes=settings.ACCESS_TOKEN_EXPIRE_MINUTES)
-    access_token = create_access_token(
-        subject=user.id, expires_delta=access_token_expires
+    # Stored hash uses an outdated cost factor; upgrade it while we have the plaintext
+    if new_hash:
+        user.password = new_hash
+    
+    await login_throttle.reset_account(form_data.username)
+    
+    tokens = issue_tokens(db, user, row.patientId, row.doctorId)
+    await db.commit()
+    if new_hash:
+        invalidate_principal(user.id)
+    
+    return tokens
+
+
+@router.post("/refresh", response_model=Token)
+async def refresh(
+    refresh_in: RefreshRequest,
+    db: AsyncSession = Depends(get_db)
+):
+    """Exchange a refresh token for a new access token and a rotated refresh token"""
+    invalid_refresh_exception = HTTPException(
+        status_code=status.HTTP_401_UNAUTHORIZED,
+        detail="Invalid refresh token",
+    )
+    
+    await begin_write(db)
+    result = await db.execute(
+        queries.refresh_token_by_hash(hash_refresh_token(refresh_in.refresh_token))
     )
+    stored = result.scalar_one_or_none()
+    
+    if not stored or stored.expiresAt <= datetime.utcnow():
+        raise invalid_refresh_exception
+    
+    # Rotate out with a conditional UPDATE so only one of two concurrent
+    # refreshes with the same token can claim it
+    result = await db.execute(
+        update(RefreshToken)
+        .where(RefreshToken.id == stored.id, RefreshToken.revokedAt.is_(None))
+        .values(revokedAt=datetime.utcnow())
+        .execution_options(synchronize_session=False)
+    )
+    
+    # A rotated-out token being replayed means it leaked: shut down the whole family
+    if result.rowcount != 1:
+        await revoke_refresh_tokens(db, stored.userId)
+        await db.commit()
+        raise invalid_refresh_exception
+    
+    result = await db.execute(queries.user_with_profiles_by_id(stored.userId))
+    row = result.one_or_none()
+    if row is None:
+        raise invalid_refresh_exception
+    
+    tokens = issue_tokens(db, row.User, row.patientId, row.doctorId)
+    await db.commit()
     
-    return {"access_token": access_token, "token_type": "bearer"}
+    return tokens
+
+
+@router.post("/logout", status_code=status.HTTP_204_NO_CONTENT)
+async def logout(
+    refresh_in: RefreshRequest,
+    token: Optional[str] = Depends(optional_oauth2_scheme),
+    db: AsyncSession = Depends(get_db)
+):
+    """Revoke a refresh token and, if presented, the current access token"""
+    if token:
+        try:
+            token_data = decode_access_token(token)
+        except HTTPException:
+            token_data = None
+        if token_data and token_data.jti and token_data.exp:
+            access_token_revocations.revoke(token_data.jti, token_data.exp)
+    
+    await db.execute(
+        update(RefreshToken)
+        .where(
+            RefreshToken.tokenHash == hash_refresh_token(refresh_in.refresh_token),
+            RefreshToken.revokedAt.is_(None),
+        )
+        .values(revokedAt=datetime.utcnow())
+    )
+    await db.commit()
 
 
 @router.get("/me", response_model=UserResponse)
@@ -1,10 +1,16 @@
-from fastapi import APIRouter, Depends
+from fastapi import APIRouter, Depends, HTTPException, Query
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import select
 from typing import List
+from datetime import datetime, timedelta, timezone
 
-from app.db.session import get_db
-from app.models.user import User, UserRole
+from app.core.config import settings
+from app.db import queries
+from app.db.availability import booked_days, naive_utc, open_slots
+from app.db.session import get_read_db
+from app.models.user import UserRole
+from app.api.v1.endpoints.auth import get_current_principal
+from app.schemas.appointment import AvailableSlots
+from app.schemas.token import Principal
 from app.schemas.user import UserResponse
 
 router = APIRouter()
@@ -12,11 +18,40 @@ router = APIRouter()
 
 @router.get("/", response_model=List[UserResponse])
 async def get_doctors(
-    db: AsyncSession = Depends(get_db)
+    db: AsyncSession = Depends(get_read_db)
 ):
     """Get all doctors"""
-    result = await db.execute(
-        select(User).where(User.role == UserRole.DOCTOR)
-    )
+    result = await db.execute(queries.users_by_role(UserRole.DOCTOR))
     doctors = result.scalars().all()
     return doctors
+
+
+@router.get("/{doctor_id}/slots", response_model=AvailableSlots)
+async def get_doctor_slots(
+    doctor_id: str,
+    from_: datetime = Query(..., alias="from", description="Start of the search range"),
+    to: datetime = Query(..., description="End of the search range (exclusive)"),
+    principal: Principal = Depends(get_current_principal),
+    db: AsyncSession = Depends(get_read_db)
+):
+    """Get a doctor's open appointment slots within bookable hours"""
+    start, end = naive_utc(from_), naive_utc(to)
+    if end <= start:
+        raise HTTPException(status_code=400, detail="'to' must be after 'from'")
+    if end - start > timedelta(days=settings.AVAILABILITY_MAX_RANGE_DAYS):
+        raise HTTPException(
+            status_code=400,
+            detail=f"Range is limited to {settings.AVAILABILITY_MAX_RANGE_DAYS} days"
+        )
+    
+    result = await db.execute(queries.doctor_profile_by_id(doctor_id))
+    if result.scalar_one_or_none() is None:
+        raise HTTPException(status_code=404, detail="Doctor not found")
+    
+    booked = await booked_days(db, doctor_id, start, end)
+    now = datetime.now(timezone.utc).replace(tzinfo=None)
+    return AvailableSlots(
+        doctorId=doctor_id,
+        slotMinutes=settings.AVAILABILITY_SLOT_MINUTES,
+        slots=open_slots(booked, start, end, now),
+    )
@@ -0,0 +1,42 @@
+import secrets
+from typing import Optional
+
+from fastapi import APIRouter, Depends, Header, HTTPException
+
+from app.core.config import settings
+from app.core.cache import availability_cache, dashboard_cache, principal_cache
+from app.core.hashing import hashing_pool
+from app.core.throttle import login_throttle
+from app.core.revocation import access_token_revocations
+from app.db.engine import pool_stats
+from app.db.query_stats import route_query_stats
+from app.db.session import engine, read_engine, primary_pins
+
+
+async def require_internal_token(x_internal_token: Optional[str] = Header(None)) -> None:
+    """Only callers holding INTERNAL_API_TOKEN may use internal endpoints"""
+    expected = settings.INTERNAL_API_TOKEN
+    if not expected:
+        raise HTTPException(status_code=404, detail="Not Found")
+    if not x_internal_token or not secrets.compare_digest(x_internal_token, expected):
+        raise HTTPException(status_code=403, detail="Invalid internal token")
+
+
+router = APIRouter(dependencies=[Depends(require_internal_token)])
+
+
+@router.get("/metrics")
+async def get_metrics():
+    """Get in-process cache and runtime metrics for this worker"""
+    return {
+        "principalCache": principal_cache.stats(),
+        "dashboardCache": dashboard_cache.stats(),
+        "availabilityCache": availability_cache.stats(),
+        "hashingPool": hashing_pool.stats(),
+        "loginThrottle": login_throttle.stats(),
+        "accessTokenRevocations": access_token_revocations.stats(),
+        "dbPool": pool_stats(engine),
+        "readDbPool": pool_stats(read_engine) if read_engine is not engine else None,
+        "primaryPins": primary_pins.stats(),
+        "queriesByRoute": route_query_stats.stats(),
+    }
@@ -1,288 +1,289 @@
-from fastapi import APIRouter, Depends, HTTPException
+from fastapi import APIRouter, Depends, HTTPException, Query
+from fastapi.responses import ORJSONResponse
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import select, and_, or_, func
-from sqlalchemy.orm import selectinload
-from datetime import datetime, date, timezone
-
-from app.db.session import get_db
-from app.models.user import User
-from app.models.patient_profile import PatientProfile
-from app.models.doctor_profile import DoctorProfile
-from app.models.appointment import Appointment, AppointmentStatus
-from app.models.prescription import Prescription
-from app.api.v1.endpoints.auth import get_current_user
+from datetime import datetime, date, time, timedelta, timezone
+from functools import partial
+from typing import Optional, Union
+
+from app.core.cache import DASHBOARD_SECTIONS, cache_dashboard_section, dashboard_cache, dashboard_invalidations
+from app.core.config import settings
+from app.core.pagination import decode_cursor, encode_cursor
+from app.db import queries
+from app.db.session import ReadFanout, get_read_db, get_read_fanout
+from app.db.summary import STATUS_COUNTS, load_summary
+from app.api.v1.endpoints.auth import get_current_principal
+from app.schemas.dashboard import (
+    AppointmentWithDoctor,
+    AppointmentWithPatient,
+    DashboardSummaryResponse,
+    DoctorDashboard,
+    DoctorStats,
+    PatientDashboard,
+    PatientRosterItem,
+    PatientRosterPage,
+    PrescriptionWithDoctor,
+    UserContact,
+)
+from app.schemas.token import Principal
 
 router = APIRouter()
 
 
-@router.get("/dashboard")
+@router.get(
+    "/dashboard",
+    response_model=Union[PatientDashboard, DoctorDashboard],
+    response_model_exclude_none=True,
+)
 async def get_dashboard(
-    current_user: User = Depends(get_current_user),
-    db: AsyncSession = Depends(get_db)
+    sections: Optional[str] = Query(
+        None, description="Comma-separated dashboard sections to return (default: all)"
+    ),
+    principal: Principal = Depends(get_current_principal),
+    fanout: ReadFanout = Depends(get_read_fanout)
 ):
     """Get dashboard data for current user (patient or doctor)"""
     
-    if current_user.role == "PATIENT":
-        return await get_patient_dashboard(current_user, db)
-    elif current_user.role == "DOCTOR":
-        return await get_doctor_dashboard(current_user, db)
+    if principal.role == "PATIENT":
+        profile_id, loaders = principal.patientId, PATIENT_SECTION_LOADERS
+    elif principal.role == "DOCTOR":
+        profile_id, loaders = principal.doctorId, DOCTOR_SECTION_LOADERS
     else:
         raise HTTPException(status_code=400, detail="Invalid user role")
-
-
-async def get_patient_dashboard(user: User, db: AsyncSession):
-    """Get dashboard data for patient"""
     
-    # Get patient profile with relationships
-    result = await db.execute(
-        select(PatientProfile)
-        .options(
-            selectinload(PatientProfile.appointments).selectinload(Appointment.doctor).selectinload(DoctorProfile.user),
-            selectinload(PatientProfile.prescriptions).selectinload(Prescription.doctor).selectinload(DoctorProfile.user)
-        )
-        .where(PatientProfile.userId == user.id)
-    )
-    patient = result.scalar_one_or_none()
+    if not profile_id:
+        raise HTTPException(status_code=404, detail=f"{principal.role.value.title()} profile not found")
     
-    if not patient:
-        raise HTTPException(status_code=404, detail="Patient profile not found")
+    role = principal.role.value
+    available = DASHBOARD_SECTIONS[role]
+    if sections:
+        requested = [name.strip() for name in sections.split(",") if name.strip()]
+        unknown = [name for name in requested if name not in available]
+        if unknown:
+            raise HTTPException(
+                status_code=400,
+                detail=f"Unknown dashboard section(s): {', '.join(unknown)}. "
+                       f"Available: {', '.join(available)}"
+            )
+    else:
+        requested = list(available)
     
-    # Get current time in UTC (naive datetime for comparison with database timestamps)
-    now = datetime.now(timezone.utc).replace(tzinfo=None)
+    # Serve what is cached; appointment and prescription writes evict the
+    # sections of everyone involved
+    started = dashboard_invalidations.start()
+    dashboard = {}
+    for name in requested:
+        cached = dashboard_cache.get((role, profile_id, name))
+        if cached is not None:
+            dashboard[name] = cached
     
-    # Get upcoming appointments (including all future appointments regardless of status)
-    upcoming_appointments = [
-        {
-            "id": appt.id,
-            "appointmentDate": appt.appointmentDate.isoformat(),
-            "status": appt.status,
-            "reasonForVisit": appt.reasonForVisit,
-            "doctor": {
-                "id": appt.doctor.id,
-                "specialty": appt.doctor.specialty,
-                "credentials": appt.doctor.credentials,
-                "user": {
-                    "id": appt.doctor.user.id,
-                    "name": appt.doctor.user.name,
-                    "email": appt.doctor.user.email
-                }
-            } if appt.doctor and appt.doctor.user else None
-        }
-        for appt in patient.appointments
-        if appt.appointmentDate >= now and appt.doctor is not None
+    # Run only the loaders behind missing sections, concurrently, each on its
+    # own session; a loader that produces several sections caches all of them
+    rows = RowSerializer()
+    needed = [
+        loader for names, loader in loaders
+        if any(name in requested and name not in dashboard for name in names)
     ]
+    results = await fanout.gather(
+        *(partial(loader, profile_id, rows=rows) for loader in needed)
+    )
+    for loaded in results:
+        for name, value in loaded.items():
+            cache_dashboard_section(role, profile_id, name, value, started)
+            if name in requested:
+                dashboard[name] = value
     
-    # Sort by date
-    upcoming_appointments.sort(key=lambda x: x["appointmentDate"])
+    # Sections are already dumped through their schemas, so skip FastAPI's
+    # response-model round trip and hand them straight to orjson
+    return ORJSONResponse({name: dashboard[name] for name in requested})
+
+
+class RowSerializer:
+    """
+    Dumps each ORM row through its response schema once per request, however
+    many sections include it. The dumped dicts are what the dashboard cache
+    holds and what orjson encodes.
+    """
     
-    # Get recent visits (past appointments)
-    recent_visits = [
-        {
-            "id": appt.id,
-            "appointmentDate": appt.appointmentDate.isoformat(),
-            "status": appt.status,
-            "reasonForVisit": appt.reasonForVisit,
-            "doctor": {
-                "id": appt.doctor.id,
-                "specialty": appt.doctor.specialty,
-                "credentials": appt.doctor.credentials,
-                "user": {
-                    "id": appt.doctor.user.id,
-                    "name": appt.doctor.user.name,
-                    "email": appt.doctor.user.email
-                }
-            } if appt.doctor and appt.doctor.user else None
-        }
-        for appt in patient.appointments
-        if appt.appointmentDate < now and appt.doctor is not None
-    ]
+    def __init__(self):
+        self._dumped = {}
     
-    # Sort by date (most recent first)
-    recent_visits.sort(key=lambda x: x["appointmentDate"], reverse=True)
-    recent_visits = recent_visits[:5]  # Limit to 5 most recent
+    def dump(self, schema, rows):
+        dumped = []
+        for row in rows:
+            key = (schema, row.id)
+            data = self._dumped.get(key)
+            if data is None:
+                data = self._dumped[key] = schema.model_validate(row).model_dump()
+            dumped.append(data)
+        return dumped
+
+
+@router.get("/patients", response_model=PatientRosterPage)
+async def get_my_patients(
+    cursor: Optional[str] = None,
+    limit: int = Query(50, ge=1, le=200),
+    search: Optional[str] = Query(None, max_length=100),
+    principal: Principal = Depends(get_current_principal),
+    db: AsyncSession = Depends(get_read_db)
+):
+    """Get a page of the current doctor's patients, ordered by name"""
     
-    # Get active prescriptions
-    active_prescriptions = [
-        {
-            "id": pres.id,
-            "medication": pres.medication,
-            "dosage": pres.dosage,
-            "frequency": pres.frequency,
-            "startDate": pres.startDate.isoformat() if pres.startDate else None,
-            "endDate": pres.endDate.isoformat() if pres.endDate else None,
-            "refillsAvailable": pres.refillsAvailable,
-            "createdAt": pres.createdAt.isoformat(),
-            "doctor": {
-                "id": pres.doctor.id,
-                "specialty": pres.doctor.specialty,
-                "user": {
-                    "id": pres.doctor.user.id,
-                    "name": pres.doctor.user.name
-                }
-            } if pres.doctor and pres.doctor.user else None
-        }
-        for pres in patient.prescriptions
-        if (pres.endDate is None or pres.endDate >= date.today()) and pres.doctor is not None
-    ]
+    if principal.role != "DOCTOR":
+        raise HTTPException(status_code=403, detail="Only doctors have a patient roster")
+    if not principal.doctorId:
+        raise HTTPException(status_code=404, detail="Doctor profile not found")
     
-    # Sort by created date (most recent first)
-    active_prescriptions.sort(key=lambda x: x["createdAt"], reverse=True)
+    after = None
+    if cursor:
+        try:
+            after = tuple(decode_cursor(cursor, 2))
+        except ValueError:
+            raise HTTPException(status_code=400, detail="Invalid cursor")
+        # The keyset compares against (name, id) strings
+        if not all(isinstance(value, str) for value in after):
+            raise HTTPException(status_code=400, detail="Invalid cursor")
     
-    # Get ALL appointments for debugging
-    all_appointments_list = [
-        {
-            "id": appt.id,
-            "appointmentDate": appt.appointmentDate.isoformat(),
-            "status": appt.status,
-            "reasonForVisit": appt.reasonForVisit,
-            "doctor": {
-                "id": appt.doctor.id,
-                "specialty": appt.doctor.specialty,
-                "user": {
-                    "id": appt.doctor.user.id,
-                    "name": appt.doctor.user.name
-                }
-            } if appt.doctor and appt.doctor.user else None
-        }
-        for appt in patient.appointments
-        if appt.doctor is not None
+    now = datetime.now(timezone.utc).replace(tzinfo=None)
+    # Fetch one extra row to know whether another page follows
+    result = await db.execute(
+        queries.doctor_patient_roster(principal.doctorId, now, limit + 1, after, search)
+    )
+    rows = result.all()
+    
+    items = [
+        PatientRosterItem(
+            id=patient.id,
+            dateOfBirth=patient.dateOfBirth,
+            address=patient.address,
+            user=UserContact.model_validate(user),
+            lastVisit=last_visit,
+            nextAppointment=next_appointment,
+            visitCount=visit_count,
+        )
+        for patient, user, last_visit, visit_count, next_appointment in rows[:limit]
     ]
-    all_appointments_list.sort(key=lambda x: x["appointmentDate"], reverse=True)
     
+    next_cursor = None
+    if len(rows) > limit:
+        last_patient, last_user = rows[limit - 1][0], rows[limit - 1][1]
+        next_cursor = encode_cursor(last_user.name or "", last_patient.id)
+    
+    return PatientRosterPage(items=items, nextCursor=next_cursor)
+
+
+def _summary_section(summary):
+    section = DashboardSummaryResponse(
+        nextAppointmentId=summary["nextAppointmentId"],
+        nextAppointmentDate=summary["nextAppointmentDate"],
+        appointmentCounts={status: summary[column] for status, column in STATUS_COUNTS.items()},
+        todayCount=summary["todayCount"],
+        activePrescriptionCount=summary["activePrescriptionCount"],
+    )
+    return section.model_dump()
+
+
+def _now():
+    # Current time in UTC (naive datetime for comparison with database timestamps)
+    return datetime.now(timezone.utc).replace(tzinfo=None)
+
+
+# Patient sections. Each list is filtered, ordered and limited in SQL, so the
+# response size does not grow with the patient's history
+
+async def _patient_upcoming(patient_id: str, db: AsyncSession, rows: RowSerializer):
+    result = await db.execute(queries.patient_upcoming_appointments(patient_id, _now(), 3))
+    return {"upcomingAppointments": rows.dump(AppointmentWithDoctor, result.scalars())}
+
+
+async def _patient_visits(patient_id: str, db: AsyncSession, rows: RowSerializer):
+    # Past appointments, most recent first; older ones page through
+    # GET /appointments?to=<now>&order=desc
+    result = await db.execute(
+        queries.patient_past_appointments(patient_id, _now(), settings.DASHBOARD_HISTORY_LIMIT)
+    )
+    visits = rows.dump(AppointmentWithDoctor, result.scalars())
     return {
-        "upcomingAppointments": upcoming_appointments[:3],  # Limit to 3 for dashboard
-        "recentVisits": recent_visits[:3],  # Limit to 3 for dashboard
-        "activePrescriptions": active_prescriptions[:5],  # Limit to 5 for dashboard
-        "allAppointments": all_appointments_list,  # ALL appointments for debugging and appointments page
-        "allVisits": recent_visits,  # Full list for records page
-        "allPrescriptions": active_prescriptions  # Full list for records page
+        "recentVisits": visits[:3],  # Limit to 3 for dashboard
+        "allVisits": visits,  # Latest DASHBOARD_HISTORY_LIMIT visits for records page
     }
 
 
-async def get_doctor_dashboard(user: User, db: AsyncSession):
-    """Get dashboard data for doctor"""
-    
-    # Get doctor profile with relationships
+async def _patient_prescriptions(patient_id: str, db: AsyncSession, rows: RowSerializer):
+    # Prescriptions still running today, newest first
+    start_of_today = datetime.combine(date.today(), time.min)
     result = await db.execute(
-        select(DoctorProfile)
-        .options(
-            selectinload(DoctorProfile.appointments).selectinload(Appointment.patient).selectinload(PatientProfile.user),
-            selectinload(DoctorProfile.prescriptions)
-        )
-        .where(DoctorProfile.userId == user.id)
+        queries.patient_active_prescriptions(patient_id, start_of_today, settings.DASHBOARD_HISTORY_LIMIT)
     )
-    doctor = result.scalar_one_or_none()
-    
-    if not doctor:
-        raise HTTPException(status_code=404, detail="Doctor profile not found")
-    
-    # Get current time in UTC (naive datetime for comparison with database timestamps)
-    now = datetime.now(timezone.utc).replace(tzinfo=None)
-    
-    # Get today's schedule
-    today = date.today()
-    today_schedule = [
-        {
-            "id": appt.id,
-            "appointmentDate": appt.appointmentDate.isoformat(),
-            "status": appt.status,
-            "reasonForVisit": appt.reasonForVisit,
-            "patient": {
-                "id": appt.patient.id,
-                "dateOfBirth": appt.patient.dateOfBirth.isoformat() if appt.patient.dateOfBirth else None,
-                "address": appt.patient.address,
-                "user": {
-                    "id": appt.patient.user.id,
-                    "name": appt.patient.user.name,
-                    "email": appt.patient.user.email
-                }
-            } if appt.patient and appt.patient.user else None
-        }
-        for appt in doctor.appointments
-        if appt.appointmentDate.date() == today and appt.patient is not None
-    ]
-    
-    # Sort by time
-    today_schedule.sort(key=lambda x: x["appointmentDate"])
-    
-    # Get all patients (unique)
-    patient_ids = set()
-    patients = []
-    for appt in doctor.appointments:
-        if appt.patient and appt.patient.user and appt.patient.id not in patient_ids:
-            patient_ids.add(appt.patient.id)
-            patients.append({
-                "id": appt.patient.id,
-                "dateOfBirth": appt.patient.dateOfBirth.isoformat() if appt.patient.dateOfBirth else None,
-                "address": appt.patient.address,
-                "user": {
-                    "id": appt.patient.user.id,
-                    "name": appt.patient.user.name,
-                    "email": appt.patient.user.email
-                }
-            })
-    
-    # Get upcoming appointments (all future appointments regardless of status)
-    upcoming_appointments = [
-        {
-            "id": appt.id,
-            "appointmentDate": appt.appointmentDate.isoformat(),
-            "status": appt.status,
-            "reasonForVisit": appt.reasonForVisit,
-            "patient": {
-                "id": appt.patient.id,
-                "dateOfBirth": appt.patient.dateOfBirth.isoformat() if appt.patient.dateOfBirth else None,
-                "address": appt.patient.address,
-                "user": {
-                    "id": appt.patient.user.id,
-                    "name": appt.patient.user.name,
-                    "email": appt.patient.user.email
-                }
-            } if appt.patient and appt.patient.user else None
-        }
-        for appt in doctor.appointments
-        if appt.appointmentDate >= now and appt.patient is not None
-    ]
-    
-    # Sort by date
-    upcoming_appointments.sort(key=lambda x: x["appointmentDate"])
-    
-    # Get ALL appointments for debugging/appointments page
-    all_appointments_list = [
-        {
-            "id": appt.id,
-            "appointmentDate": appt.appointmentDate.isoformat(),
-            "status": appt.status,
-            "reasonForVisit": appt.reasonForVisit,
-            "patient": {
-                "id": appt.patient.id,
-                "dateOfBirth": appt.patient.dateOfBirth.isoformat() if appt.patient.dateOfBirth else None,
-                "address": appt.patient.address,
-                "user": {
-                    "id": appt.patient.user.id,
-                    "name": appt.patient.user.name,
-                    "email": appt.patient.user.email
-                }
-            } if appt.patient and appt.patient.user else None
-        }
-        for appt in doctor.appointments
-        if appt.patient is not None
-    ]
-    all_appointments_list.sort(key=lambda x: x["appointmentDate"], reverse=True)
-    
-    # Calculate stats
-    total_patients_today = len(today_schedule)
-    pending_lab_results = 0  # Placeholder - would need lab results model
-    records_to_review = len([appt for appt in doctor.appointments if appt.status == AppointmentStatus.PENDING])
-    
+    prescriptions = rows.dump(PrescriptionWithDoctor, result.scalars())
     return {
-        "todaySchedule": today_schedule,
-        "upcomingAppointments": upcoming_appointments[:5],  # Limit to 5 for dashboard
-        "patients": patients,
-        "allAppointments": all_appointments_list,  # ALL appointments for debugging and appointments page
-        "stats": {
-            "totalPatientsToday": total_patients_today,
-            "pendingLabResults": pending_lab_results,
-            "recordsToReview": records_to_review
-        }
+        "activePrescriptions": prescriptions[:5],  # Limit to 5 for dashboard
+        "allPrescriptions": prescriptions,  # Active prescriptions for records page
     }
+
+
+async def _patient_all_appointments(patient_id: str, db: AsyncSession, rows: RowSerializer):
+    # Latest DASHBOARD_HISTORY_LIMIT appointments; the full history pages
+    # through GET /appointments?order=desc
+    result = await db.execute(queries.patient_latest_appointments(patient_id, settings.DASHBOARD_HISTORY_LIMIT))
+    return {"allAppointments": rows.dump(AppointmentWithDoctor, result.scalars())}
+
+
+async def _patient_summary(patient_id: str, db: AsyncSession, rows: RowSerializer):
+    return {"summary": _summary_section(await load_summary(db, "PATIENT", patient_id))}
+
+
+PATIENT_SECTION_LOADERS = [
+    (("upcomingAppointments",), _patient_upcoming),
+    (("recentVisits", "allVisits"), _patient_visits),
+    (("activePrescriptions", "allPrescriptions"), _patient_prescriptions),
+    (("allAppointments",), _patient_all_appointments),
+    (("summary",), _patient_summary),
+]
+
+
+def _today_range():
+    start = datetime.combine(date.today(), time.min)
+    return start, start + timedelta(days=1)
+
+
+# Doctor sections
+
+async def _doctor_today(doctor_id: str, db: AsyncSession, rows: RowSerializer):
+    # Today's schedule: one day's index range, capped
+    today_start, today_end = _today_range()
+    result = await db.execute(
+        queries.doctor_appointments_between(doctor_id, today_start, today_end, settings.DASHBOARD_HISTORY_LIMIT)
+    )
+    return {"todaySchedule": rows.dump(AppointmentWithPatient, result.scalars())}
+
+
+async def _doctor_upcoming(doctor_id: str, db: AsyncSession, rows: RowSerializer):
+    # All future appointments regardless of status
+    result = await db.execute(queries.doctor_upcoming_appointments(doctor_id, _now(), 5))
+    return {"upcomingAppointments": rows.dump(AppointmentWithPatient, result.scalars())}
+
+
+async def _doctor_all_appointments(doctor_id: str, db: AsyncSession, rows: RowSerializer):
+    # Latest DASHBOARD_HISTORY_LIMIT appointments; the full history pages
+    # through GET /appointments?order=desc
+    result = await db.execute(queries.doctor_latest_appointments(doctor_id, settings.DASHBOARD_HISTORY_LIMIT))
+    return {"allAppointments": rows.dump(AppointmentWithPatient, result.scalars())}
+
+
+async def _doctor_stats(doctor_id: str, db: AsyncSession, rows: RowSerializer):
+    # Read from the maintained summary row instead of counting appointments
+    summary = await load_summary(db, "DOCTOR", doctor_id)
+    stats = DoctorStats(
+        totalPatientsToday=summary["todayCount"],
+        pendingLabResults=0,  # Placeholder - would need lab results model
+        recordsToReview=summary["pendingCount"],
+    )
+    return {"stats": stats.model_dump(), "summary": _summary_section(summary)}
+
+
+DOCTOR_SECTION_LOADERS = [
+    (("todaySchedule",), _doctor_today),
+    (("upcomingAppointments",), _doctor_upcoming),
+    (("allAppointments",), _doctor_all_appointments),
+    (("stats", "summary"), _doctor_stats),
+]
@@ -1,60 +1,40 @@
 from fastapi import APIRouter, Depends, HTTPException
-from sqlalchemy import select
 from sqlalchemy.ext.asyncio import AsyncSession
-from app.db.session import get_db
-from app.api.v1.endpoints.auth import get_current_user
-from app.models.user import User
+from app.core.cache import invalidate_dashboards
+from app.db import queries
+from app.db.session import begin_write, get_db, get_read_db
+from app.db.summary import record_prescription_change
+from app.api.v1.endpoints.auth import get_current_principal
+from app.schemas.token import Principal
 from app.models.prescription import Prescription
-from app.models.doctor_profile import DoctorProfile
-from app.models.patient_profile import PatientProfile
-from app.models.appointment import Appointment
 from datetime import datetime
-from pydantic import BaseModel
-from typing import Optional
+from app.schemas.prescription import PrescriptionCreate, PrescriptionResponse
+from typing import List
 import uuid
 
 router = APIRouter()
 
 
-class PrescriptionCreate(BaseModel):
-    appointmentId: str
-    patientId: str
-    medication: str
-    dosage: str
-    frequency: str
-    startDate: datetime
-    endDate: Optional[datetime] = None
-    refillsAvailable: int = 0
-    notes: Optional[str] = None
-
-
-@router.post("/")
+@router.post("/", response_model=PrescriptionResponse)
 async def create_prescription(
     prescription_data: PrescriptionCreate,
-    current_user: User = Depends(get_current_user),
+    principal: Principal = Depends(get_current_principal),
     db: AsyncSession = Depends(get_db)
 ):
     """Create a new prescription (doctors only)"""
     
     # Check if user is a doctor
-    if current_user.role != "DOCTOR":
+    if principal.role != "DOCTOR":
         raise HTTPException(status_code=403, detail="Only doctors can create prescriptions")
     
-    # Get doctor profile
-    result = await db.execute(
-        select(DoctorProfile).where(DoctorProfile.userId == current_user.id)
-    )
-    doctor = result.scalar_one_or_none()
-    
-    if not doctor:
+    if not principal.doctorId:
         raise HTTPException(status_code=404, detail="Doctor profile not found")
     
+    await begin_write(db)
+    
     # Verify the appointment exists and belongs to this doctor
     result = await db.execute(
-        select(Appointment).where(
-            Appointment.id == prescription_data.appointmentId,
-            Appointment.doctorId == doctor.id
-        )
+        queries.appointment_for_doctor(prescription_data.appointmentId, principal.doctorId)
     )
     appointment = result.scalar_one_or_none()
     
@@ -62,9 +42,7 @@ async def create_prescription(
         raise HTTPException(status_code=404, detail="Appointment not found or you don't have access")
     
     # Verify patient exists
-    result = await db.execute(
-        select(PatientProfile).where(PatientProfile.id == prescription_data.patientId)
-    )
+    result = await db.execute(queries.patient_profile_by_id(prescription_data.patientId))
     patient = result.scalar_one_or_none()
     
     if not patient:
@@ -80,7 +58,7 @@ async def create_prescription(
         endDate=prescription_data.endDate,
         refillsAvailable=prescription_data.refillsAvailable,
         patientId=prescription_data.patientId,
-        doctorId=doctor.id,
+        doctorId=principal.doctorId,
         createdAt=datetime.utcnow()
     )
     
@@ -90,73 +68,41 @@ async def create_prescription(
     if prescription_data.notes:
         appointment.notes = prescription_data.notes
     
+    await record_prescription_change(db, new_prescription)
     await db.commit()
+    invalidate_dashboards(new_prescription.patientId, new_prescription.doctorId)
     await db.refresh(new_prescription)
     
-    return {
-        "id": new_prescription.id,
-        "medication": new_prescription.medication,
-        "dosage": new_prescription.dosage,
-        "frequency": new_prescription.frequency,
-        "startDate": new_prescription.startDate.isoformat(),
-        "endDate": new_prescription.endDate.isoformat() if new_prescription.endDate else None,
-        "refillsAvailable": new_prescription.refillsAvailable,
-        "createdAt": new_prescription.createdAt.isoformat()
-    }
+    return new_prescription
 
 
-@router.get("/appointment/{appointment_id}")
+@router.get("/appointment/{appointment_id}", response_model=List[PrescriptionResponse])
 async def get_appointment_prescriptions(
     appointment_id: str,
-    current_user: User = Depends(get_current_user),
-    db: AsyncSession = Depends(get_db)
+    principal: Principal = Depends(get_current_principal),
+    db: AsyncSession = Depends(get_read_db)
 ):
     """Get all prescriptions for an appointment"""
     
     # Get the appointment
-    result = await db.execute(
-        select(Appointment).where(Appointment.id == appointment_id)
-    )
+    result = await db.execute(queries.appointment_by_id(appointment_id))
     appointment = result.scalar_one_or_none()
     
     if not appointment:
         raise HTTPException(status_code=404, detail="Appointment not found")
     
     # Check access - either the doctor or the patient
-    if current_user.role == "DOCTOR":
-        result = await db.execute(
-            select(DoctorProfile).where(DoctorProfile.userId == current_user.id)
-        )
-        doctor = result.scalar_one_or_none()
-        if not doctor or appointment.doctorId != doctor.id:
+    if principal.role == "DOCTOR":
+        if not principal.doctorId or appointment.doctorId != principal.doctorId:
             raise HTTPException(status_code=403, detail="Access denied")
     else:
-        result = await db.execute(
-            select(PatientProfile).where(PatientProfile.userId == current_user.id)
-        )
-        patient = result.scalar_one_or_none()
-        if not patient or appointment.patientId != patient.id:
+        if not principal.patientId or appointment.patientId != principal.patientId:
             raise HTTPException(status_code=403, detail="Access denied")
     
     # Get prescriptions for this patient from this appointment's doctor
     result = await db.execute(
-        select(Prescription).where(
-            Prescription.patientId == appointment.patientId,
-            Prescription.doctorId == appointment.doctorId
-        )
+        queries.prescriptions_for_patient_and_doctor(appointment.patientId, appointment.doctorId)
     )
     prescriptions = result.scalars().all()
     
-    return [
-        {
-            "id": p.id,
-            "medication": p.medication,
-            "dosage": p.dosage,
-            "frequency": p.frequency,
-            "startDate": p.startDate.isoformat(),
-            "endDate": p.endDate.isoformat() if p.endDate else None,
-            "refillsAvailable": p.refillsAvailable,
-            "createdAt": p.createdAt.isoformat()
-        }
-        for p in prescriptions
-    ]
+    return prescriptions
@@ -1,12 +1,14 @@
 from fastapi import APIRouter, Depends, HTTPException, status
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import select
 
-from app.db.session import get_db
+from app.db import queries
+from app.db.session import begin_write, get_db
 from app.models.user import User
-from app.schemas.user import UserUpdate, UserPasswordUpdate, UserResponse
-from app.api.v1.endpoints.auth import get_current_user
-from app.core.security import verify_password, get_password_hash
+from app.schemas.user import Message, UserUpdate, UserPasswordUpdate, UserResponse
+from app.api.v1.endpoints.auth import get_current_principal, revoke_refresh_tokens
+from app.schemas.token import Principal
+from app.core.security import verify_password_async, get_password_hash_async
+from app.core.cache import invalidate_principal
 
 router = APIRouter()
 
@@ -14,13 +16,18 @@ router = APIRouter()
 @router.patch("/profile", response_model=UserResponse)
 async def update_profile(
     user_update: UserUpdate,
-    current_user: User = Depends(get_current_user),
+    principal: Principal = Depends(get_current_principal),
     db: AsyncSession = Depends(get_db)
 ):
     """Update user profile"""
+    await begin_write(db)
+    user = await db.get(User, principal.id)
+    if user is None:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="User not found")
+    
     # Check if email is being changed and if it's already in use
-    if user_update.email and user_update.email != current_user.email:
-        result = await db.execute(select(User).where(User.email == user_update.email))
+    if user_update.email and user_update.email != user.email:
+        result = await db.execute(queries.user_by_email(user_update.email))
         existing_user = result.scalar_one_or_none()
         
         if existing_user:
@@ -31,32 +38,40 @@ async def update_profile(
     
     # Update fields
     if user_update.name is not None:
-        current_user.name = user_update.name
+        user.name = user_update.name
     if user_update.email is not None:
-        current_user.email = user_update.email
+        user.email = user_update.email
     if user_update.phoneNumber is not None:
-        current_user.phoneNumber = user_update.phoneNumber
+        user.phoneNumber = user_update.phoneNumber
     if user_update.age is not None:
-        current_user.age = user_update.age
+        user.age = user_update.age
     if user_update.gender is not None:
-        current_user.gender = user_update.gender
+        user.gender = user_update.gender
     
     await db.commit()
-    await db.refresh(current_user)
+    await db.refresh(user)
+    invalidate_principal(user.id)
     
-    return current_user
+    return user
 
 
-@router.patch("/password")
+@router.patch("/password", response_model=Message)
 async def update_password(
     password_update: UserPasswordUpdate,
-    current_user: User = Depends(get_current_user),
+    principal: Principal = Depends(get_current_principal),
     db: AsyncSession = Depends(get_db)
 ):
     """Update user password"""
+    user = await db.get(User, principal.id)
+    if user is None:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="User not found")
+    
+    # End the read so bcrypt does not hold the primary connection
+    await db.commit()
+    
     # Verify current password
-    if not current_user.password or not verify_password(
-        password_update.currentPassword, current_user.password
+    if not user.password or not await verify_password_async(
+        password_update.currentPassword, user.password
     ):
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
@@ -64,8 +79,12 @@ async def update_password(
         )
     
     # Update password
-    current_user.password = get_password_hash(password_update.newPassword)
+    user.password = await get_password_hash_async(password_update.newPassword)
+    
+    # Sessions started with the old password must sign in again
+    await revoke_refresh_tokens(db, user.id)
     
     await db.commit()
+    invalidate_principal(user.id)
     
     return {"message": "Password updated successfully"}
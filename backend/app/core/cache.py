@@ -0,0 +1,195 @@
+"""
+In-process caching primitives shared by the API layer.
+"""
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Hashable, Optional, Tuple
+
+from app.core.config import settings
+
+
+class TTLCache:
+    """
+    Bounded LRU cache whose entries expire after a fixed time-to-live.
+
+    Each worker process holds its own copy, so the TTL bounds how long another
+    worker can keep serving an entry after it was invalidated here.
+    """
+
+    def __init__(
+        self,
+        maxsize: int,
+        ttl: float,
+        timer: Callable[[], float] = time.monotonic,
+    ):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._timer = timer
+        self._data: "OrderedDict[Hashable, Tuple[float, Any]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.invalidations = 0
+
+    def get(self, key: Hashable, default: Any = None) -> Any:
+        """Return the cached value for key, or default if missing or expired"""
+        with self._lock:
+            entry = self._data.get(key)
+            if entry is None:
+                self.misses += 1
+                return default
+            expires_at, value = entry
+            if expires_at <= self._timer():
+                del self._data[key]
+                self.evictions += 1
+                self.misses += 1
+                return default
+            self._data.move_to_end(key)
+            self.hits += 1
+            return value
+
+    def set(self, key: Hashable, value: Any) -> None:
+        """Store value under key, evicting the least recently used entry if full"""
+        if self.maxsize <= 0:
+            return
+        with self._lock:
+            self._data[key] = (self._timer() + self.ttl, value)
+            self._data.move_to_end(key)
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+                self.evictions += 1
+
+    def invalidate(self, key: Hashable) -> bool:
+        """Drop key from the cache. Returns True if an entry was removed."""
+        with self._lock:
+            if self._data.pop(key, None) is None:
+                return False
+            self.invalidations += 1
+            return True
+
+    def clear(self) -> None:
+        """Drop every entry"""
+        with self._lock:
+            self.invalidations += len(self._data)
+            self._data.clear()
+
+    def stats(self) -> Dict[str, Any]:
+        """Snapshot of size and hit/miss/eviction counters"""
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "size": len(self._data),
+                "maxSize": self.maxsize,
+                "ttlSeconds": self.ttl,
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "invalidations": self.invalidations,
+                "hitRatio": self.hits / lookups if lookups else 0.0,
+            }
+
+
+class InvalidationLog:
+    """
+    When each key was last invalidated, so a value built from reads that
+    began earlier can be recognised as stale and left out of the cache.
+
+    Records are kept for horizon seconds; a build that began longer ago than
+    that is treated as stale as well, so pruning never loses an invalidation
+    an in-flight build still needs to see.
+    """
+
+    def __init__(self, horizon: float, timer: Callable[[], float] = time.monotonic):
+        self.horizon = horizon
+        self._timer = timer
+        self._invalidated_at: "OrderedDict[Hashable, float]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def start(self) -> float:
+        """Mark the start of a build; pass the result to is_current"""
+        return self._timer()
+
+    def invalidate(self, key: Hashable) -> None:
+        """Record that key changed now"""
+        with self._lock:
+            now = self._timer()
+            self._invalidated_at[key] = now
+            self._invalidated_at.move_to_end(key)
+            # Oldest first: drop records no build younger than horizon can need
+            while self._invalidated_at:
+                oldest_key, oldest = next(iter(self._invalidated_at.items()))
+                if now - oldest <= self.horizon:
+                    break
+                del self._invalidated_at[oldest_key]
+
+    def is_current(self, key: Hashable, started: float) -> bool:
+        """Whether key was not invalidated since started, from start()"""
+        with self._lock:
+            if self._timer() - started > self.horizon:
+                return False
+            invalidated_at = self._invalidated_at.get(key)
+            return invalidated_at is None or invalidated_at < started
+
+
+# Authenticated users keyed by user id, filled by get_current_user
+principal_cache = TTLCache(
+    maxsize=settings.PRINCIPAL_CACHE_SIZE,
+    ttl=settings.PRINCIPAL_CACHE_TTL_SECONDS,
+)
+
+
+def invalidate_principal(user_id: str) -> None:
+    """Evict a user from the principal cache after their row changes"""
+    principal_cache.invalidate(user_id)
+
+
+# /me/dashboard sections per role. Each section is cached on its own under
+# (role, profile id, section), filled by the dashboard endpoint and dropped by
+# every appointment or prescription write
+DASHBOARD_SECTIONS: Dict[str, Tuple[str, ...]] = {
+    "PATIENT": (
+        "upcomingAppointments",
+        "recentVisits",
+        "activePrescriptions",
+        "allAppointments",
+        "allVisits",
+        "allPrescriptions",
+        "summary",
+    ),
+    "DOCTOR": ("todaySchedule", "upcomingAppointments", "allAppointments", "stats", "summary"),
+}
+
+dashboard_cache = TTLCache(
+    maxsize=settings.DASHBOARD_CACHE_SIZE,
+    ttl=settings.DASHBOARD_CACHE_TTL_SECONDS,
+)
+
+# Dashboard invalidations per (role, profile id). A build that was already
+# reading when a write invalidated the profile may hold pre-write rows, so
+# cache_dashboard_section drops it instead of caching it
+dashboard_invalidations = InvalidationLog(horizon=settings.DASHBOARD_CACHE_TTL_SECONDS)
+
+
+def invalidate_dashboards(patient_id: Optional[str] = None, doctor_id: Optional[str] = None) -> None:
+    """Evict the dashboard sections of the patient and doctor involved in a write"""
+    for role, profile_id in (("PATIENT", patient_id), ("DOCTOR", doctor_id)):
+        if profile_id:
+            dashboard_invalidations.invalidate((role, profile_id))
+            for section in DASHBOARD_SECTIONS[role]:
+                dashboard_cache.invalidate((role, profile_id, section))
+
+
+def cache_dashboard_section(role: str, profile_id: str, section: str, value: Any, started: float) -> None:
+    """Cache a section built from reads begun at started, unless invalidated since"""
+    if dashboard_invalidations.is_current((role, profile_id), started):
+        dashboard_cache.set((role, profile_id, section), value)
+
+
+# Booked time ranges keyed by (doctor profile id, day), filled and kept up to
+# date by app/db/availability.py
+availability_cache = TTLCache(
+    maxsize=settings.AVAILABILITY_CACHE_SIZE,
+    ttl=settings.AVAILABILITY_CACHE_TTL_SECONDS,
+)
@@ -5,11 +5,94 @@ from typing import Optional
 class Settings(BaseSettings):
     # Database
     DATABASE_URL: str
+    # Optional read replica for read-only endpoints
+    READ_DATABASE_URL: Optional[str] = None
+    # How long a user keeps reading from the primary after they write
+    READ_YOUR_WRITES_SECONDS: int = 5
+    # File-backed SQLite: WAL pragmas on every connection, one writer
+    # connection (writes queue up to SQLITE_WRITE_QUEUE_TIMEOUT seconds)
+    # and a pool of reader connections
+    SQLITE_BUSY_TIMEOUT_MS: int = 5000
+    SQLITE_MMAP_SIZE: int = 268435456
+    SQLITE_CACHE_SIZE_KB: int = 65536
+    SQLITE_READ_POOL_SIZE: int = 4
+    SQLITE_WRITE_QUEUE_TIMEOUT: float = 30.0
+    # Apply pending migrations at worker startup (single-worker development only)
+    DB_MIGRATE_ON_STARTUP: bool = False
+    
+    # Database engine. DB_PROFILE ("development" or "production") picks pool
+    # defaults; any DB_* value set explicitly overrides the profile.
+    DB_PROFILE: str = "development"
+    DB_ECHO: bool = False
+    DB_POOL_SIZE: Optional[int] = None
+    DB_MAX_OVERFLOW: Optional[int] = None
+    DB_POOL_TIMEOUT: Optional[float] = None
+    DB_POOL_PRE_PING: Optional[bool] = None
+    DB_POOL_RECYCLE: Optional[int] = None
+    DB_STATEMENT_CACHE_SIZE: Optional[int] = None
+    # Connections one request may use at once for concurrent read queries
+    # (dashboard sections); size the pool for workers x concurrency
+    DB_FANOUT_CONCURRENCY: int = 3
+    
+    # Per-request query accounting. DEBUG adds X-DB-* headers to responses;
+    # QUERY_BUDGET caps statements per request (QUERY_BUDGET_STRICT fails the
+    # request instead of logging); QUERY_REPEAT_THRESHOLD flags N+1 patterns
+    DEBUG: bool = False
+    QUERY_BUDGET: Optional[int] = None
+    QUERY_BUDGET_STRICT: bool = False
+    QUERY_REPEAT_THRESHOLD: int = 3
     
     # Security
     SECRET_KEY: str
     ALGORITHM: str = "HS256"
     ACCESS_TOKEN_EXPIRE_MINUTES: int = 30
+    REFRESH_TOKEN_EXPIRE_DAYS: int = 14
+    # Shared secret for the /internal endpoints, sent as X-Internal-Token;
+    # while unset they answer 404
+    INTERNAL_API_TOKEN: Optional[str] = None
+    
+    # Password hashing cost. Leave BCRYPT_ROUNDS unset to use passlib's default,
+    # or calibrate it against BCRYPT_TARGET_MS (python -m app.scripts.calibrate_bcrypt)
+    BCRYPT_ROUNDS: Optional[int] = None
+    BCRYPT_MIN_ROUNDS: int = 10
+    BCRYPT_TARGET_MS: int = 250
+    BCRYPT_CALIBRATE_ON_STARTUP: bool = False
+    
+    # Password hashing pool
+    HASHING_POOL_SIZE: int = 4
+    HASHING_MAX_PENDING: int = 64
+    
+    # Login throttling
+    LOGIN_THROTTLE_ENABLED: bool = True
+    LOGIN_THROTTLE_BACKEND: str = "memory"  # "memory" or "sqlite"
+    LOGIN_THROTTLE_SQLITE_PATH: str = "login_throttle.db"
+    LOGIN_THROTTLE_ACCOUNT_ATTEMPTS: int = 10
+    LOGIN_THROTTLE_ACCOUNT_WINDOW_SECONDS: int = 300
+    LOGIN_THROTTLE_IP_ATTEMPTS: int = 50
+    LOGIN_THROTTLE_IP_WINDOW_SECONDS: int = 300
+    
+    # Dashboards: cap on the full-history lists (allAppointments etc.); the
+    # appointments endpoint serves anything older
+    DASHBOARD_HISTORY_LIMIT: int = 100
+    
+    # Doctor availability: bookable hours (UTC) and slot length for the slots
+    # endpoint. Longer appointments are rejected so overlap lookups only need
+    # to look back APPOINTMENT_MAX_DURATION_MINUTES on the date index
+    AVAILABILITY_OPEN_HOUR: int = 9
+    AVAILABILITY_CLOSE_HOUR: int = 17
+    AVAILABILITY_SLOT_MINUTES: int = 30
+    AVAILABILITY_MAX_RANGE_DAYS: int = 31
+    APPOINTMENT_MAX_DURATION_MINUTES: int = 480
+    # Cap on the appointments one recurring series may create
+    APPOINTMENT_SERIES_MAX_OCCURRENCES: int = 104
+    
+    # Caching
+    PRINCIPAL_CACHE_SIZE: int = 10000
+    PRINCIPAL_CACHE_TTL_SECONDS: int = 60
+    DASHBOARD_CACHE_SIZE: int = 10000
+    DASHBOARD_CACHE_TTL_SECONDS: int = 60
+    AVAILABILITY_CACHE_SIZE: int = 10000
+    AVAILABILITY_CACHE_TTL_SECONDS: int = 60
     
     # CORS
     FRONTEND_URL: str = "http://localhost:3000"
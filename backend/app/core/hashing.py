@@ -0,0 +1,102 @@
+"""
+Bounded worker pool for CPU-heavy password hashing.
+
+bcrypt releases the GIL while it works, so a small thread pool keeps hashing
+off the event loop without the pickling overhead of a process pool. Work is
+admitted only while fewer than max_pending calls are queued or running;
+anything beyond that is rejected immediately instead of piling up.
+"""
+import asyncio
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Dict, Optional
+
+from app.core.config import settings
+
+
+class HashingPoolBusy(Exception):
+    """Raised when the hashing pool has no room for more work"""
+
+
+class HashingPool:
+    def __init__(self, workers: int, max_pending: int):
+        self.workers = workers
+        self.max_pending = max_pending
+        self._executor: Optional[ThreadPoolExecutor] = None
+        self._lock = threading.Lock()
+        self.pending = 0
+        self.running = 0
+        self.completed = 0
+        self.rejected = 0
+        self.total_wait = 0.0
+        self.total_run = 0.0
+        self.max_wait = 0.0
+
+    def _get_executor(self) -> ThreadPoolExecutor:
+        if self._executor is None:
+            self._executor = ThreadPoolExecutor(
+                max_workers=self.workers, thread_name_prefix="hashing"
+            )
+        return self._executor
+
+    async def run(self, func: Callable[..., Any], *args: Any) -> Any:
+        """Run func(*args) on the pool, raising HashingPoolBusy when saturated"""
+        with self._lock:
+            if self.pending >= self.max_pending:
+                self.rejected += 1
+                raise HashingPoolBusy()
+            self.pending += 1
+        
+        submitted = time.perf_counter()
+        
+        def call():
+            started = time.perf_counter()
+            with self._lock:
+                self.running += 1
+            try:
+                return func(*args)
+            finally:
+                finished = time.perf_counter()
+                with self._lock:
+                    self.running -= 1
+                    self.completed += 1
+                    wait = started - submitted
+                    self.total_wait += wait
+                    self.total_run += finished - started
+                    self.max_wait = max(self.max_wait, wait)
+        
+        loop = asyncio.get_running_loop()
+        try:
+            return await loop.run_in_executor(self._get_executor(), call)
+        finally:
+            with self._lock:
+                self.pending -= 1
+
+    def shutdown(self) -> None:
+        """Stop the worker threads, waiting for in-flight work"""
+        if self._executor is not None:
+            self._executor.shutdown(wait=True)
+            self._executor = None
+
+    def stats(self) -> Dict[str, Any]:
+        """Snapshot of queue depth, throughput and latency"""
+        with self._lock:
+            completed = self.completed
+            return {
+                "workers": self.workers,
+                "maxPending": self.max_pending,
+                "queueDepth": self.pending - self.running,
+                "running": self.running,
+                "completed": completed,
+                "rejected": self.rejected,
+                "avgWaitMs": self.total_wait / completed * 1000 if completed else 0.0,
+                "avgRunMs": self.total_run / completed * 1000 if completed else 0.0,
+                "maxWaitMs": self.max_wait * 1000,
+            }
+
+
+hashing_pool = HashingPool(
+    workers=settings.HASHING_POOL_SIZE,
+    max_pending=settings.HASHING_MAX_PENDING,
+)
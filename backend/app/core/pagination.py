@@ -0,0 +1,27 @@
+"""
+Opaque keyset-pagination cursors.
+
+A cursor is the sort key of the last row on a page, JSON-encoded and
+base64url-wrapped so clients treat it as a token rather than build it.
+"""
+import base64
+import json
+from typing import Any, List
+
+
+def encode_cursor(*values: Any) -> str:
+    """Encode the sort key of the last row returned"""
+    raw = json.dumps(list(values), separators=(",", ":")).encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str, size: int) -> List[Any]:
+    """Decode a cursor holding size values; raises ValueError if it is malformed"""
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        values = json.loads(base64.urlsafe_b64decode(padded.encode()))
+    except (ValueError, TypeError) as e:
+        raise ValueError("Invalid cursor") from e
+    if not isinstance(values, list) or len(values) != size:
+        raise ValueError("Invalid cursor")
+    return values
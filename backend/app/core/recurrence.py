@@ -0,0 +1,55 @@
+"""
+Expansion of RRULE-style recurrence rules (FREQ, INTERVAL, COUNT, UNTIL).
+"""
+import calendar
+from datetime import datetime, timedelta
+from typing import List, Optional
+
+FREQUENCIES = ("DAILY", "WEEKLY", "MONTHLY")
+
+
+def _nth(start: datetime, frequency: str, steps: int) -> Optional[datetime]:
+    if frequency == "DAILY":
+        return start + timedelta(days=steps)
+    if frequency == "WEEKLY":
+        return start + timedelta(weeks=steps)
+    # MONTHLY keeps the day of the month; like RRULE, months without it are skipped
+    months = start.month - 1 + steps
+    year, month = start.year + months // 12, months % 12 + 1
+    if start.day > calendar.monthrange(year, month)[1]:
+        return None
+    return start.replace(year=year, month=month)
+
+
+def expand_recurrence(
+    start: datetime,
+    frequency: str,
+    interval: int,
+    limit: int,
+    count: Optional[int] = None,
+    until: Optional[datetime] = None,
+) -> List[datetime]:
+    """
+    Occurrences from start, in order, stopping at count or after until
+    (inclusive). Raises ValueError if the rule yields more than limit.
+    """
+    if frequency not in FREQUENCIES:
+        raise ValueError(f"Unsupported frequency {frequency}")
+    if count is None and until is None:
+        raise ValueError("A recurrence needs a count or an until date")
+    if count is not None and count > limit:
+        raise ValueError(f"A series is limited to {limit} occurrences")
+    
+    occurrences: List[datetime] = []
+    step = 0
+    while count is None or len(occurrences) < count:
+        occurrence = _nth(start, frequency, step * interval)
+        step += 1
+        if occurrence is None:
+            continue
+        if until is not None and occurrence > until:
+            break
+        if len(occurrences) == limit:
+            raise ValueError(f"A series is limited to {limit} occurrences")
+        occurrences.append(occurrence)
+    return occurrences
@@ -0,0 +1,51 @@
+"""
+In-process revocation list for access tokens.
+
+Revoked token ids (jti) are kept in a dict alongside their expiry and pruned
+once the token would have expired anyway, so the set never grows beyond the
+tokens revoked within one access-token lifetime. Each worker keeps its own
+list; a token revoked on one worker stays usable on others until it
+expires, which is why access tokens are kept short-lived.
+"""
+import threading
+import time
+from typing import Any, Dict, Optional
+
+
+class RevocationList:
+    def __init__(self, prune_interval: float = 60.0):
+        self.prune_interval = prune_interval
+        self._revoked: Dict[str, float] = {}
+        self._lock = threading.Lock()
+        self._last_prune = time.time()
+        self.pruned = 0
+
+    def revoke(self, jti: str, expires_at: float) -> None:
+        """Reject jti until expires_at (a unix timestamp)"""
+        with self._lock:
+            self._revoked[jti] = expires_at
+
+    def is_revoked(self, jti: Optional[str]) -> bool:
+        if not jti:
+            return False
+        now = time.time()
+        if now - self._last_prune >= self.prune_interval:
+            self.prune(now)
+        return jti in self._revoked
+
+    def prune(self, now: Optional[float] = None) -> int:
+        """Forget revoked tokens that have expired on their own"""
+        now = now if now is not None else time.time()
+        with self._lock:
+            self._last_prune = now
+            expired = [jti for jti, expires_at in self._revoked.items() if expires_at <= now]
+            for jti in expired:
+                del self._revoked[jti]
+            self.pruned += len(expired)
+            return len(expired)
+
+    def stats(self) -> Dict[str, Any]:
+        return {"size": len(self._revoked), "pruned": self.pruned}
+
+
+access_token_revocations = RevocationList()
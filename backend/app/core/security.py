@@ -1,16 +1,61 @@
+import hashlib
+import secrets
+import time
+import uuid
 from datetime import datetime, timedelta
-from typing import Optional, Union, Any
-from jose import jwt
+from typing import Optional, Union, Any, Dict, Tuple
+from jose import JWTError, jwt
 from passlib.context import CryptContext
+from passlib.hash import bcrypt as bcrypt_handler
 from app.core.config import settings
+from app.core.hashing import hashing_pool
+
+# passlib's own bcrypt default, used until BCRYPT_ROUNDS is set or calibrated
+DEFAULT_BCRYPT_ROUNDS = 12
 
 pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
 
 
+def configure_bcrypt_rounds(rounds: int) -> None:
+    """
+    Hash new passwords at the given cost and flag any stored hash below it
+    as needing an update. Hashes above it are left alone, so hosts that
+    calibrate to different costs never rehash back and forth.
+    """
+    pwd_context.update(bcrypt__default_rounds=rounds, bcrypt__min_rounds=rounds)
+
+
+def calibrate_bcrypt_rounds(
+    target_ms: float, min_rounds: int = 10, max_rounds: int = 16, samples: int = 3
+) -> int:
+    """
+    Benchmark bcrypt on this host and return the highest cost whose hash
+    time stays within target_ms, but never less than min_rounds.
+    Each extra round doubles the work, so one timing at min_rounds is enough
+    to estimate the rest.
+    """
+    hasher = bcrypt_handler.using(rounds=min_rounds)
+    best = float("inf")
+    for _ in range(samples):
+        started = time.perf_counter()
+        hasher.hash("calibration-password")
+        best = min(best, time.perf_counter() - started)
+    
+    rounds = min_rounds
+    while rounds < max_rounds and best * 1000 * 2 ** (rounds + 1 - min_rounds) <= target_ms:
+        rounds += 1
+    return rounds
+
+
+configure_bcrypt_rounds(settings.BCRYPT_ROUNDS or DEFAULT_BCRYPT_ROUNDS)
+
+
 def create_access_token(
-    subject: Union[str, Any], expires_delta: Optional[timedelta] = None
+    subject: Union[str, Any],
+    expires_delta: Optional[timedelta] = None,
+    claims: Optional[Dict[str, Any]] = None,
 ) -> str:
-    """Create JWT access token"""
+    """Create JWT access token, optionally embedding extra claims"""
     if expires_delta:
         expire = datetime.utcnow() + expires_delta
     else:
@@ -18,11 +63,32 @@ def create_access_token(
             minutes=settings.ACCESS_TOKEN_EXPIRE_MINUTES
         )
     
-    to_encode = {"exp": expire, "sub": str(subject)}
+    to_encode = {**(claims or {}), "exp": expire, "sub": str(subject), "jti": uuid.uuid4().hex}
     encoded_jwt = jwt.encode(to_encode, settings.SECRET_KEY, algorithm=settings.ALGORITHM)
     return encoded_jwt
 
 
+def token_subject(token: str) -> Optional[str]:
+    """The subject of a validly signed, unexpired access token, else None"""
+    try:
+        payload = jwt.decode(token, settings.SECRET_KEY, algorithms=[settings.ALGORITHM])
+    except JWTError:
+        return None
+    subject = payload.get("sub")
+    return subject if isinstance(subject, str) else None
+
+
+def create_refresh_token() -> Tuple[str, str]:
+    """Create an opaque refresh token. Returns (token, hash to store)."""
+    token = secrets.token_urlsafe(32)
+    return token, hash_refresh_token(token)
+
+
+def hash_refresh_token(token: str) -> str:
+    """Hash a refresh token for storage and lookup"""
+    return hashlib.sha256(token.encode()).hexdigest()
+
+
 def verify_password(plain_password: str, hashed_password: str) -> bool:
     """Verify a password against its hash"""
     return pwd_context.verify(plain_password, hashed_password)
@@ -31,3 +97,30 @@ def verify_password(plain_password: str, hashed_password: str) -> bool:
 def get_password_hash(password: str) -> str:
     """Hash a password"""
     return pwd_context.hash(password)
+
+
+def verify_and_update_password(
+    plain_password: str, hashed_password: str
+) -> Tuple[bool, Optional[str]]:
+    """
+    Verify a password and, if its hash uses a stale cost (see
+    CryptContext.needs_update), return a fresh hash to store in its place.
+    """
+    return pwd_context.verify_and_update(plain_password, hashed_password)
+
+
+async def verify_password_async(plain_password: str, hashed_password: str) -> bool:
+    """Verify a password on the hashing pool without blocking the event loop"""
+    return await hashing_pool.run(verify_password, plain_password, hashed_password)
+
+
+async def get_password_hash_async(password: str) -> str:
+    """Hash a password on the hashing pool without blocking the event loop"""
+    return await hashing_pool.run(get_password_hash, password)
+
+
+async def verify_and_update_password_async(
+    plain_password: str, hashed_password: str
+) -> Tuple[bool, Optional[str]]:
+    """Verify and, if needed, rehash a password on the hashing pool"""
+    return await hashing_pool.run(verify_and_update_password, plain_password, hashed_password)
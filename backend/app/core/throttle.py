@@ -0,0 +1,259 @@
+"""
+Login attempt throttling.
+
+Each attempt draws one token from a bucket for the account and one for the
+client IP. A bucket refills continuously at limit / window tokens per second,
+so it is full again (and can be forgotten) once it has gone a whole window
+without being touched. Rejection is a dictionary lookup, which is what keeps
+a credential-stuffing run from ever reaching bcrypt.
+
+Buckets live behind ThrottleBackend so that several workers on one host can
+share state through SQLiteThrottleBackend instead of each keeping their own.
+Backends that block on I/O run in a worker thread, off the event loop.
+"""
+import asyncio
+import math
+import sqlite3
+import threading
+import time
+from abc import ABC, abstractmethod
+from typing import Any, Dict, Optional, Sequence, Tuple
+
+from app.core.config import settings
+
+# (key, capacity, refill rate in tokens per second)
+BucketSpec = Tuple[str, int, float]
+
+
+class ThrottleBackend(ABC):
+    """Storage for token buckets"""
+
+    # Whether calls block on I/O, so LoginThrottle runs them in a thread
+    blocking = False
+
+    @abstractmethod
+    def consume(self, buckets: Sequence[BucketSpec], now: float) -> float:
+        """
+        Take one token from every bucket, or from none of them.
+        Returns 0 on success, otherwise the seconds until a retry can succeed.
+        """
+
+    @abstractmethod
+    def reset(self, key: str) -> None:
+        """Forget a bucket, restoring its full budget"""
+
+    @abstractmethod
+    def evict(self, now: float) -> int:
+        """Drop buckets that have refilled completely. Returns the number dropped."""
+
+    @abstractmethod
+    def size(self) -> int:
+        """Number of buckets currently tracked"""
+
+
+def _refill(
+    state: Optional[Tuple[float, float, float]], capacity: int, rate: float, now: float
+) -> float:
+    if state is None:
+        return float(capacity)
+    tokens, updated, _ = state
+    return min(float(capacity), tokens + (now - updated) * rate)
+
+
+class InMemoryThrottleBackend(ThrottleBackend):
+    """Per-process buckets stored as (tokens, updated, full_at) tuples"""
+
+    def __init__(self):
+        self._buckets: Dict[str, Tuple[float, float, float]] = {}
+        self._lock = threading.Lock()
+
+    def consume(self, buckets: Sequence[BucketSpec], now: float) -> float:
+        with self._lock:
+            levels = [
+                _refill(self._buckets.get(key), capacity, rate, now)
+                for key, capacity, rate in buckets
+            ]
+            retry_after = max(
+                ((1 - tokens) / rate for tokens, (_, _, rate) in zip(levels, buckets) if tokens < 1),
+                default=0.0,
+            )
+            if retry_after:
+                return retry_after
+            for tokens, (key, capacity, rate) in zip(levels, buckets):
+                tokens -= 1
+                self._buckets[key] = (tokens, now, now + (capacity - tokens) / rate)
+            return 0.0
+
+    def reset(self, key: str) -> None:
+        with self._lock:
+            self._buckets.pop(key, None)
+
+    def evict(self, now: float) -> int:
+        with self._lock:
+            expired = [key for key, (_, _, full_at) in self._buckets.items() if full_at <= now]
+            for key in expired:
+                del self._buckets[key]
+            return len(expired)
+
+    def size(self) -> int:
+        return len(self._buckets)
+
+
+class SQLiteThrottleBackend(ThrottleBackend):
+    """
+    Buckets in a local SQLite file, shared by every worker on the host.
+    BEGIN IMMEDIATE serializes concurrent consumers across processes.
+    """
+
+    blocking = True
+
+    def __init__(self, path: str):
+        self._conn = sqlite3.connect(
+            path, timeout=5.0, isolation_level=None, check_same_thread=False
+        )
+        self._lock = threading.Lock()
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS throttle_bucket ("
+            "key TEXT PRIMARY KEY, tokens REAL NOT NULL, "
+            "updated REAL NOT NULL, full_at REAL NOT NULL)"
+        )
+        self._conn.execute(
+            "CREATE INDEX IF NOT EXISTS ix_throttle_bucket_full_at ON throttle_bucket (full_at)"
+        )
+
+    def consume(self, buckets: Sequence[BucketSpec], now: float) -> float:
+        with self._lock:
+            cursor = self._conn.cursor()
+            cursor.execute("BEGIN IMMEDIATE")
+            try:
+                levels = []
+                for key, capacity, rate in buckets:
+                    row = cursor.execute(
+                        "SELECT tokens, updated, full_at FROM throttle_bucket WHERE key = ?",
+                        (key,),
+                    ).fetchone()
+                    levels.append(_refill(row, capacity, rate, now))
+                retry_after = max(
+                    ((1 - tokens) / rate for tokens, (_, _, rate) in zip(levels, buckets) if tokens < 1),
+                    default=0.0,
+                )
+                if not retry_after:
+                    for tokens, (key, capacity, rate) in zip(levels, buckets):
+                        tokens -= 1
+                        cursor.execute(
+                            "INSERT OR REPLACE INTO throttle_bucket (key, tokens, updated, full_at) "
+                            "VALUES (?, ?, ?, ?)",
+                            (key, tokens, now, now + (capacity - tokens) / rate),
+                        )
+                cursor.execute("COMMIT")
+                return retry_after
+            except Exception:
+                cursor.execute("ROLLBACK")
+                raise
+
+    def reset(self, key: str) -> None:
+        with self._lock:
+            self._conn.execute("DELETE FROM throttle_bucket WHERE key = ?", (key,))
+
+    def evict(self, now: float) -> int:
+        with self._lock:
+            return self._conn.execute(
+                "DELETE FROM throttle_bucket WHERE full_at <= ?", (now,)
+            ).rowcount
+
+    def size(self) -> int:
+        with self._lock:
+            return self._conn.execute("SELECT COUNT(*) FROM throttle_bucket").fetchone()[0]
+
+
+class LoginThrottle:
+    """Token-bucket budget per account and per client IP"""
+
+    def __init__(
+        self,
+        backend: ThrottleBackend,
+        account_attempts: int,
+        account_window: float,
+        ip_attempts: int,
+        ip_window: float,
+        evict_interval: float = 60.0,
+        enabled: bool = True,
+    ):
+        self.backend = backend
+        self.account_attempts = account_attempts
+        self.account_rate = account_attempts / account_window
+        self.ip_attempts = ip_attempts
+        self.ip_rate = ip_attempts / ip_window
+        self.evict_interval = evict_interval
+        self.enabled = enabled
+        self._last_evict = time.monotonic()
+        self.allowed = 0
+        self.rejected = 0
+        self.evicted = 0
+
+    @staticmethod
+    def _account_key(account: str) -> str:
+        return "acct:" + account.strip().lower()
+
+    async def _run(self, func, *args):
+        if self.backend.blocking:
+            return await asyncio.to_thread(func, *args)
+        return func(*args)
+
+    async def hit(self, account: str, client_ip: Optional[str]) -> int:
+        """
+        Record a login attempt. Returns 0 if it may proceed, otherwise the
+        number of seconds the client should wait before retrying.
+        """
+        if not self.enabled:
+            return 0
+        
+        # Wall clock rather than monotonic so the SQLite store agrees across processes
+        now = time.time()
+        buckets = [(self._account_key(account), self.account_attempts, self.account_rate)]
+        if client_ip:
+            buckets.append(("ip:" + client_ip, self.ip_attempts, self.ip_rate))
+        
+        retry_after = await self._run(self.backend.consume, buckets, now)
+        
+        if time.monotonic() - self._last_evict >= self.evict_interval:
+            self._last_evict = time.monotonic()
+            self.evicted += await self._run(self.backend.evict, now)
+        
+        if retry_after:
+            self.rejected += 1
+            return max(1, math.ceil(retry_after))
+        self.allowed += 1
+        return 0
+
+    async def reset_account(self, account: str) -> None:
+        """Restore an account's budget after a successful login"""
+        if self.enabled:
+            await self._run(self.backend.reset, self._account_key(account))
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "enabled": self.enabled,
+            "backend": type(self.backend).__name__,
+            "buckets": self.backend.size(),
+            "allowed": self.allowed,
+            "rejected": self.rejected,
+            "evicted": self.evicted,
+        }
+
+
+def _create_backend() -> ThrottleBackend:
+    if settings.LOGIN_THROTTLE_BACKEND == "sqlite":
+        return SQLiteThrottleBackend(settings.LOGIN_THROTTLE_SQLITE_PATH)
+    return InMemoryThrottleBackend()
+
+
+login_throttle = LoginThrottle(
+    backend=_create_backend(),
+    account_attempts=settings.LOGIN_THROTTLE_ACCOUNT_ATTEMPTS,
+    account_window=settings.LOGIN_THROTTLE_ACCOUNT_WINDOW_SECONDS,
+    ip_attempts=settings.LOGIN_THROTTLE_IP_ATTEMPTS,
+    ip_window=settings.LOGIN_THROTTLE_IP_WINDOW_SECONDS,
+    enabled=settings.LOGIN_THROTTLE_ENABLED,
+)
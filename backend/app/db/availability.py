@@ -0,0 +1,196 @@
+"""
+Doctor availability: booked time ranges per doctor and day, indexed for
+overlap checks and free-slot search.
+
+A BookedIntervals holds one doctor's non-canceled appointments that touch one
+day, merged into disjoint [start, end) ranges kept in two sorted lists, so
+"does [start, end) overlap a booking?" is a single bisect. Days are loaded
+from the (doctorId, appointmentDate) index, looking back
+APPOINTMENT_MAX_DURATION_MINUTES for appointments that begin the day before
+and run into it.
+
+availability_cache keeps loaded days per worker for the slots endpoint, and
+writes go through to it: a booking adds its range to the cached days,
+rescheduling or canceling evicts them. Bookings are checked against the days
+re-read from the primary in the write transaction, never against the cache,
+so a stale copy in another worker cannot let a double booking through.
+
+Concurrent bookings for the same doctor must not both pass that check, so
+is_available and find_conflicts first take the doctor's booking lock for the
+rest of the transaction (lock_doctor_schedule). Bookings for other doctors
+never wait on it.
+"""
+from bisect import bisect_left
+from datetime import date, datetime, time, timedelta, timezone
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from sqlalchemy import func, select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.cache import availability_cache
+from app.core.config import settings
+from app.db import queries
+
+
+class BookedIntervals:
+    """Merged, sorted booked ranges of one doctor on one day"""
+    
+    def __init__(self, ranges: Iterable[Tuple[datetime, datetime]] = ()):
+        self.starts: List[datetime] = []
+        self.ends: List[datetime] = []
+        for start, end in sorted(ranges):
+            if self.ends and start <= self.ends[-1]:
+                self.ends[-1] = max(self.ends[-1], end)
+            else:
+                self.starts.append(start)
+                self.ends.append(end)
+    
+    def overlaps(self, start: datetime, end: datetime) -> bool:
+        """Whether [start, end) intersects a booked range, in O(log n)"""
+        # The last range starting before end is the only one that can reach
+        # past start: the ranges are disjoint and sorted
+        i = bisect_left(self.starts, end)
+        return i > 0 and self.ends[i - 1] > start
+    
+    def add(self, start: datetime, end: datetime) -> "BookedIntervals":
+        """A copy with [start, end) booked as well"""
+        return BookedIntervals([*zip(self.starts, self.ends), (start, end)])
+
+
+def naive_utc(value: Optional[datetime]) -> Optional[datetime]:
+    """Convert an aware datetime to naive UTC, like the stored timestamps"""
+    if value is None or value.tzinfo is None:
+        return value
+    return value.astimezone(timezone.utc).replace(tzinfo=None)
+
+
+def _end(start: datetime, duration: int) -> datetime:
+    return start + timedelta(minutes=duration)
+
+
+def _days(start: datetime, end: datetime) -> List[date]:
+    """Days that [start, end) touches"""
+    last = (end - timedelta(microseconds=1)).date() if end > start else start.date()
+    return [start.date() + timedelta(days=i) for i in range((last - start.date()).days + 1)]
+
+
+async def lock_doctor_schedule(db: AsyncSession, doctor_id: str) -> None:
+    """Hold the doctor's booking lock until db's transaction commits or rolls back"""
+    if db.get_bind().dialect.name == "postgresql":
+        # Transaction-scoped advisory lock on a 64-bit hash of the profile id
+        await db.execute(select(func.pg_advisory_xact_lock(func.hashtextextended(doctor_id, 0))))
+    # SQLite needs none: the primary engine has a single connection and
+    # booking handlers open their transaction with begin_write (BEGIN
+    # IMMEDIATE), so write transactions run one at a time
+
+
+async def _load_days(
+    db: AsyncSession,
+    doctor_id: str,
+    days: List[date],
+    exclude_id: Optional[str] = None,
+) -> Dict[date, BookedIntervals]:
+    # One index range scan covering every day, plus the look-back
+    first = datetime.combine(days[0], time.min)
+    end = datetime.combine(days[-1], time.min) + timedelta(days=1)
+    lookback = timedelta(minutes=settings.APPOINTMENT_MAX_DURATION_MINUTES)
+    result = await db.execute(queries.doctor_booked_between(doctor_id, first - lookback, end))
+    
+    ranges: Dict[date, List[Tuple[datetime, datetime]]] = {day: [] for day in days}
+    for appointment_id, start, duration in result.all():
+        if appointment_id == exclude_id:
+            continue
+        booked_end = _end(start, duration)
+        for day in _days(start, booked_end):
+            if day in ranges:
+                ranges[day].append((start, booked_end))
+    return {day: BookedIntervals(day_ranges) for day, day_ranges in ranges.items()}
+
+
+async def booked_days(db: AsyncSession, doctor_id: str, start: datetime, end: datetime) -> Dict[date, BookedIntervals]:
+    """Booked ranges for every day in [start, end), from the cache where possible"""
+    days = _days(start, end)
+    booked = {}
+    missing = []
+    for day in days:
+        cached = availability_cache.get((doctor_id, day))
+        if cached is None:
+            missing.append(day)
+        else:
+            booked[day] = cached
+    
+    if missing:
+        loaded = await _load_days(db, doctor_id, missing)
+        for day, intervals in loaded.items():
+            availability_cache.set((doctor_id, day), intervals)
+        booked.update(loaded)
+    return booked
+
+
+def open_slots(booked: Dict[date, BookedIntervals], start: datetime, end: datetime, now: datetime) -> List[datetime]:
+    """Start times of free slots within bookable hours in [start, end), from now on"""
+    step = timedelta(minutes=settings.AVAILABILITY_SLOT_MINUTES)
+    earliest = max(start, now)
+    slots = []
+    for day in sorted(booked):
+        midnight = datetime.combine(day, time.min)
+        slot = midnight + timedelta(hours=settings.AVAILABILITY_OPEN_HOUR)
+        close = min(midnight + timedelta(hours=settings.AVAILABILITY_CLOSE_HOUR), end)
+        while slot + step <= close:
+            if slot >= earliest and not booked[day].overlaps(slot, slot + step):
+                slots.append(slot)
+            slot += step
+    return slots
+
+
+async def is_available(
+    db: AsyncSession,
+    doctor_id: str,
+    start: datetime,
+    duration: int,
+    exclude_id: Optional[str] = None,
+) -> bool:
+    """
+    Whether the doctor has nothing booked over [start, start + duration),
+    read fresh through db (the write session) under the doctor's booking
+    lock. exclude_id skips the appointment being rescheduled.
+    """
+    await lock_doctor_schedule(db, doctor_id)
+    end = _end(start, duration)
+    loaded = await _load_days(db, doctor_id, _days(start, end), exclude_id)
+    if exclude_id is None:
+        # Fresh copies are as good as any cached ones; record_booking adds
+        # the new range to them after commit
+        for day, intervals in loaded.items():
+            availability_cache.set((doctor_id, day), intervals)
+    return not any(intervals.overlaps(start, end) for intervals in loaded.values())
+
+
+async def find_conflicts(db: AsyncSession, doctor_id: str, starts: List[datetime], duration: int) -> List[datetime]:
+    """
+    The starts (sorted) whose [start, start + duration) overlaps a booking,
+    from one range query spanning them all, read fresh through db under the
+    doctor's booking lock.
+    """
+    await lock_doctor_schedule(db, doctor_id)
+    lookback = timedelta(minutes=settings.APPOINTMENT_MAX_DURATION_MINUTES)
+    result = await db.execute(
+        queries.doctor_booked_between(doctor_id, starts[0] - lookback, _end(starts[-1], duration))
+    )
+    booked = BookedIntervals((start, _end(start, length)) for _, start, length in result.all())
+    return [start for start in starts if booked.overlaps(start, _end(start, duration))]
+
+
+def record_booking(doctor_id: str, start: datetime, duration: int) -> None:
+    """Write a committed booking through to the cached days it touches"""
+    end = _end(start, duration)
+    for day in _days(start, end):
+        cached = availability_cache.get((doctor_id, day))
+        if cached is not None:
+            availability_cache.set((doctor_id, day), cached.add(start, end))
+
+
+def invalidate_availability(doctor_id: str, start: datetime, duration: int) -> None:
+    """Evict the cached days a rescheduled or canceled appointment touched"""
+    for day in _days(start, _end(start, duration)):
+        availability_cache.invalidate((doctor_id, day))
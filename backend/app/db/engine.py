@@ -0,0 +1,207 @@
+"""
+Engine construction from settings, with per-environment pool profiles and
+pool instrumentation.
+
+DB_PROFILE selects a set of pool defaults; any DB_* setting given explicitly
+overrides the matching profile value.
+
+File-backed SQLite gets its own profile instead: every connection runs in
+WAL mode with the SQLITE_* pragmas, the primary engine holds exactly one
+connection so writes queue for it rather than fail with "database is
+locked", and reads go to a separate pool of query-only reader connections.
+Primary transactions begin deferred unless opened with session.begin_write.
+"""
+import threading
+import time
+from typing import Any, Dict
+
+from sqlalchemy import event, exc
+from sqlalchemy.engine import make_url
+from sqlalchemy.ext.asyncio import AsyncEngine, create_async_engine
+from sqlalchemy.pool import AsyncAdaptedQueuePool
+
+from app.core.config import settings
+
+# Connection execution option that opens a SQLite transaction with BEGIN IMMEDIATE
+SQLITE_BEGIN_IMMEDIATE = "sqlite_begin_immediate"
+
+
+ENGINE_PROFILES: Dict[str, Dict[str, Any]] = {
+    "development": {
+        "pool_size": 5,
+        "max_overflow": 5,
+        "pool_timeout": 30.0,
+        "pool_pre_ping": True,
+        "pool_recycle": 1800,
+        "statement_cache_size": 100,
+    },
+    "production": {
+        "pool_size": 20,
+        "max_overflow": 10,
+        "pool_timeout": 5.0,
+        "pool_pre_ping": True,
+        "pool_recycle": 1800,
+        "statement_cache_size": 500,
+    },
+}
+
+
+class PoolMetrics:
+    """Checkout counters and wait times for one pool"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.checkouts = 0
+        self.timeouts = 0
+        self.total_wait = 0.0
+        self.max_wait = 0.0
+
+    def record(self, wait: float, timed_out: bool = False) -> None:
+        with self._lock:
+            if timed_out:
+                self.timeouts += 1
+            else:
+                self.checkouts += 1
+                self.total_wait += wait
+                self.max_wait = max(self.max_wait, wait)
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                "checkouts": self.checkouts,
+                "timeouts": self.timeouts,
+                "avgWaitMs": self.total_wait / self.checkouts * 1000 if self.checkouts else 0.0,
+                "maxWaitMs": self.max_wait * 1000,
+            }
+
+
+class InstrumentedPoolMixin:
+    """Times every checkout, including waits for a free slot and pre-ping"""
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.metrics = PoolMetrics()
+
+    def connect(self):
+        started = time.perf_counter()
+        try:
+            connection = super().connect()
+        except exc.TimeoutError:
+            self.metrics.record(time.perf_counter() - started, timed_out=True)
+            raise
+        self.metrics.record(time.perf_counter() - started)
+        return connection
+
+
+class InstrumentedAsyncQueuePool(InstrumentedPoolMixin, AsyncAdaptedQueuePool):
+    pass
+
+
+def is_sqlite_file(database_url: str) -> bool:
+    url = make_url(database_url)
+    return url.get_backend_name() == "sqlite" and bool(url.database) and url.database != ":memory:"
+
+
+def _sqlite_options(readonly: bool) -> Dict[str, Any]:
+    return {
+        "poolclass": InstrumentedAsyncQueuePool,
+        # One writer connection: concurrent writers wait in the pool queue
+        "pool_size": settings.SQLITE_READ_POOL_SIZE if readonly else 1,
+        "max_overflow": 0,
+        "pool_timeout": settings.SQLITE_WRITE_QUEUE_TIMEOUT,
+    }
+
+
+def _install_sqlite_pragmas(engine: AsyncEngine, readonly: bool) -> None:
+    @event.listens_for(engine.sync_engine, "connect")
+    def set_sqlite_pragmas(dbapi_connection, connection_record):
+        # Let SQLAlchemy's "begin" hook below decide how transactions start
+        dbapi_connection.isolation_level = None
+        cursor = dbapi_connection.cursor()
+        cursor.execute("PRAGMA journal_mode=WAL")
+        cursor.execute("PRAGMA synchronous=NORMAL")
+        cursor.execute(f"PRAGMA busy_timeout={int(settings.SQLITE_BUSY_TIMEOUT_MS)}")
+        cursor.execute(f"PRAGMA mmap_size={int(settings.SQLITE_MMAP_SIZE)}")
+        cursor.execute(f"PRAGMA cache_size={-int(settings.SQLITE_CACHE_SIZE_KB)}")
+        cursor.execute("PRAGMA foreign_keys=ON")
+        if readonly:
+            cursor.execute("PRAGMA query_only=ON")
+        cursor.close()
+    
+    @event.listens_for(engine.sync_engine, "begin")
+    def begin_transaction(conn):
+        # Deferred by default, so reads on the primary never hold the write
+        # lock. Transactions opened with begin_write (SQLITE_BEGIN_IMMEDIATE)
+        # take it up front, honouring busy_timeout, instead of failing when a
+        # deferred read transaction tries to upgrade.
+        immediate = not readonly and conn.get_execution_options().get(SQLITE_BEGIN_IMMEDIATE, False)
+        conn.exec_driver_sql("BEGIN IMMEDIATE" if immediate else "BEGIN")
+
+
+def create_engine(database_url: str, readonly: bool = False) -> AsyncEngine:
+    """Create an async engine for database_url using the configured profile"""
+    engine = create_async_engine(database_url, **engine_options(database_url, readonly))
+    if is_sqlite_file(database_url):
+        _install_sqlite_pragmas(engine, readonly)
+    return engine
+
+
+def engine_options(database_url: str, readonly: bool = False) -> Dict[str, Any]:
+    """Keyword arguments for create_async_engine for the configured profile"""
+    if settings.DB_PROFILE not in ENGINE_PROFILES:
+        raise ValueError(
+            f"Unknown DB_PROFILE {settings.DB_PROFILE!r}; "
+            f"expected one of {', '.join(ENGINE_PROFILES)}"
+        )
+    profile = dict(ENGINE_PROFILES[settings.DB_PROFILE])
+    overrides = {
+        "pool_size": settings.DB_POOL_SIZE,
+        "max_overflow": settings.DB_MAX_OVERFLOW,
+        "pool_timeout": settings.DB_POOL_TIMEOUT,
+        "pool_pre_ping": settings.DB_POOL_PRE_PING,
+        "pool_recycle": settings.DB_POOL_RECYCLE,
+        "statement_cache_size": settings.DB_STATEMENT_CACHE_SIZE,
+    }
+    profile.update({key: value for key, value in overrides.items() if value is not None})
+    
+    url = make_url(database_url)
+    options: Dict[str, Any] = {"echo": settings.DB_ECHO, "future": True}
+    
+    if is_sqlite_file(database_url):
+        options.update(_sqlite_options(readonly))
+        return options
+    if url.get_backend_name() == "sqlite":
+        # In-memory databases must keep their single StaticPool connection
+        return options
+    
+    options.update(
+        poolclass=InstrumentedAsyncQueuePool,
+        pool_size=profile["pool_size"],
+        max_overflow=profile["max_overflow"],
+        pool_timeout=profile["pool_timeout"],
+        pool_pre_ping=profile["pool_pre_ping"],
+        pool_recycle=profile["pool_recycle"],
+    )
+    if url.get_driver_name() == "asyncpg":
+        options["connect_args"] = {
+            "prepared_statement_cache_size": profile["statement_cache_size"],
+        }
+    return options
+
+
+def pool_stats(engine: AsyncEngine) -> Dict[str, Any]:
+    """Snapshot of a pool's occupancy and checkout metrics"""
+    pool = engine.pool
+    profile = "sqlite" if engine.dialect.name == "sqlite" else settings.DB_PROFILE
+    stats: Dict[str, Any] = {"pool": type(pool).__name__, "profile": profile}
+    if isinstance(pool, AsyncAdaptedQueuePool):
+        stats.update(
+            size=pool.size(),
+            checkedIn=pool.checkedin(),
+            checkedOut=pool.checkedout(),
+            overflow=pool.overflow(),
+        )
+    metrics = getattr(pool, "metrics", None)
+    if metrics is not None:
+        stats.update(metrics.stats())
+    return stats
@@ -1,17 +1,43 @@
 """
-Database initialization and table creation.
-Creates all tables based on SQLAlchemy models if they don't exist.
+Database initialization and schema versioning.
+The schema is owned by the Alembic revisions in alembic/versions; this module
+applies them and lets workers check the database is at the expected revision.
 """
 import asyncio
-from sqlalchemy.ext.asyncio import create_async_engine, AsyncSession
-from sqlalchemy.orm import sessionmaker
-from sqlalchemy import text
+from functools import lru_cache
+from pathlib import Path
+from typing import Optional
+from alembic import command
+from alembic.config import Config
+from alembic.script import ScriptDirectory
+from sqlalchemy.ext.asyncio import create_async_engine
+from sqlalchemy import inspect, text
 from app.core.config import settings
-from app.db.base import Base
 
 # Import all models to ensure they're registered with Base.metadata
 import app.db.init_models  # noqa: F401
 
+ALEMBIC_INI = Path(__file__).resolve().parents[2] / "alembic.ini"
+
+# Revisions that create_all-era databases already match: the original schema
+# is 0002, and ones that also got the RefreshToken table that way are 0003
+PRE_MIGRATIONS_REVISION = "0002"
+PRE_MIGRATIONS_REFRESH_TOKENS_REVISION = "0003"
+
+
+class SchemaVersionError(RuntimeError):
+    """Raised when the database is not at the revision this code expects"""
+
+
+def alembic_config() -> Config:
+    return Config(str(ALEMBIC_INI))
+
+
+@lru_cache(maxsize=1)
+def expected_schema_revision() -> str:
+    """Head revision of the migration scripts shipped with this code"""
+    return ScriptDirectory.from_config(alembic_config()).get_current_head()
+
 
 async def create_database_if_not_exists():
     """
@@ -62,27 +88,63 @@ async def create_database_if_not_exists():
             print("Please ensure the database exists manually.")
 
 
+async def get_schema_revision() -> Optional[str]:
+    """Revision recorded in alembic_version, or None if migrations never ran"""
+    from app.db.session import engine
+    
+    async with engine.connect() as conn:
+        try:
+            result = await conn.execute(text("SELECT version_num FROM alembic_version"))
+        except Exception:
+            return None
+        return result.scalar_one_or_none()
+
+
+async def check_schema_version():
+    """
+    Verify the database is at the migration head with a single query.
+    This is all a worker does at startup; schema changes are applied
+    out of band with `alembic upgrade head` or the setup_db script.
+    """
+    current = await get_schema_revision()
+    expected = expected_schema_revision()
+    if current != expected:
+        raise SchemaVersionError(
+            f"Database schema is at revision {current or 'none'}, expected {expected}. "
+            "Run `alembic upgrade head`."
+        )
+
+
 async def init_db():
     """
-    Initialize database by creating all tables.
-    This is idempotent - it won't recreate tables that already exist.
+    Bring the schema up to date by applying pending Alembic revisions.
+    Databases created by create_all before migrations existed are stamped
+    at the revision they already match first.
     """
     from app.db.session import engine
     
-    print("Initializing database tables...")
+    print("Applying database migrations...")
     
     try:
-        async with engine.begin() as conn:
-            # Create all tables defined in SQLAlchemy models
-            await conn.run_sync(Base.metadata.create_all)
+        async with engine.connect() as conn:
+            tables = await conn.run_sync(lambda sync_conn: inspect(sync_conn).get_table_names())
+        
+        config = alembic_config()
+        if "User" in tables and "alembic_version" not in tables:
+            if "RefreshToken" in tables:
+                revision = PRE_MIGRATIONS_REFRESH_TOKENS_REVISION
+            else:
+                revision = PRE_MIGRATIONS_REVISION
+            print(f"Existing unversioned schema found; stamping revision {revision}")
+            await asyncio.to_thread(command.stamp, config, revision)
         
-        print("Database tables initialized successfully!")
+        # env.py drives its own event loop, so run Alembic off this one
+        await asyncio.to_thread(command.upgrade, config, "head")
         
-        # Print all registered tables
-        print(f"Registered tables: {', '.join(Base.metadata.tables.keys())}")
+        print(f"Database schema at revision {expected_schema_revision()}")
         
     except Exception as e:
-        print(f"Error initializing database: {e}")
+        print(f"Error migrating database: {e}")
         raise
 
 
@@ -104,8 +166,8 @@ async def setup_database():
     """
     Complete database setup:
     1. Create database if it doesn't exist
-    2. Create tables if they don't exist
-    3. Verify connection
+    2. Verify connection
+    3. Apply pending migrations
     """
     print("=" * 60)
     print("Database Setup")
@@ -121,7 +183,7 @@ async def setup_database():
         print("Failed to connect to database. Please check your DATABASE_URL.")
         return False
     
-    # Step 3: Create tables
+    # Step 3: Apply migrations
     await init_db()
     
     print("=" * 60)
@@ -12,3 +12,5 @@ from app.models.patient_profile import PatientProfile  # noqa: F401
 from app.models.doctor_profile import DoctorProfile  # noqa: F401
 from app.models.appointment import Appointment  # noqa: F401
 from app.models.prescription import Prescription  # noqa: F401
+from app.models.refresh_token import RefreshToken  # noqa: F401
+from app.models.dashboard_summary import DashboardSummary  # noqa: F401
@@ -0,0 +1,396 @@
+"""
+Hot query shapes, defined once.
+
+Each function returns a lambda statement: SQLAlchemy builds the statement and
+its cache key the first time a given lambda runs, then reuses both, binding
+only the closure variables (ids, emails) as parameters on later calls. This
+skips the per-request cost of constructing the select() and walking it to
+compute a cache key. On PostgreSQL the compiled SQL is also stable, so the
+asyncpg prepared-statement cache (DB_STATEMENT_CACHE_SIZE) serves it too.
+
+See app/scripts/benchmark_queries.py for the per-call overhead saved.
+"""
+from sqlalchemy import lambda_stmt
+from sqlalchemy.orm import joinedload
+from sqlalchemy.sql.lambdas import StatementLambdaElement
+from sqlalchemy import and_, case, func, or_, select
+from datetime import datetime
+from typing import Optional, Tuple
+
+from app.models.user import User, UserRole
+from app.models.patient_profile import PatientProfile
+from app.models.doctor_profile import DoctorProfile
+from app.models.appointment import Appointment, AppointmentStatus
+from app.models.prescription import Prescription
+from app.models.refresh_token import RefreshToken
+from app.models.dashboard_summary import DashboardSummary
+
+
+# Users
+
+def user_by_id(user_id: str) -> StatementLambdaElement:
+    return lambda_stmt(lambda: select(User).where(User.id == user_id))
+
+
+def user_by_email(email: str) -> StatementLambdaElement:
+    return lambda_stmt(lambda: select(User).where(User.email == email))
+
+
+def _user_with_profiles():
+    # A user together with its patient/doctor profile ids in one joined query
+    return (
+        select(User, PatientProfile.id.label("patientId"), DoctorProfile.id.label("doctorId"))
+        .outerjoin(PatientProfile, PatientProfile.userId == User.id)
+        .outerjoin(DoctorProfile, DoctorProfile.userId == User.id)
+    )
+
+
+def user_with_profiles_by_id(user_id: str) -> StatementLambdaElement:
+    return lambda_stmt(lambda: _user_with_profiles().where(User.id == user_id))
+
+
+def user_with_profiles_by_email(email: str) -> StatementLambdaElement:
+    return lambda_stmt(lambda: _user_with_profiles().where(User.email == email))
+
+
+def users_by_role(role: UserRole) -> StatementLambdaElement:
+    return lambda_stmt(lambda: select(User).where(User.role == role))
+
+
+def refresh_token_by_hash(token_hash: str) -> StatementLambdaElement:
+    return lambda_stmt(lambda: select(RefreshToken).where(RefreshToken.tokenHash == token_hash))
+
+
+# Profiles
+
+def patient_profile_by_id(patient_id: str) -> StatementLambdaElement:
+    return lambda_stmt(lambda: select(PatientProfile).where(PatientProfile.id == patient_id))
+
+
+def doctor_profile_by_id(doctor_id: str) -> StatementLambdaElement:
+    return lambda_stmt(lambda: select(DoctorProfile).where(DoctorProfile.id == doctor_id))
+
+
+def dashboard_summary(profile_id: str, role: str) -> StatementLambdaElement:
+    return lambda_stmt(
+        lambda: select(DashboardSummary).where(
+            DashboardSummary.profileId == profile_id,
+            DashboardSummary.role == role,
+        )
+    )
+
+
+# Appointments
+
+def appointment_by_id(appointment_id: str) -> StatementLambdaElement:
+    return lambda_stmt(lambda: select(Appointment).where(Appointment.id == appointment_id))
+
+
+def appointment_by_id_for_update(appointment_id: str) -> StatementLambdaElement:
+    # Locks the row until commit (PostgreSQL) so concurrent updates read its status in turn
+    return lambda_stmt(
+        lambda: select(Appointment).where(Appointment.id == appointment_id).with_for_update()
+    )
+
+
+def appointment_for_doctor(appointment_id: str, doctor_id: str) -> StatementLambdaElement:
+    return lambda_stmt(
+        lambda: select(Appointment).where(
+            Appointment.id == appointment_id,
+            Appointment.doctorId == doctor_id,
+        )
+    )
+
+
+def _with_doctor_user(stmt):
+    # Many-to-one joins: one row per appointment, safe to combine with LIMIT
+    return stmt.options(
+        joinedload(Appointment.doctor, innerjoin=True).joinedload(DoctorProfile.user, innerjoin=True)
+    )
+
+
+def patient_upcoming_appointments(patient_id: str, now: datetime, limit: int) -> StatementLambdaElement:
+    """A patient's next appointments from now, soonest first, with each doctor's user"""
+    stmt = lambda_stmt(
+        lambda: select(Appointment)
+        .where(Appointment.patientId == patient_id, Appointment.appointmentDate >= now)
+        .order_by(Appointment.appointmentDate, Appointment.id)
+        .limit(limit)
+    )
+    stmt += _with_doctor_user
+    return stmt
+
+
+def patient_past_appointments(patient_id: str, now: datetime, limit: int) -> StatementLambdaElement:
+    """A patient's most recent appointments before now, latest first, with each doctor's user"""
+    stmt = lambda_stmt(
+        lambda: select(Appointment)
+        .where(Appointment.patientId == patient_id, Appointment.appointmentDate < now)
+        .order_by(Appointment.appointmentDate.desc(), Appointment.id.desc())
+        .limit(limit)
+    )
+    stmt += _with_doctor_user
+    return stmt
+
+
+def patient_latest_appointments(patient_id: str, limit: int) -> StatementLambdaElement:
+    """A patient's appointments, latest first, with each doctor's user"""
+    stmt = lambda_stmt(
+        lambda: select(Appointment)
+        .where(Appointment.patientId == patient_id)
+        .order_by(Appointment.appointmentDate.desc(), Appointment.id.desc())
+        .limit(limit)
+    )
+    stmt += _with_doctor_user
+    return stmt
+
+
+def _with_patient_user(stmt):
+    return stmt.options(
+        joinedload(Appointment.patient, innerjoin=True).joinedload(PatientProfile.user, innerjoin=True)
+    )
+
+
+def patient_appointment(appointment_id: str, patient_id: str) -> StatementLambdaElement:
+    """One of a patient's appointments, with the doctor's user"""
+    stmt = lambda_stmt(
+        lambda: select(Appointment).where(
+            Appointment.id == appointment_id,
+            Appointment.patientId == patient_id,
+        )
+    )
+    stmt += _with_doctor_user
+    return stmt
+
+
+def doctor_appointment(appointment_id: str, doctor_id: str) -> StatementLambdaElement:
+    """One of a doctor's appointments, with the patient's user"""
+    stmt = lambda_stmt(
+        lambda: select(Appointment).where(
+            Appointment.id == appointment_id,
+            Appointment.doctorId == doctor_id,
+        )
+    )
+    stmt += _with_patient_user
+    return stmt
+
+
+def _appointment_page(
+    stmt: StatementLambdaElement,
+    start: Optional[datetime],
+    end: Optional[datetime],
+    status: Optional[AppointmentStatus],
+    after: Optional[Tuple[datetime, str]],
+    descending: bool,
+) -> StatementLambdaElement:
+    # Ordering and optional filters are separate lambdas so each combination
+    # caches its own shape
+    if descending:
+        stmt += lambda s: s.order_by(Appointment.appointmentDate.desc(), Appointment.id.desc())
+    else:
+        stmt += lambda s: s.order_by(Appointment.appointmentDate, Appointment.id)
+    if start is not None:
+        stmt += lambda s: s.where(Appointment.appointmentDate >= start)
+    if end is not None:
+        stmt += lambda s: s.where(Appointment.appointmentDate < end)
+    if status is not None:
+        stmt += lambda s: s.where(Appointment.status == status)
+    if after is not None and descending:
+        after_date, after_id = after
+        stmt += lambda s: s.where(
+            or_(
+                Appointment.appointmentDate < after_date,
+                and_(Appointment.appointmentDate == after_date, Appointment.id < after_id),
+            )
+        )
+    elif after is not None:
+        after_date, after_id = after
+        stmt += lambda s: s.where(
+            or_(
+                Appointment.appointmentDate > after_date,
+                and_(Appointment.appointmentDate == after_date, Appointment.id > after_id),
+            )
+        )
+    return stmt
+
+
+def patient_appointments_page(
+    patient_id: str,
+    limit: int,
+    start: Optional[datetime] = None,
+    end: Optional[datetime] = None,
+    status: Optional[AppointmentStatus] = None,
+    after: Optional[Tuple[datetime, str]] = None,
+    descending: bool = False,
+) -> StatementLambdaElement:
+    """
+    A page of a patient's appointments in [start, end) ordered by
+    (appointmentDate, id), latest first if descending, with each doctor's
+    user. after is the (appointmentDate, id) of the last appointment on the
+    previous page.
+    """
+    stmt = lambda_stmt(
+        lambda: select(Appointment)
+        .where(Appointment.patientId == patient_id)
+        .limit(limit)
+    )
+    stmt = _appointment_page(stmt, start, end, status, after, descending)
+    stmt += _with_doctor_user
+    return stmt
+
+
+def doctor_appointments_page(
+    doctor_id: str,
+    limit: int,
+    start: Optional[datetime] = None,
+    end: Optional[datetime] = None,
+    status: Optional[AppointmentStatus] = None,
+    after: Optional[Tuple[datetime, str]] = None,
+    descending: bool = False,
+) -> StatementLambdaElement:
+    """Like patient_appointments_page, for a doctor, with each patient's user"""
+    stmt = lambda_stmt(
+        lambda: select(Appointment)
+        .where(Appointment.doctorId == doctor_id)
+        .limit(limit)
+    )
+    stmt = _appointment_page(stmt, start, end, status, after, descending)
+    stmt += _with_patient_user
+    return stmt
+
+
+def doctor_appointments_between(
+    doctor_id: str, start: datetime, end: datetime, limit: int
+) -> StatementLambdaElement:
+    """A doctor's appointments in [start, end), earliest first, with each patient's user"""
+    stmt = lambda_stmt(
+        lambda: select(Appointment)
+        .where(
+            Appointment.doctorId == doctor_id,
+            Appointment.appointmentDate >= start,
+            Appointment.appointmentDate < end,
+        )
+        .order_by(Appointment.appointmentDate, Appointment.id)
+        .limit(limit)
+    )
+    stmt += _with_patient_user
+    return stmt
+
+
+def doctor_booked_between(doctor_id: str, start: datetime, end: datetime) -> StatementLambdaElement:
+    """(id, appointmentDate, duration) of a doctor's non-canceled appointments starting in [start, end)"""
+    return lambda_stmt(
+        lambda: select(Appointment.id, Appointment.appointmentDate, Appointment.duration)
+        .where(
+            Appointment.doctorId == doctor_id,
+            Appointment.appointmentDate >= start,
+            Appointment.appointmentDate < end,
+            Appointment.status != AppointmentStatus.CANCELED,
+        )
+        .order_by(Appointment.appointmentDate)
+    )
+
+
+def doctor_upcoming_appointments(doctor_id: str, now: datetime, limit: int) -> StatementLambdaElement:
+    """A doctor's next appointments from now, soonest first, with each patient's user"""
+    stmt = lambda_stmt(
+        lambda: select(Appointment)
+        .where(Appointment.doctorId == doctor_id, Appointment.appointmentDate >= now)
+        .order_by(Appointment.appointmentDate, Appointment.id)
+        .limit(limit)
+    )
+    stmt += _with_patient_user
+    return stmt
+
+
+def doctor_latest_appointments(doctor_id: str, limit: int) -> StatementLambdaElement:
+    """A doctor's appointments, latest first, with each patient's user"""
+    stmt = lambda_stmt(
+        lambda: select(Appointment)
+        .where(Appointment.doctorId == doctor_id)
+        .order_by(Appointment.appointmentDate.desc(), Appointment.id.desc())
+        .limit(limit)
+    )
+    stmt += _with_patient_user
+    return stmt
+
+
+def doctor_patient_roster(
+    doctor_id: str,
+    now: datetime,
+    limit: int,
+    after: Optional[Tuple[str, str]] = None,
+    search: Optional[str] = None,
+) -> StatementLambdaElement:
+    """
+    Distinct patients of a doctor ordered by (name, id), with their user, the
+    latest past visit, the number of past visits (canceled excluded) and the
+    next appointment, aggregated per patient in SQL. Patients without a name
+    sort as "", so the keyset never compares against NULL.
+    
+    after is the (name or "", id) of the last patient on the previous page.
+    """
+    stmt = lambda_stmt(
+        lambda: select(
+            PatientProfile,
+            User,
+            func.max(case((
+                and_(Appointment.appointmentDate < now, Appointment.status != AppointmentStatus.CANCELED),
+                Appointment.appointmentDate,
+            ))).label("lastVisit"),
+            func.count(case((
+                and_(Appointment.appointmentDate < now, Appointment.status != AppointmentStatus.CANCELED),
+                1,
+            ))).label("visitCount"),
+            func.min(case((Appointment.appointmentDate >= now, Appointment.appointmentDate))).label("nextAppointment"),
+        )
+        .join(Appointment, Appointment.patientId == PatientProfile.id)
+        .join(User, User.id == PatientProfile.userId)
+        .where(Appointment.doctorId == doctor_id)
+        .group_by(PatientProfile.id, User.id)
+        .order_by(func.coalesce(User.name, ""), PatientProfile.id)
+        .limit(limit)
+    )
+    if after is not None:
+        after_name, after_id = after
+        stmt += lambda s: s.where(
+            or_(
+                func.coalesce(User.name, "") > after_name,
+                and_(func.coalesce(User.name, "") == after_name, PatientProfile.id > after_id),
+            )
+        )
+    if search:
+        escaped = search.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_")
+        pattern = f"%{escaped}%"
+        stmt += lambda s: s.where(
+            or_(User.name.ilike(pattern, escape="\\"), User.email.ilike(pattern, escape="\\"))
+        )
+    return stmt
+
+
+# Prescriptions
+
+def patient_active_prescriptions(patient_id: str, today: datetime, limit: int) -> StatementLambdaElement:
+    """A patient's prescriptions without an end date before today, newest first, with each doctor's user"""
+    stmt = lambda_stmt(
+        lambda: select(Prescription)
+        .where(
+            Prescription.patientId == patient_id,
+            or_(Prescription.endDate.is_(None), Prescription.endDate >= today),
+        )
+        .order_by(Prescription.createdAt.desc(), Prescription.id.desc())
+        .limit(limit)
+    )
+    stmt += lambda s: s.options(
+        joinedload(Prescription.doctor, innerjoin=True).joinedload(DoctorProfile.user, innerjoin=True)
+    )
+    return stmt
+
+
+def prescriptions_for_patient_and_doctor(patient_id: str, doctor_id: str) -> StatementLambdaElement:
+    return lambda_stmt(
+        lambda: select(Prescription).where(
+            Prescription.patientId == patient_id,
+            Prescription.doctorId == doctor_id,
+        )
+    )
@@ -0,0 +1,165 @@
+"""
+Per-request SQL statement accounting.
+
+Cursor events on each engine count the statements a request issues, the time
+spent in the database and how often the same statement text repeats (the
+usual signature of an N+1 loop). QueryStatsMiddleware scopes the counters to
+one request, adds them as X-DB-* response headers in DEBUG mode and folds
+them into per-route aggregates served from /internal/metrics.
+
+With QUERY_BUDGET set, a request that issues more statements logs a warning;
+with QUERY_BUDGET_STRICT it fails with QueryBudgetExceeded instead, which
+makes a test client request raise.
+"""
+import threading
+import time
+from collections import Counter
+from contextvars import ContextVar
+from typing import Any, Dict, Optional
+
+from sqlalchemy import event
+from sqlalchemy.ext.asyncio import AsyncEngine
+
+from app.core.config import settings
+
+
+# Transaction control; every session sends these, so repeats are not N+1s
+TRANSACTION_STATEMENTS = {"BEGIN", "COMMIT", "ROLLBACK"}
+
+
+class QueryBudgetExceeded(Exception):
+    """A request issued more statements than QUERY_BUDGET allows"""
+
+
+class RequestQueryStats:
+    """Statements issued while handling one request"""
+
+    def __init__(self, budget: Optional[int] = None):
+        self.budget = budget
+        self.count = 0
+        self.total_time = 0.0
+        self.statements: Counter = Counter()
+
+    def record(self, statement: str, elapsed: float) -> None:
+        self.count += 1
+        self.total_time += elapsed
+        self.statements[statement] += 1
+
+    def repeated(self, threshold: int) -> Dict[str, int]:
+        """Statements executed at least threshold times"""
+        return {
+            stmt: n for stmt, n in self.statements.items()
+            if n >= threshold and stmt not in TRANSACTION_STATEMENTS
+        }
+
+
+class RouteQueryStats:
+    """Aggregated statement counts per route for this worker"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._routes: Dict[str, Dict[str, Any]] = {}
+
+    def record(self, route: str, stats: RequestQueryStats, repeated: bool) -> None:
+        with self._lock:
+            entry = self._routes.setdefault(route, {
+                "requests": 0,
+                "queries": 0,
+                "maxQueries": 0,
+                "dbTime": 0.0,
+                "repeatedQueryRequests": 0,
+            })
+            entry["requests"] += 1
+            entry["queries"] += stats.count
+            entry["maxQueries"] = max(entry["maxQueries"], stats.count)
+            entry["dbTime"] += stats.total_time
+            if repeated:
+                entry["repeatedQueryRequests"] += 1
+
+    def reset(self) -> None:
+        with self._lock:
+            self._routes.clear()
+
+    def stats(self) -> Dict[str, Dict[str, Any]]:
+        with self._lock:
+            return {
+                route: {
+                    "requests": entry["requests"],
+                    "avgQueries": entry["queries"] / entry["requests"],
+                    "maxQueries": entry["maxQueries"],
+                    "avgDbMs": entry["dbTime"] / entry["requests"] * 1000,
+                    "repeatedQueryRequests": entry["repeatedQueryRequests"],
+                }
+                for route, entry in sorted(self._routes.items())
+            }
+
+
+_current: ContextVar[Optional[RequestQueryStats]] = ContextVar("request_query_stats", default=None)
+
+route_query_stats = RouteQueryStats()
+
+
+def track_queries(engine: AsyncEngine) -> None:
+    """Attach the statement counters to an engine"""
+
+    @event.listens_for(engine.sync_engine, "before_cursor_execute")
+    def before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        stats = _current.get()
+        if stats is None:
+            return
+        if settings.QUERY_BUDGET_STRICT and stats.budget is not None and stats.count >= stats.budget:
+            raise QueryBudgetExceeded(
+                f"Query budget of {stats.budget} statements exceeded; next statement: {statement}"
+            )
+        conn.info.setdefault("query_start_time", []).append(time.perf_counter())
+
+    @event.listens_for(engine.sync_engine, "after_cursor_execute")
+    def after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        stats = _current.get()
+        started = conn.info.get("query_start_time")
+        if stats is None or not started:
+            return
+        stats.record(statement, time.perf_counter() - started.pop())
+
+
+class QueryStatsMiddleware:
+    """ASGI middleware collecting RequestQueryStats for each HTTP request"""
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        stats = RequestQueryStats(budget=settings.QUERY_BUDGET)
+        token = _current.set(stats)
+        threshold = settings.QUERY_REPEAT_THRESHOLD
+
+        async def send_with_headers(message):
+            if message["type"] == "http.response.start" and settings.DEBUG:
+                headers = list(message.get("headers", []))
+                headers += [
+                    (b"x-db-query-count", str(stats.count).encode()),
+                    (b"x-db-time-ms", f"{stats.total_time * 1000:.2f}".encode()),
+                    (b"x-db-repeated-queries", str(len(stats.repeated(threshold))).encode()),
+                ]
+                message = {**message, "headers": headers}
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_with_headers)
+        finally:
+            _current.reset(token)
+            route = scope.get("route")
+            # Unmatched paths are not aggregated so that scanners cannot grow the table
+            if route is not None:
+                name = f"{scope['method']} {route.path}"
+                repeated = stats.repeated(threshold)
+                route_query_stats.record(name, stats, bool(repeated))
+                if repeated and settings.DEBUG:
+                    for statement, count in repeated.items():
+                        print(f"Warning: {name} ran the same statement {count} times: {statement}")
+                if stats.budget is not None and stats.count > stats.budget:
+                    print(f"Warning: {name} issued {stats.count} statements (budget {stats.budget})")
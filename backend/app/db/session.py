@@ -1,24 +1,143 @@
-from sqlalchemy.ext.asyncio import create_async_engine, AsyncSession
-from sqlalchemy.orm import sessionmaker
+import asyncio
+from typing import Any, Awaitable, Callable, List, Optional
+
+from fastapi import Request
+from sqlalchemy import event
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session, sessionmaker
+from app.core.cache import TTLCache
 from app.core.config import settings
+from app.core.security import token_subject
+from app.db.engine import SQLITE_BEGIN_IMMEDIATE, create_engine, is_sqlite_file
+from app.db.query_stats import track_queries
+
+engine = create_engine(settings.DATABASE_URL)
+
+# Read-only traffic goes to the replica when one is configured. A SQLite file
+# gets a pool of reader connections so reads never wait on the single writer.
+if settings.READ_DATABASE_URL:
+    read_engine = create_engine(settings.READ_DATABASE_URL, readonly=True)
+elif is_sqlite_file(settings.DATABASE_URL):
+    read_engine = create_engine(settings.DATABASE_URL, readonly=True)
+else:
+    read_engine = engine
+
+track_queries(engine)
+if read_engine is not engine:
+    track_queries(read_engine)
+
+# Only a real replica can lag behind the primary
+replica_lag = bool(settings.READ_DATABASE_URL)
+
+
+class PrimarySession(Session):
+    """Session bound to the primary; records whether it committed anything"""
+
+
+@event.listens_for(PrimarySession, "after_commit")
+def _mark_committed(session):
+    session.info["committed"] = True
 
-engine = create_async_engine(
-    settings.DATABASE_URL,
-    echo=True,
-    future=True,
-)
 
 AsyncSessionLocal = sessionmaker(
     engine,
     class_=AsyncSession,
+    sync_session_class=PrimarySession,
+    expire_on_commit=False,
+)
+
+ReadSessionLocal = sessionmaker(
+    read_engine,
+    class_=AsyncSession,
     expire_on_commit=False,
 )
 
+# Users who wrote recently read from the primary until the replica catches up.
+# Pins live in this process only, so read-your-writes holds for a single
+# worker (or a load balancer that keeps each user on one worker); with more,
+# a read served by another worker may lag by up to the replica delay.
+primary_pins = TTLCache(maxsize=100000, ttl=settings.READ_YOUR_WRITES_SECONDS)
+
+
+def _principal_id(request: Request) -> Optional[str]:
+    """The user id in the request's bearer token, if it carries a valid one"""
+    scheme, _, token = request.headers.get("Authorization", "").partition(" ")
+    if scheme.lower() != "bearer" or not token:
+        return None
+    return token_subject(token)
 
-async def get_db():
+
+async def get_db(request: Request):
     """Dependency for getting async database sessions"""
     async with AsyncSessionLocal() as session:
         try:
             yield session
+            if replica_lag and session.info.get("committed"):
+                user_id = _principal_id(request)
+                if user_id:
+                    primary_pins.set(user_id, True)
         finally:
             await session.close()
+
+
+async def begin_write(session: AsyncSession) -> None:
+    """
+    Make session's transaction a write transaction from here on; call it
+    before the first write. On SQLite that means BEGIN IMMEDIATE, so the
+    write lock is held before anything is read, and a transaction that has
+    only read so far is committed first. Other databases need nothing.
+    """
+    if session.get_bind().dialect.name != "sqlite":
+        return
+    if session.in_transaction():
+        connection = await session.connection()
+        if connection.get_execution_options().get(SQLITE_BEGIN_IMMEDIATE):
+            return
+        await session.commit()
+    await session.connection(execution_options={SQLITE_BEGIN_IMMEDIATE: True})
+
+
+def _read_session_factory(request: Request):
+    user_id = _principal_id(request)
+    if read_engine is engine or (replica_lag and user_id and primary_pins.get(user_id)):
+        return AsyncSessionLocal
+    return ReadSessionLocal
+
+
+async def get_read_db(request: Request):
+    """
+    Dependency for read-only handlers: a session on the read replica, or on
+    the primary while the caller is pinned after a recent write.
+    """
+    async with _read_session_factory(request)() as session:
+        try:
+            yield session
+        finally:
+            await session.close()
+
+
+class ReadFanout:
+    """
+    Runs independent read queries concurrently. An AsyncSession can only run
+    one statement at a time, so each query gets its own short-lived session;
+    a semaphore caps how many connections one request holds at once.
+    """
+    
+    def __init__(self, session_factory, limit: int):
+        self._session_factory = session_factory
+        self._semaphore = asyncio.Semaphore(max(1, limit))
+    
+    async def run(self, func: Callable[[AsyncSession], Awaitable[Any]]) -> Any:
+        """Run func(session) on a fresh session once a slot is free"""
+        async with self._semaphore:
+            async with self._session_factory() as session:
+                return await func(session)
+    
+    async def gather(self, *funcs: Callable[[AsyncSession], Awaitable[Any]]) -> List[Any]:
+        """Run every func(session) concurrently; results in argument order"""
+        return list(await asyncio.gather(*(self.run(func) for func in funcs)))
+
+
+async def get_read_fanout(request: Request) -> ReadFanout:
+    """Dependency for handlers that fan out independent reads (same routing as get_read_db)"""
+    return ReadFanout(_read_session_factory(request), settings.DB_FANOUT_CONCURRENCY)
@@ -0,0 +1,224 @@
+"""
+Incremental maintenance of the DashboardSummary table.
+
+Appointment and prescription writes call record_appointment_change or
+record_prescription_change before committing, so each summary row moves in
+the same transaction as the rows it summarizes. Status counters are bumped
+by deltas; the time-dependent values (next appointment, today's count,
+active prescriptions) are recomputed in the same UPDATE from subqueries over
+one profile's rows, which the (profile, appointmentDate) indexes serve.
+
+Time-dependent values also go stale without any write: the next appointment
+starts, the day rolls over, a prescription ends. Each records how long it is
+valid, and load_summary recomputes just the expired ones on read.
+
+Rows missing because a profile has never been written to since the table was
+added are computed on first use; app/scripts/rebuild_dashboard_summaries.py
+backfills or repairs all of them.
+"""
+from datetime import date, datetime, time, timedelta, timezone
+from typing import Any, Dict, Optional
+
+from sqlalchemy import and_, func, literal, or_, select, update
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.db import queries
+from app.models.appointment import Appointment, AppointmentStatus
+from app.models.dashboard_summary import DashboardSummary
+from app.models.prescription import Prescription
+
+
+STATUS_COUNTS = {
+    AppointmentStatus.SCHEDULED: "scheduledCount",
+    AppointmentStatus.COMPLETED: "completedCount",
+    AppointmentStatus.CANCELED: "canceledCount",
+    AppointmentStatus.PENDING: "pendingCount",
+}
+
+NEXT_APPOINTMENT = ("nextAppointmentId", "nextAppointmentDate")
+TODAY = ("todayStart", "todayCount")
+ACTIVE_PRESCRIPTIONS = ("activePrescriptionCount", "activePrescriptionsUntil")
+
+
+def _now() -> datetime:
+    # Naive UTC, like the stored timestamps
+    return datetime.now(timezone.utc).replace(tzinfo=None)
+
+
+def _today_start() -> datetime:
+    return datetime.combine(date.today(), time.min)
+
+
+def _owner_columns(role: str):
+    if role == "PATIENT":
+        return Appointment.patientId, Prescription.patientId
+    return Appointment.doctorId, Prescription.doctorId
+
+
+def _count_values(role: str, profile_id: str) -> Dict[str, Any]:
+    appointment_owner, _ = _owner_columns(role)
+    return {
+        column: select(func.count())
+        .select_from(Appointment)
+        .where(appointment_owner == profile_id, Appointment.status == status)
+        .scalar_subquery()
+        for status, column in STATUS_COUNTS.items()
+    }
+
+
+def _timed_values(role: str, profile_id: str, now: datetime, today_start: datetime) -> Dict[str, Any]:
+    appointment_owner, prescription_owner = _owner_columns(role)
+    upcoming = and_(
+        appointment_owner == profile_id,
+        Appointment.appointmentDate >= now,
+        Appointment.status != AppointmentStatus.CANCELED,
+    )
+    active = and_(
+        prescription_owner == profile_id,
+        or_(Prescription.endDate.is_(None), Prescription.endDate >= today_start),
+    )
+    return {
+        "nextAppointmentId": select(Appointment.id)
+        .where(upcoming)
+        .order_by(Appointment.appointmentDate, Appointment.id)
+        .limit(1)
+        .scalar_subquery(),
+        "nextAppointmentDate": select(func.min(Appointment.appointmentDate)).where(upcoming).scalar_subquery(),
+        "todayStart": literal(today_start, DashboardSummary.todayStart.type),
+        "todayCount": select(func.count())
+        .select_from(Appointment)
+        .where(
+            appointment_owner == profile_id,
+            Appointment.appointmentDate >= today_start,
+            Appointment.appointmentDate < today_start + timedelta(days=1),
+        )
+        .scalar_subquery(),
+        "activePrescriptionCount": select(func.count()).select_from(Prescription).where(active).scalar_subquery(),
+        "activePrescriptionsUntil": select(func.min(Prescription.endDate)).where(active).scalar_subquery(),
+    }
+
+
+def _insert(db: AsyncSession):
+    dialect = db.get_bind().dialect.name
+    if dialect == "postgresql":
+        from sqlalchemy.dialects.postgresql import insert
+    elif dialect == "sqlite":
+        from sqlalchemy.dialects.sqlite import insert
+    else:
+        raise NotImplementedError(f"Dashboard summaries need an upsert for {dialect}")
+    return insert(DashboardSummary)
+
+
+async def _insert_summary(db: AsyncSession, role: str, profile_id: str, replace: bool) -> int:
+    """Compute a whole summary row from the source tables; returns rows written"""
+    now = _now()
+    values = {
+        "profileId": profile_id,
+        "role": role,
+        **_count_values(role, profile_id),
+        **_timed_values(role, profile_id, now, _today_start()),
+        "updatedAt": now,
+    }
+    stmt = _insert(db).values(**values)
+    keys = [DashboardSummary.profileId, DashboardSummary.role]
+    if replace:
+        stmt = stmt.on_conflict_do_update(
+            index_elements=keys,
+            set_={name: stmt.excluded[name] for name in values if name not in ("profileId", "role")},
+        )
+    else:
+        stmt = stmt.on_conflict_do_nothing(index_elements=keys)
+    result = await db.execute(stmt)
+    return result.rowcount
+
+
+async def rebuild_summary(db: AsyncSession, role: str, profile_id: str) -> None:
+    """Recompute one profile's summary row from scratch (backfill and repair)"""
+    await _insert_summary(db, role, profile_id, replace=True)
+
+
+async def _apply(db: AsyncSession, role: str, profile_id: str, deltas: Dict[str, int]) -> None:
+    now = _now()
+    values: Dict[str, Any] = {**_timed_values(role, profile_id, now, _today_start()), "updatedAt": now}
+    for column, delta in deltas.items():
+        values[column] = getattr(DashboardSummary, column) + delta
+    
+    stmt = (
+        update(DashboardSummary)
+        .where(DashboardSummary.profileId == profile_id, DashboardSummary.role == role)
+        .values(**values)
+        .execution_options(synchronize_session=False)
+    )
+    if (await db.execute(stmt)).rowcount:
+        return
+    # No row yet: compute it, which already counts this write. If a
+    # concurrent transaction inserted it first, apply the deltas to that row.
+    if not await _insert_summary(db, role, profile_id, replace=False):
+        await db.execute(stmt)
+
+
+async def record_appointment_change(
+    db: AsyncSession,
+    appointment: Appointment,
+    previous_status: Optional[AppointmentStatus] = None,
+) -> None:
+    """Update both sides' summaries for a new or changed appointment, before commit"""
+    # Flush so the subqueries see the appointment (and its default status is set)
+    await db.flush()
+    deltas: Dict[str, int] = {}
+    if previous_status != appointment.status:
+        if previous_status is not None:
+            deltas[STATUS_COUNTS[previous_status]] = -1
+        deltas[STATUS_COUNTS[appointment.status]] = 1
+    await _apply(db, "PATIENT", appointment.patientId, deltas)
+    await _apply(db, "DOCTOR", appointment.doctorId, deltas)
+
+
+async def record_appointments_added(
+    db: AsyncSession,
+    patient_id: str,
+    doctor_id: str,
+    status: AppointmentStatus,
+    count: int,
+) -> None:
+    """Update both sides' summaries for count new appointments inserted in bulk, before commit"""
+    deltas = {STATUS_COUNTS[status]: count}
+    await _apply(db, "PATIENT", patient_id, deltas)
+    await _apply(db, "DOCTOR", doctor_id, deltas)
+
+
+async def record_prescription_change(db: AsyncSession, prescription: Prescription) -> None:
+    """Update both sides' summaries for a new prescription, before commit"""
+    await db.flush()
+    await _apply(db, "PATIENT", prescription.patientId, {})
+    await _apply(db, "DOCTOR", prescription.doctorId, {})
+
+
+async def load_summary(db: AsyncSession, role: str, profile_id: str) -> Dict[str, Any]:
+    """
+    A profile's summary values: one primary-key read, plus one query for any
+    time-dependent values that have expired (or everything if the row is missing).
+    """
+    now, today_start = _now(), _today_start()
+    result = await db.execute(queries.dashboard_summary(profile_id, role))
+    row = result.scalar_one_or_none()
+    
+    timed = _timed_values(role, profile_id, now, today_start)
+    if row is None:
+        wanted = {**_count_values(role, profile_id), **timed}
+        summary = {}
+    else:
+        summary = {column.key: getattr(row, column.key) for column in DashboardSummary.__table__.columns}
+        expired = []
+        if row.nextAppointmentDate is not None and row.nextAppointmentDate < now:
+            expired += NEXT_APPOINTMENT
+        if row.todayStart != today_start:
+            expired += TODAY
+        if row.activePrescriptionsUntil is not None and row.activePrescriptionsUntil < today_start:
+            expired += ACTIVE_PRESCRIPTIONS
+        wanted = {name: timed[name] for name in expired}
+    
+    if wanted:
+        fresh = await db.execute(select(*[expr.label(name) for name, expr in wanted.items()]))
+        summary.update(fresh.one()._asdict())
+    return summary
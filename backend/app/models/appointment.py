@@ -1,4 +1,4 @@
-from sqlalchemy import Column, String, DateTime, Integer, Enum as SQLEnum, ForeignKey
+from sqlalchemy import Column, String, DateTime, Integer, Enum as SQLEnum, ForeignKey, Index, text
 from sqlalchemy.orm import relationship
 from datetime import datetime
 import enum
@@ -28,3 +28,16 @@ class Appointment(Base):
     # Relationships
     patient = relationship("PatientProfile", back_populates="appointments")
     doctor = relationship("DoctorProfile", back_populates="appointments")
+    
+    __table_args__ = (
+        # Schedules and dashboards filter on one side of the appointment, then on date
+        Index("Appointment_doctorId_appointmentDate_idx", "doctorId", "appointmentDate"),
+        Index("Appointment_patientId_appointmentDate_idx", "patientId", "appointmentDate"),
+        # Pending appointments awaiting review, per doctor
+        Index(
+            "Appointment_doctorId_pending_idx",
+            "doctorId",
+            postgresql_where=text("status = 'PENDING'"),
+            sqlite_where=text("status = 'PENDING'"),
+        ),
+    )
@@ -0,0 +1,32 @@
+from sqlalchemy import Column, String, DateTime, Integer
+from datetime import datetime
+from app.db.base import Base
+
+
+class DashboardSummary(Base):
+    """
+    Headline dashboard numbers for one patient or doctor profile, kept up to
+    date in the same transaction as appointment and prescription writes
+    (see app/db/summary.py).
+    """
+    __tablename__ = "DashboardSummary"
+    
+    # PatientProfile.id or DoctorProfile.id, depending on role
+    profileId = Column(String, primary_key=True)
+    role = Column(String, primary_key=True)
+    
+    # Appointment counts by status
+    scheduledCount = Column(Integer, default=0, nullable=False)
+    completedCount = Column(Integer, default=0, nullable=False)
+    canceledCount = Column(Integer, default=0, nullable=False)
+    pendingCount = Column(Integer, default=0, nullable=False)
+    
+    # Time-dependent values, each valid until the moment noted
+    nextAppointmentId = Column(String, nullable=True)
+    nextAppointmentDate = Column(DateTime, nullable=True)  # until it passes
+    todayStart = Column(DateTime, nullable=True)  # todayCount is for this day only
+    todayCount = Column(Integer, default=0, nullable=False)
+    activePrescriptionCount = Column(Integer, default=0, nullable=False)
+    activePrescriptionsUntil = Column(DateTime, nullable=True)  # earliest endDate among them
+    
+    updatedAt = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow, nullable=False)
@@ -1,4 +1,4 @@
-from sqlalchemy import Column, String, DateTime, Integer, ForeignKey
+from sqlalchemy import Column, String, DateTime, Integer, ForeignKey, Index
 from sqlalchemy.orm import relationship
 from datetime import datetime
 from app.db.base import Base
@@ -21,3 +21,8 @@ class Prescription(Base):
     # Relationships
     patient = relationship("PatientProfile", back_populates="prescriptions")
     doctor = relationship("DoctorProfile", back_populates="prescriptions")
+    
+    __table_args__ = (
+        # Prescriptions for a patient, optionally narrowed to one prescribing doctor
+        Index("Prescription_patientId_doctorId_idx", "patientId", "doctorId"),
+    )
@@ -0,0 +1,15 @@
+from sqlalchemy import Column, String, DateTime, ForeignKey
+from datetime import datetime
+from app.db.base import Base
+
+
+class RefreshToken(Base):
+    __tablename__ = "RefreshToken"
+    
+    id = Column(String, primary_key=True, index=True)
+    # SHA-256 of the opaque token handed to the client; the token itself is never stored
+    tokenHash = Column(String, unique=True, index=True, nullable=False)
+    userId = Column(String, ForeignKey("User.id"), index=True, nullable=False)
+    expiresAt = Column(DateTime, nullable=False)
+    revokedAt = Column(DateTime, nullable=True)
+    createdAt = Column(DateTime, default=datetime.utcnow, nullable=False)
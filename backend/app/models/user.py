@@ -1,4 +1,4 @@
-from sqlalchemy import Column, String, DateTime, Enum as SQLEnum, Integer
+from sqlalchemy import Column, String, DateTime, Enum as SQLEnum, Integer, Index
 from sqlalchemy.orm import relationship
 from datetime import datetime
 import enum
@@ -29,3 +29,8 @@ class User(Base):
     # Relationships
     patient_profile = relationship("PatientProfile", back_populates="user", uselist=False)
     doctor_profile = relationship("DoctorProfile", back_populates="user", uselist=False)
+    
+    __table_args__ = (
+        # Doctor directory lists users by role
+        Index("User_role_idx", "role"),
+    )
@@ -1,7 +1,9 @@
-from pydantic import BaseModel
-from typing import Optional
+from pydantic import BaseModel, Field
+from typing import List, Optional, Union
 from datetime import datetime
+from app.core.config import settings
 from app.models.appointment import AppointmentStatus
+from app.schemas.dashboard import DoctorContact, PatientSummary
 
 
 class AppointmentBase(BaseModel):
@@ -12,12 +14,14 @@ class AppointmentBase(BaseModel):
 
 
 class AppointmentCreate(AppointmentBase):
+    # Bounded on input only, so responses still serialize older, longer rows
+    duration: int = Field(30, gt=0, le=settings.APPOINTMENT_MAX_DURATION_MINUTES)
     doctorId: str
 
 
 class AppointmentUpdate(BaseModel):
     appointmentDate: Optional[datetime] = None
-    duration: Optional[int] = None
+    duration: Optional[int] = Field(None, gt=0, le=settings.APPOINTMENT_MAX_DURATION_MINUTES)
     reasonForVisit: Optional[str] = None
     notes: Optional[str] = None
     status: Optional[AppointmentStatus] = None
@@ -32,3 +36,23 @@ class AppointmentResponse(AppointmentBase):
     
     class Config:
         from_attributes = True
+
+
+class PatientAppointmentItem(AppointmentResponse):
+    doctor: DoctorContact
+
+
+class DoctorAppointmentItem(AppointmentResponse):
+    patient: PatientSummary
+
+
+class AppointmentPage(BaseModel):
+    """Patients get their doctor on each item, doctors their patient"""
+    items: List[Union[PatientAppointmentItem, DoctorAppointmentItem]]
+    nextCursor: Optional[str] = None
+
+
+class AvailableSlots(BaseModel):
+    doctorId: str
+    slotMinutes: int
+    slots: List[datetime]
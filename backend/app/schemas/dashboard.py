@@ -0,0 +1,114 @@
+from pydantic import BaseModel
+from typing import Dict, List, Optional
+from datetime import datetime
+from app.models.appointment import AppointmentStatus
+from app.schemas.prescription import PrescriptionResponse
+
+
+class UserSummary(BaseModel):
+    id: str
+    name: Optional[str] = None
+    
+    class Config:
+        from_attributes = True
+
+
+class UserContact(UserSummary):
+    email: Optional[str] = None
+
+
+class DoctorSummary(BaseModel):
+    id: str
+    specialty: Optional[str] = None
+    user: UserSummary
+    
+    class Config:
+        from_attributes = True
+
+
+class DoctorContact(BaseModel):
+    id: str
+    specialty: Optional[str] = None
+    credentials: Optional[str] = None
+    user: UserContact
+    
+    class Config:
+        from_attributes = True
+
+
+class PatientSummary(BaseModel):
+    id: str
+    dateOfBirth: Optional[datetime] = None
+    address: Optional[str] = None
+    user: UserContact
+    
+    class Config:
+        from_attributes = True
+
+
+class AppointmentSummary(BaseModel):
+    id: str
+    appointmentDate: datetime
+    status: AppointmentStatus
+    reasonForVisit: Optional[str] = None
+    
+    class Config:
+        from_attributes = True
+
+
+class AppointmentWithDoctor(AppointmentSummary):
+    doctor: DoctorContact
+
+
+class AppointmentWithPatient(AppointmentSummary):
+    patient: PatientSummary
+
+
+class PrescriptionWithDoctor(PrescriptionResponse):
+    doctor: DoctorSummary
+
+
+class DoctorStats(BaseModel):
+    totalPatientsToday: int
+    pendingLabResults: int
+    recordsToReview: int
+
+
+class DashboardSummaryResponse(BaseModel):
+    """Headline numbers from the DashboardSummary table"""
+    nextAppointmentId: Optional[str] = None
+    nextAppointmentDate: Optional[datetime] = None
+    appointmentCounts: Dict[AppointmentStatus, int]
+    todayCount: int
+    activePrescriptionCount: int
+
+
+class PatientDashboard(BaseModel):
+    """Patient dashboard; only the requested sections are present"""
+    upcomingAppointments: Optional[List[AppointmentWithDoctor]] = None
+    recentVisits: Optional[List[AppointmentWithDoctor]] = None
+    activePrescriptions: Optional[List[PrescriptionWithDoctor]] = None
+    allAppointments: Optional[List[AppointmentWithDoctor]] = None
+    allVisits: Optional[List[AppointmentWithDoctor]] = None
+    allPrescriptions: Optional[List[PrescriptionWithDoctor]] = None
+    summary: Optional[DashboardSummaryResponse] = None
+
+
+class DoctorDashboard(BaseModel):
+    """Doctor dashboard; only the requested sections are present"""
+    todaySchedule: Optional[List[AppointmentWithPatient]] = None
+    upcomingAppointments: Optional[List[AppointmentWithPatient]] = None
+    allAppointments: Optional[List[AppointmentWithPatient]] = None
+    stats: Optional[DoctorStats] = None
+    summary: Optional[DashboardSummaryResponse] = None
+
+
+class PatientRosterItem(PatientSummary):
+    lastVisit: Optional[datetime] = None
+    nextAppointment: Optional[datetime] = None
+    visitCount: int
+
+
+class PatientRosterPage(BaseModel):
+    items: List[PatientRosterItem]
+    nextCursor: Optional[str] = None
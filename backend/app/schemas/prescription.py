@@ -0,0 +1,29 @@
+from pydantic import BaseModel
+from typing import Optional
+from datetime import datetime
+
+
+class PrescriptionCreate(BaseModel):
+    appointmentId: str
+    patientId: str
+    medication: str
+    dosage: str
+    frequency: str
+    startDate: datetime
+    endDate: Optional[datetime] = None
+    refillsAvailable: int = 0
+    notes: Optional[str] = None
+
+
+class PrescriptionResponse(BaseModel):
+    id: str
+    medication: str
+    dosage: str
+    frequency: str
+    startDate: datetime
+    endDate: Optional[datetime] = None
+    refillsAvailable: int
+    createdAt: datetime
+    
+    class Config:
+        from_attributes = True
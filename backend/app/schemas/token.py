@@ -1,11 +1,29 @@
 from pydantic import BaseModel
 from typing import Optional
+from app.models.user import UserRole
 
 
 class Token(BaseModel):
     access_token: str
     token_type: str
+    refresh_token: Optional[str] = None
+
+
+class RefreshRequest(BaseModel):
+    refresh_token: str
 
 
 class TokenPayload(BaseModel):
     sub: Optional[str] = None
+    role: Optional[UserRole] = None
+    pid: Optional[str] = None
+    jti: Optional[str] = None
+    exp: Optional[int] = None
+
+
+class Principal(BaseModel):
+    """Authenticated caller with the role-specific profile already resolved"""
+    id: str
+    role: UserRole
+    patientId: Optional[str] = None
+    doctorId: Optional[str] = None
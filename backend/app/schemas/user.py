@@ -30,6 +30,10 @@ class UserPasswordUpdate(BaseModel):
     newPassword: str
 
 
+class Message(BaseModel):
+    message: str
+
+
 class UserInDB(UserBase):
     id: str
     emailVerified: Optional[datetime] = None
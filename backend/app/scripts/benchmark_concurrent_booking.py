@@ -0,0 +1,154 @@
+#!/usr/bin/env python3
+"""
+Concurrency benchmark for booking appointments.
+
+Migrates a scratch database, seeds one doctor and N patients, then fires N
+bookings for that doctor at once through the ASGI app (httpx, no network):
+  - same slot: every patient asks for the same time; exactly one booking
+    may succeed, the rest must get 409
+  - distinct slots: every patient asks for a different time; all must succeed
+Each round reports bookings/second, and the Appointment table is checked for
+overlapping bookings afterwards.
+
+Usage:
+    python -m app.scripts.benchmark_concurrent_booking [bookings] [database_url]
+
+database_url defaults to a temporary SQLite file. Pass a scratch PostgreSQL
+database (postgresql+asyncpg://...) to exercise the advisory lock; the
+benchmark rows are left in it.
+"""
+
+import os
+import sys
+import asyncio
+import tempfile
+import time
+import uuid
+from datetime import datetime, timedelta
+from pathlib import Path
+
+# Add parent directory to path to allow imports
+sys.path.insert(0, str(Path(__file__).parent.parent.parent))
+
+BOOKINGS = int(sys.argv[1]) if len(sys.argv) > 1 else 200
+if len(sys.argv) > 2:
+    os.environ["DATABASE_URL"] = sys.argv[2]
+else:
+    scratch = Path(tempfile.mkdtemp()) / "booking_benchmark.db"
+    os.environ["DATABASE_URL"] = f"sqlite+aiosqlite:///{scratch}"
+os.environ.setdefault("SECRET_KEY", "booking-benchmark")
+
+import httpx
+from sqlalchemy import select
+
+from app.core.security import create_access_token
+from app.db.init_db import init_db
+from app.db.session import AsyncSessionLocal, engine, read_engine
+from app.models.user import User, UserRole
+from app.models.patient_profile import PatientProfile
+from app.models.doctor_profile import DoctorProfile
+from app.models.appointment import Appointment, AppointmentStatus
+from main import app
+
+
+async def seed(patients: int):
+    """One doctor and patients patients; returns (doctor id, patient tokens)"""
+    now = datetime.utcnow()
+    run = uuid.uuid4().hex[:8]
+    async with AsyncSessionLocal() as session:
+        doctor_user = User(id=str(uuid.uuid4()), email=f"doctor-{run}@bench.local", name="Doctor",
+                           role=UserRole.DOCTOR, createdAt=now, updatedAt=now)
+        doctor = DoctorProfile(id=str(uuid.uuid4()), userId=doctor_user.id)
+        session.add_all([doctor_user, doctor])
+        tokens = []
+        for i in range(patients):
+            user = User(id=str(uuid.uuid4()), email=f"patient{i}-{run}@bench.local", name=f"Patient {i}",
+                        role=UserRole.PATIENT, createdAt=now, updatedAt=now)
+            profile = PatientProfile(id=str(uuid.uuid4()), userId=user.id)
+            session.add_all([user, profile])
+            tokens.append(create_access_token(user.id, claims={"role": "PATIENT", "pid": profile.id}))
+        await session.commit()
+    return doctor.id, tokens
+
+
+async def book_all(client: httpx.AsyncClient, doctor_id: str, tokens, starts):
+    """Fire every booking at once; returns (status codes, seconds)"""
+    async def book(token, start):
+        response = await client.post(
+            "/api/v1/appointments/",
+            headers={"Authorization": f"Bearer {token}"},
+            json={"doctorId": doctor_id, "appointmentDate": start.isoformat(), "reasonForVisit": "benchmark"},
+        )
+        return response.status_code
+    
+    started = time.perf_counter()
+    codes = await asyncio.gather(*(book(token, start) for token, start in zip(tokens, starts)))
+    return codes, time.perf_counter() - started
+
+
+async def overlapping_bookings(doctor_id: str) -> int:
+    """Pairs of the doctor's non-canceled appointments that overlap"""
+    async with AsyncSessionLocal() as session:
+        result = await session.execute(
+            select(Appointment.appointmentDate, Appointment.duration)
+            .where(Appointment.doctorId == doctor_id, Appointment.status != AppointmentStatus.CANCELED)
+            .order_by(Appointment.appointmentDate)
+        )
+        rows = result.all()
+    overlaps = 0
+    for (start, duration), (next_start, _) in zip(rows, rows[1:]):
+        if start + timedelta(minutes=duration) > next_start:
+            overlaps += 1
+    return overlaps
+
+
+def report(name: str, codes, seconds: float, expected_created: int) -> bool:
+    created = codes.count(201)
+    conflicts = codes.count(409)
+    other = len(codes) - created - conflicts
+    ok = created == expected_created and other == 0
+    print(f"{name:16} {len(codes):8} {created:8} {conflicts:9} {other:6} {seconds:9.2f} {len(codes) / seconds:10.1f}"
+          f"   {'✅' if ok else '❌'}")
+    return ok
+
+
+async def main() -> int:
+    print(f"\n🔒 Concurrent booking benchmark: {BOOKINGS} parallel bookings per round")
+    print(f"   database: {engine.url.render_as_string(hide_password=True)}\n")
+    await init_db()
+    
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://benchmark") as client:
+        print(f"{'round':16} {'requests':>8} {'created':>8} {'conflicts':>9} {'errors':>6} {'seconds':>9} {'req/s':>10}")
+        print("-" * 76)
+    
+        base = (datetime.utcnow() + timedelta(days=30)).replace(hour=10, minute=0, second=0, microsecond=0)
+    
+        doctor_id, tokens = await seed(BOOKINGS)
+        codes, seconds = await book_all(client, doctor_id, tokens, [base] * BOOKINGS)
+        same_ok = report("same slot", codes, seconds, expected_created=1)
+        same_overlaps = await overlapping_bookings(doctor_id)
+    
+        doctor_id, tokens = await seed(BOOKINGS)
+        starts = [base + timedelta(minutes=30 * i) for i in range(BOOKINGS)]
+        codes, seconds = await book_all(client, doctor_id, tokens, starts)
+        distinct_ok = report("distinct slots", codes, seconds, expected_created=BOOKINGS)
+        distinct_overlaps = await overlapping_bookings(doctor_id)
+    
+    print("-" * 76)
+    overlaps = same_overlaps + distinct_overlaps
+    print(f"Overlapping bookings in the database: {overlaps}")
+    
+    await engine.dispose()
+    if read_engine is not engine:
+        await read_engine.dispose()
+    
+    if same_ok and distinct_ok and overlaps == 0:
+        print("✅ No double bookings")
+        return 0
+    print("❌ Booking under contention is not safe")
+    return 1
+
+
+if __name__ == "__main__":
+    sys.exit(asyncio.run(main()))
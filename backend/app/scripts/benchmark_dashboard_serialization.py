@@ -0,0 +1,166 @@
+#!/usr/bin/env python3
+"""
+Micro-benchmark for encoding a patient dashboard.
+
+Builds a patient with N appointments (half past, half upcoming) and 20
+prescriptions as in-memory ORM objects, then times turning them into a
+response body two ways:
+  - old: hand-built dicts with .isoformat() per field, one dict per
+    appointment per list it appears in, then FastAPI's default
+    jsonable_encoder + json.dumps (JSONResponse)
+  - new: each row dumped once through its response schema and shared by
+    every section, then orjson (ORJSONResponse)
+
+Both paths put every appointment in allAppointments so they encode the same
+data; the live endpoint caps that list at DASHBOARD_HISTORY_LIMIT.
+
+Usage:
+    python -m app.scripts.benchmark_dashboard_serialization [appointments] [iterations]
+"""
+
+import sys
+import time
+import uuid
+from datetime import datetime, timedelta
+from pathlib import Path
+
+# Add parent directory to path to allow imports
+sys.path.insert(0, str(Path(__file__).parent.parent.parent))
+
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import JSONResponse, ORJSONResponse
+
+from app.api.v1.endpoints.me import RowSerializer
+from app.models.user import User, UserRole
+from app.models.doctor_profile import DoctorProfile
+from app.models.appointment import Appointment, AppointmentStatus
+from app.models.prescription import Prescription
+from app.schemas.dashboard import AppointmentWithDoctor, PrescriptionWithDoctor
+
+# Import all models to ensure they're registered
+import app.db.init_models  # noqa: F401
+
+
+def build_rows(count: int):
+    now = datetime.utcnow().replace(microsecond=0)
+    doctors = []
+    for i in range(10):
+        user = User(id=str(uuid.uuid4()), name=f"Doctor {i}", email=f"doctor{i}@bench.local",
+                    role=UserRole.DOCTOR)
+        doctors.append(DoctorProfile(id=str(uuid.uuid4()), userId=user.id, specialty="General",
+                                     credentials="MD", user=user))
+    appointments = [
+        Appointment(id=str(uuid.uuid4()), appointmentDate=now + timedelta(hours=i - count // 2),
+                    status=AppointmentStatus.SCHEDULED, reasonForVisit="checkup",
+                    doctorId=doctors[i % 10].id, doctor=doctors[i % 10])
+        for i in range(count)
+    ]
+    prescriptions = [
+        Prescription(id=str(uuid.uuid4()), medication="med", dosage="1", frequency="daily",
+                     startDate=now, endDate=None, refillsAvailable=2, createdAt=now,
+                     doctorId=doctors[i % 10].id, doctor=doctors[i % 10])
+        for i in range(20)
+    ]
+    return now, appointments, prescriptions
+
+
+def old_dashboard(now, appointments, prescriptions):
+    def appointment(appt, contact=True):
+        doctor = {"id": appt.doctor.id, "specialty": appt.doctor.specialty}
+        user = {"id": appt.doctor.user.id, "name": appt.doctor.user.name}
+        if contact:
+            doctor["credentials"] = appt.doctor.credentials
+            user["email"] = appt.doctor.user.email
+        doctor["user"] = user
+        return {
+            "id": appt.id,
+            "appointmentDate": appt.appointmentDate.isoformat(),
+            "status": appt.status,
+            "reasonForVisit": appt.reasonForVisit,
+            "doctor": doctor,
+        }
+    
+    def prescription(pres):
+        return {
+            "id": pres.id,
+            "medication": pres.medication,
+            "dosage": pres.dosage,
+            "frequency": pres.frequency,
+            "startDate": pres.startDate.isoformat() if pres.startDate else None,
+            "endDate": pres.endDate.isoformat() if pres.endDate else None,
+            "refillsAvailable": pres.refillsAvailable,
+            "createdAt": pres.createdAt.isoformat(),
+            "doctor": {
+                "id": pres.doctor.id,
+                "specialty": pres.doctor.specialty,
+                "user": {"id": pres.doctor.user.id, "name": pres.doctor.user.name},
+            },
+        }
+    
+    upcoming = sorted((appointment(a) for a in appointments if a.appointmentDate >= now),
+                      key=lambda x: x["appointmentDate"])
+    visits = sorted((appointment(a) for a in appointments if a.appointmentDate < now),
+                    key=lambda x: x["appointmentDate"], reverse=True)[:5]
+    active = [prescription(p) for p in prescriptions]
+    everything = sorted((appointment(a, contact=False) for a in appointments),
+                        key=lambda x: x["appointmentDate"], reverse=True)
+    content = {
+        "upcomingAppointments": upcoming[:3],
+        "recentVisits": visits[:3],
+        "activePrescriptions": active[:5],
+        "allAppointments": everything,
+        "allVisits": visits,
+        "allPrescriptions": active,
+    }
+    return JSONResponse(jsonable_encoder(content)).body
+
+
+def new_dashboard(now, appointments, prescriptions):
+    # The queries return each list already filtered and ordered
+    upcoming = [a for a in appointments if a.appointmentDate >= now][:3]
+    past = [a for a in reversed(appointments) if a.appointmentDate < now][:5]
+    rows = RowSerializer()
+    visits = rows.dump(AppointmentWithDoctor, past)
+    active = rows.dump(PrescriptionWithDoctor, prescriptions)
+    content = {
+        "upcomingAppointments": rows.dump(AppointmentWithDoctor, upcoming),
+        "recentVisits": visits[:3],
+        "activePrescriptions": active[:5],
+        "allAppointments": rows.dump(AppointmentWithDoctor, reversed(appointments)),
+        "allVisits": visits,
+        "allPrescriptions": active,
+    }
+    return ORJSONResponse(content).body
+
+
+def per_call_ms(func, iterations: int) -> float:
+    func()
+    started = time.perf_counter()
+    for _ in range(iterations):
+        func()
+    return (time.perf_counter() - started) / iterations * 1000
+
+
+def main() -> int:
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 1000
+    iterations = int(sys.argv[2]) if len(sys.argv) > 2 else 50
+    
+    now, appointments, prescriptions = build_rows(count)
+    old_body = old_dashboard(now, appointments, prescriptions)
+    new_body = new_dashboard(now, appointments, prescriptions)
+    
+    old_ms = per_call_ms(lambda: old_dashboard(now, appointments, prescriptions), iterations)
+    new_ms = per_call_ms(lambda: new_dashboard(now, appointments, prescriptions), iterations)
+    
+    print(f"\n⏱  Patient dashboard encode, {count} appointments, {iterations} iterations\n")
+    print(f"{'path':44} {'ms/response':>12} {'bytes':>10}")
+    print("-" * 68)
+    print(f"{'old: dicts + jsonable_encoder + json':44} {old_ms:12.2f} {len(old_body):10}")
+    print(f"{'new: schema dump once per row + orjson':44} {new_ms:12.2f} {len(new_body):10}")
+    print("-" * 68)
+    print(f"Speed-up: {old_ms / new_ms:.1f}x ({old_ms - new_ms:.2f} ms saved per response)")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
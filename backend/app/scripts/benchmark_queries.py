@@ -0,0 +1,153 @@
+#!/usr/bin/env python3
+"""
+Micro-benchmark for the cached statements in app/db/queries.py.
+
+Compares building each hot query as a fresh select() (as handlers used to)
+against the lambda statements, measuring:
+  - build: constructing the statement and its cache key
+  - execute: build plus a round-trip on an in-memory SQLite database,
+    i.e. the Python overhead a request pays per query
+
+Usage:
+    python -m app.scripts.benchmark_queries [iterations]
+"""
+
+import sys
+import time
+import uuid
+from datetime import datetime
+from pathlib import Path
+
+# Add parent directory to path to allow imports
+sys.path.insert(0, str(Path(__file__).parent.parent.parent))
+
+from sqlalchemy import create_engine, select
+from sqlalchemy.orm import Session, joinedload
+
+from app.db import queries
+from app.db.base import Base
+from app.models.user import User, UserRole
+from app.models.patient_profile import PatientProfile
+from app.models.doctor_profile import DoctorProfile
+from app.models.appointment import Appointment
+from app.models.prescription import Prescription
+
+# Import all models to ensure they're registered
+import app.db.init_models  # noqa: F401
+
+
+def _user_with_profiles():
+    return (
+        select(User, PatientProfile.id.label("patientId"), DoctorProfile.id.label("doctorId"))
+        .outerjoin(PatientProfile, PatientProfile.userId == User.id)
+        .outerjoin(DoctorProfile, DoctorProfile.userId == User.id)
+    )
+
+
+def hot_shapes(ids):
+    """(name, fresh select() builder, cached statement builder) for each hot query"""
+    return [
+        (
+            "user by id",
+            lambda: select(User).where(User.id == ids["user"]),
+            lambda: queries.user_by_id(ids["user"]),
+        ),
+        (
+            "user + profiles by email",
+            lambda: _user_with_profiles().where(User.email == ids["email"]),
+            lambda: queries.user_with_profiles_by_email(ids["email"]),
+        ),
+        (
+            "appointment page by patient",
+            lambda: select(Appointment)
+            .where(Appointment.patientId == ids["patient"])
+            .order_by(Appointment.appointmentDate, Appointment.id)
+            .limit(51)
+            .options(joinedload(Appointment.doctor, innerjoin=True).joinedload(DoctorProfile.user, innerjoin=True)),
+            lambda: queries.patient_appointments_page(ids["patient"], 51),
+        ),
+        (
+            "appointment page by doctor",
+            lambda: select(Appointment)
+            .where(Appointment.doctorId == ids["doctor"])
+            .order_by(Appointment.appointmentDate, Appointment.id)
+            .limit(51)
+            .options(joinedload(Appointment.patient, innerjoin=True).joinedload(PatientProfile.user, innerjoin=True)),
+            lambda: queries.doctor_appointments_page(ids["doctor"], 51),
+        ),
+        (
+            "prescriptions by patient+doctor",
+            lambda: select(Prescription).where(
+                Prescription.patientId == ids["patient"],
+                Prescription.doctorId == ids["doctor"],
+            ),
+            lambda: queries.prescriptions_for_patient_and_doctor(ids["patient"], ids["doctor"]),
+        ),
+    ]
+
+
+def seed(session: Session) -> dict:
+    now = datetime.utcnow()
+    patient_user = User(id=str(uuid.uuid4()), email="patient@bench.local", role=UserRole.PATIENT,
+                        createdAt=now, updatedAt=now)
+    doctor_user = User(id=str(uuid.uuid4()), email="doctor@bench.local", role=UserRole.DOCTOR,
+                       createdAt=now, updatedAt=now)
+    patient = PatientProfile(id=str(uuid.uuid4()), userId=patient_user.id)
+    doctor = DoctorProfile(id=str(uuid.uuid4()), userId=doctor_user.id)
+    session.add_all([patient_user, doctor_user, patient, doctor])
+    for i in range(5):
+        session.add(Appointment(id=str(uuid.uuid4()), appointmentDate=now, duration=30,
+                                reasonForVisit="checkup", patientId=patient.id, doctorId=doctor.id))
+        session.add(Prescription(id=str(uuid.uuid4()), medication="med", dosage="1", frequency="daily",
+                                 startDate=now, patientId=patient.id, doctorId=doctor.id))
+    session.commit()
+    return {"user": patient_user.id, "email": patient_user.email,
+            "patient": patient.id, "doctor": doctor.id}
+
+
+def per_call_us(func, iterations: int) -> float:
+    for _ in range(min(iterations, 200)):
+        func()
+    started = time.perf_counter()
+    for _ in range(iterations):
+        func()
+    return (time.perf_counter() - started) / iterations * 1e6
+
+
+def main() -> int:
+    iterations = int(sys.argv[1]) if len(sys.argv) > 1 else 2000
+    
+    engine = create_engine("sqlite://")
+    Base.metadata.create_all(engine)
+    
+    with Session(engine) as session:
+        ids = seed(session)
+        
+        print(f"\n⏱  Per-call Python overhead, {iterations} iterations (µs)\n")
+        print(f"{'query':34} {'build':>16} {'execute':>18}")
+        print(f"{'':34} {'select  lambda':>16} {'select   lambda':>18}")
+        print("-" * 70)
+        
+        totals = [0.0, 0.0, 0.0, 0.0]
+        for name, fresh, cached in hot_shapes(ids):
+            timings = [
+                per_call_us(lambda: fresh()._generate_cache_key(), iterations),
+                per_call_us(lambda: cached()._generate_cache_key(), iterations),
+                per_call_us(lambda: session.execute(fresh()).all(), iterations),
+                per_call_us(lambda: session.execute(cached()).all(), iterations),
+            ]
+            session.expunge_all()
+            totals = [t + s for t, s in zip(totals, timings)]
+            print(f"{name:34} {timings[0]:7.1f} {timings[1]:7.1f}  {timings[2]:8.1f} {timings[3]:8.1f}")
+        
+        print("-" * 70)
+        print(f"{'all hot queries':34} {totals[0]:7.1f} {totals[1]:7.1f}  {totals[2]:8.1f} {totals[3]:8.1f}")
+        print(f"\nSaved per request running each hot query once: "
+              f"{totals[2] - totals[3]:.1f} µs ({(1 - totals[3] / totals[2]) * 100:.0f}%)")
+    
+    engine.dispose()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
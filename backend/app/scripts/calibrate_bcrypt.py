@@ -0,0 +1,42 @@
+#!/usr/bin/env python3
+"""
+Benchmark bcrypt on this host and recommend a cost factor.
+
+Prints the highest BCRYPT_ROUNDS whose hash time fits the target latency.
+Pin the result in .env so every worker hashes at the same cost; existing
+hashes below it are upgraded transparently on the next successful login.
+
+Usage:
+    python -m app.scripts.calibrate_bcrypt [target_ms]
+"""
+
+import sys
+import time
+from pathlib import Path
+
+# Add parent directory to path to allow imports
+sys.path.insert(0, str(Path(__file__).parent.parent.parent))
+
+from app.core.config import settings
+from app.core.security import calibrate_bcrypt_rounds
+from passlib.hash import bcrypt as bcrypt_handler
+
+
+def main() -> int:
+    target_ms = float(sys.argv[1]) if len(sys.argv) > 1 else settings.BCRYPT_TARGET_MS
+    
+    print(f"\n🔐 Calibrating bcrypt for a {target_ms:.0f} ms target...\n")
+    rounds = calibrate_bcrypt_rounds(target_ms, settings.BCRYPT_MIN_ROUNDS)
+    
+    # Confirm the estimate with a real hash at the chosen cost
+    started = time.perf_counter()
+    bcrypt_handler.using(rounds=rounds).hash("calibration-password")
+    elapsed_ms = (time.perf_counter() - started) * 1000
+    
+    print(f"✓ {rounds} rounds takes {elapsed_ms:.0f} ms on this host")
+    print(f"\nAdd to .env:\n  BCRYPT_ROUNDS={rounds}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,194 @@
+#!/usr/bin/env python3
+"""
+Regression checks for API invariants.
+
+Migrates a scratch database, seeds a doctor and a patient, then drives the
+ASGI app (httpx, no network) through each check below and reports pass/fail:
+  - roster cursor: a well-formed cursor holding non-strings is a 400
+  - summary: a canceled appointment is never the next appointment
+  - summary: concurrent status updates move each counter once
+  - series booking: all occurrences go in one multi-row INSERT statement
+
+Usage:
+    python -m app.scripts.check_invariants [database_url]
+
+database_url defaults to a temporary SQLite file. Pass a scratch PostgreSQL
+database (postgresql+asyncpg://...) to check against it; the rows are left
+in it.
+"""
+
+import os
+import sys
+import asyncio
+import tempfile
+import uuid
+from datetime import datetime, timedelta
+from pathlib import Path
+
+# Add parent directory to path to allow imports
+sys.path.insert(0, str(Path(__file__).parent.parent.parent))
+
+if len(sys.argv) > 1:
+    os.environ["DATABASE_URL"] = sys.argv[1]
+else:
+    scratch = Path(tempfile.mkdtemp()) / "check_invariants.db"
+    os.environ["DATABASE_URL"] = f"sqlite+aiosqlite:///{scratch}"
+os.environ.setdefault("SECRET_KEY", "check-invariants")
+
+import httpx
+from sqlalchemy import event
+
+from app.core.pagination import encode_cursor
+from app.core.security import create_access_token
+from app.db.init_db import init_db
+from app.db.session import AsyncSessionLocal, engine, read_engine
+from app.models.user import User, UserRole
+from app.models.patient_profile import PatientProfile
+from app.models.doctor_profile import DoctorProfile
+from main import app
+
+CHECKS = []
+
+
+def check(func):
+    """Register func(client, seeded) -> (ok, detail) as a check"""
+    CHECKS.append(func)
+    return func
+
+
+async def seed() -> dict:
+    """One doctor and one patient; returns their profile ids and auth headers"""
+    now = datetime.utcnow()
+    run = uuid.uuid4().hex[:8]
+    async with AsyncSessionLocal() as session:
+        doctor_user = User(id=str(uuid.uuid4()), email=f"doctor-{run}@check.local", name="Doctor",
+                           role=UserRole.DOCTOR, createdAt=now, updatedAt=now)
+        doctor = DoctorProfile(id=str(uuid.uuid4()), userId=doctor_user.id)
+        patient_user = User(id=str(uuid.uuid4()), email=f"patient-{run}@check.local", name="Patient",
+                            role=UserRole.PATIENT, createdAt=now, updatedAt=now)
+        patient = PatientProfile(id=str(uuid.uuid4()), userId=patient_user.id)
+        session.add_all([doctor_user, doctor, patient_user, patient])
+        await session.commit()
+    
+    def headers(user: User, profile_id: str):
+        token = create_access_token(user.id, claims={"role": user.role.value, "pid": profile_id})
+        return {"Authorization": f"Bearer {token}"}
+    
+    return {
+        "doctorId": doctor.id,
+        "patientId": patient.id,
+        "doctor": headers(doctor_user, doctor.id),
+        "patient": headers(patient_user, patient.id),
+    }
+
+
+@check
+async def roster_rejects_tampered_cursor(client: httpx.AsyncClient, seeded: dict):
+    response = await client.get(
+        "/api/v1/me/patients", headers=seeded["doctor"], params={"cursor": encode_cursor(1, 2)}
+    )
+    return response.status_code == 400, f"status {response.status_code}"
+
+
+async def book(client: httpx.AsyncClient, seeded: dict, days_ahead: int) -> dict:
+    """Book the seeded patient with the seeded doctor at 10:00 UTC, days_ahead from today"""
+    when = datetime.combine(datetime.utcnow().date() + timedelta(days=days_ahead), datetime.min.time())
+    response = await client.post(
+        "/api/v1/appointments/",
+        headers=seeded["patient"],
+        json={
+            "doctorId": seeded["doctorId"],
+            "appointmentDate": (when + timedelta(hours=10)).isoformat(),
+            "reasonForVisit": "Check-up",
+        },
+    )
+    response.raise_for_status()
+    return response.json()
+
+
+async def summary(client: httpx.AsyncClient, headers: dict) -> dict:
+    response = await client.get("/api/v1/me/dashboard", headers=headers, params={"sections": "summary"})
+    response.raise_for_status()
+    return response.json()["summary"]
+
+
+@check
+async def summary_skips_canceled_next_appointment(client: httpx.AsyncClient, seeded: dict):
+    appointment = await book(client, seeded, 1)
+    response = await client.patch(
+        f"/api/v1/appointments/{appointment['id']}", headers=seeded["patient"], json={"status": "CANCELED"}
+    )
+    response.raise_for_status()
+    next_ids = [(await summary(client, seeded[side]))["nextAppointmentId"] for side in ("patient", "doctor")]
+    return next_ids == [None, None], f"nextAppointmentId {next_ids}"
+
+
+@check
+async def summary_counts_concurrent_status_updates(client: httpx.AsyncClient, seeded: dict):
+    appointment = await book(client, seeded, 2)
+    url = f"/api/v1/appointments/{appointment['id']}"
+    await asyncio.gather(*(
+        client.patch(url, headers=seeded["doctor"], json={"status": status})
+        for status in ("SCHEDULED", "CANCELED", "COMPLETED", "SCHEDULED")
+    ))
+    counts = (await summary(client, seeded["doctor"]))["appointmentCounts"]
+    final = (await client.get(url, headers=seeded["doctor"])).json()["status"]
+    expected = {status: int(status == final) for status in counts}
+    return counts == expected, f"counts {counts}, status {final}"
+
+
+@check
+async def series_inserts_in_one_statement(client: httpx.AsyncClient, seeded: dict):
+    inserts = []
+    
+    def record(conn, cursor, statement, parameters, context, executemany):
+        if statement.startswith('INSERT INTO "Appointment"'):
+            inserts.append((statement.count("VALUES (") + statement.count("), ("), executemany))
+    
+    first = datetime.combine(datetime.utcnow().date() + timedelta(days=3), datetime.min.time())
+    event.listen(engine.sync_engine, "before_cursor_execute", record)
+    try:
+        response = await client.post(
+            "/api/v1/appointments/doctor/series",
+            headers=seeded["doctor"],
+            json={
+                "patientId": seeded["patientId"],
+                "appointmentDate": (first + timedelta(hours=10)).isoformat(),
+                "reasonForVisit": "Follow-up",
+                "frequency": "WEEKLY",
+                "count": 5,
+            },
+        )
+    finally:
+        event.remove(engine.sync_engine, "before_cursor_execute", record)
+    ok = response.status_code == 201 and inserts == [(5, False)]
+    return ok, f"status {response.status_code}, (rows, executemany) per INSERT {inserts}"
+
+
+async def main() -> int:
+    print("\n🔎 API invariant checks")
+    print(f"   database: {engine.url.render_as_string(hide_password=True)}\n")
+    await init_db()
+    
+    failed = 0
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://check") as client:
+        for func in CHECKS:
+            seeded = await seed()
+            ok, detail = await func(client, seeded)
+            failed += not ok
+            print(f"{'✅' if ok else '❌'} {func.__name__:40} {detail}")
+    
+    await engine.dispose()
+    if read_engine is not engine:
+        await read_engine.dispose()
+    
+    if failed:
+        print(f"\n❌ {failed} of {len(CHECKS)} checks failed")
+        return 1
+    print(f"\n✅ All {len(CHECKS)} checks passed")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(asyncio.run(main()))
@@ -0,0 +1,62 @@
+#!/usr/bin/env python3
+"""
+Rebuild the DashboardSummary table from appointments and prescriptions.
+
+Writes keep summaries current incrementally; run this once after migration
+0005 to backfill existing profiles, or any time to repair drift.
+
+Usage:
+    python -m app.scripts.rebuild_dashboard_summaries [batch_size]
+"""
+
+import sys
+import asyncio
+from pathlib import Path
+
+# Add parent directory to path to allow imports
+sys.path.insert(0, str(Path(__file__).parent.parent.parent))
+
+from sqlalchemy import select
+
+from app.db.session import AsyncSessionLocal, engine
+from app.db.summary import rebuild_summary
+from app.models.patient_profile import PatientProfile
+from app.models.doctor_profile import DoctorProfile
+
+# Import all models to ensure they're registered
+import app.db.init_models  # noqa: F401
+
+
+async def rebuild(role: str, model, batch_size: int) -> int:
+    """Rebuild every summary for one role, committing per batch"""
+    async with AsyncSessionLocal() as session:
+        profile_ids = (await session.execute(select(model.id).order_by(model.id))).scalars().all()
+    
+    for start in range(0, len(profile_ids), batch_size):
+        async with AsyncSessionLocal() as session:
+            for profile_id in profile_ids[start:start + batch_size]:
+                await rebuild_summary(session, role, profile_id)
+            await session.commit()
+        print(f"   {role.lower()}s: {min(start + batch_size, len(profile_ids))}/{len(profile_ids)}")
+    return len(profile_ids)
+
+
+async def main() -> int:
+    batch_size = int(sys.argv[1]) if len(sys.argv) > 1 else 500
+    print("\n🏥 Rebuilding dashboard summaries\n")
+    
+    try:
+        patients = await rebuild("PATIENT", PatientProfile, batch_size)
+        doctors = await rebuild("DOCTOR", DoctorProfile, batch_size)
+    except Exception as e:
+        print(f"\n❌ Rebuild failed: {e}")
+        return 1
+    finally:
+        await engine.dispose()
+    
+    print(f"\n✅ Rebuilt {patients} patient and {doctors} doctor summaries")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(asyncio.run(main()))
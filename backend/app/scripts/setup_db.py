@@ -4,8 +4,8 @@ Database setup script for HealthSync.
 
 This script can be run independently to:
 1. Create the database if it doesn't exist
-2. Create all tables based on SQLAlchemy models
-3. Verify database connection
+2. Verify database connection
+3. Apply pending Alembic migrations
 
 Usage:
     python -m app.scripts.setup_db
@@ -33,8 +33,7 @@ async def main():
         print("\n✅ Database setup completed successfully!")
         print("\nYou can now:")
         print("  1. Start the FastAPI server: uvicorn main:app --reload")
-        print("  2. Run migrations (if using Alembic)")
-        print("  3. Seed the database with initial data")
+        print("  2. Seed the database: python -m app.scripts.add_dummy_data")
         return 0
     else:
         print("\n❌ Database setup failed!")
@@ -1,10 +1,14 @@
-from fastapi import FastAPI
+from fastapi import FastAPI, Request, status
+from fastapi.responses import ORJSONResponse
 from fastapi.middleware.cors import CORSMiddleware
 from contextlib import asynccontextmanager
 from app.core.config import settings
 from app.api.v1.api import api_router
-from app.db.session import engine
-from app.db.init_db import setup_database
+from app.db.session import engine, read_engine
+from app.db.init_db import SchemaVersionError, check_schema_version, init_db
+from app.db.query_stats import QueryStatsMiddleware
+from app.core.hashing import hashing_pool, HashingPoolBusy
+from app.core.security import calibrate_bcrypt_rounds, configure_bcrypt_rounds
 
 # Import this to register all models with SQLAlchemy before any DB operations
 import app.db.init_models  # noqa: F401
@@ -15,17 +19,34 @@ async def lifespan(app: FastAPI):
     # Startup
     print("Starting up HealthSync API...")
     
-    # Initialize database (create tables if they don't exist)
+    # Pick a bcrypt cost for this host unless one is pinned in settings
+    if settings.BCRYPT_ROUNDS is None and settings.BCRYPT_CALIBRATE_ON_STARTUP:
+        rounds = await hashing_pool.run(
+            calibrate_bcrypt_rounds, settings.BCRYPT_TARGET_MS, settings.BCRYPT_MIN_ROUNDS
+        )
+        configure_bcrypt_rounds(rounds)
+        print(f"Calibrated bcrypt cost: {rounds} rounds (target {settings.BCRYPT_TARGET_MS} ms)")
+    
+    # Check the schema revision (one query); migrations normally run out of band
     try:
-        await setup_database()
+        if settings.DB_MIGRATE_ON_STARTUP:
+            await init_db()
+        await check_schema_version()
+    except SchemaVersionError as e:
+        # Serving against the wrong schema fails at request time; refuse to start
+        print(f"Error: {e}")
+        raise
     except Exception as e:
-        print(f"Warning: Database initialization failed: {e}")
+        print(f"Warning: Database schema check failed: {e}")
         print("Application will continue, but database operations may fail.")
     
     yield
     # Shutdown
     print("Shutting down HealthSync API...")
+    hashing_pool.shutdown()
     await engine.dispose()
+    if read_engine is not engine:
+        await read_engine.dispose()
 
 
 app = FastAPI(
@@ -33,6 +54,7 @@ app = FastAPI(
     description="Healthcare Management System API",
     version="1.0.0",
     lifespan=lifespan,
+    default_response_class=ORJSONResponse,
 )
 
 # CORS middleware
@@ -44,6 +66,18 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+# Per-request SQL statement counts (headers in DEBUG, aggregates in /internal/metrics)
+app.add_middleware(QueryStatsMiddleware)
+
+@app.exception_handler(HashingPoolBusy)
+async def hashing_pool_busy_handler(request: Request, exc: HashingPoolBusy):
+    return ORJSONResponse(
+        status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+        content={"detail": "Server is busy, please retry shortly"},
+        headers={"Retry-After": "1"},
+    )
+
+
 # Include API router
 app.include_router(api_router, prefix="/api/v1")
 
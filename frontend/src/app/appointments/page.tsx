@@ -9,6 +9,7 @@ import { Avatar, AvatarFallback } from "~/components/ui/avatar";
 import { Skeleton } from "~/components/ui/skeleton";
 import { Calendar, Clock, User, Plus } from "lucide-react";
 import useSWR from "swr";
+import useSWRInfinite from "swr/infinite";
 import { format } from "date-fns";
 import { useState } from "react";
 import { BookAppointmentForm } from "~/components/BookAppointmentForm";
@@ -24,7 +25,26 @@ export default function AppointmentsPage() {
   const { user, loading } = useAuth();
   const router = useRouter();
   const [isFormOpen, setIsFormOpen] = useState(false);
-  const { data, error, isLoading } = useSWR('/me/dashboard', fetcher);
+  const { data, error, isLoading } = useSWR('/me/dashboard?sections=upcomingAppointments', fetcher);
+
+  // Full history, latest first, one page at a time
+  const {
+    data: pages,
+    error: historyError,
+    size,
+    setSize,
+    isValidating: isLoadingMore,
+  } = useSWRInfinite(
+    (pageIndex: number, previousPage: any) => {
+      if (previousPage && !previousPage.nextCursor) return null;
+      const params = new URLSearchParams({ order: "desc", limit: "50" });
+      if (pageIndex > 0) params.set("cursor", previousPage.nextCursor);
+      return `/appointments?${params.toString()}`;
+    },
+    fetcher
+  );
+  const allAppointments = pages?.flatMap((page: any) => page.items ?? []) ?? [];
+  const hasMore = Boolean(pages?.[pages.length - 1]?.nextCursor);
 
   if (loading) {
     return (
@@ -78,7 +98,7 @@ export default function AppointmentsPage() {
               <Skeleton key={i} className="h-32 w-full" />
             ))}
           </div>
-        ) : error ? (
+        ) : error || historyError ? (
           <Card>
             <CardContent className="p-6">
               <p className="text-muted-foreground">Failed to load appointments</p>
@@ -147,9 +167,9 @@ export default function AppointmentsPage() {
                 </CardTitle>
               </CardHeader>
               <CardContent>
-                {data?.allAppointments?.length > 0 ? (
+                {allAppointments.length > 0 ? (
                   <div className="space-y-4">
-                    {data.allAppointments.map((appointment: any) => {
+                    {allAppointments.map((appointment: any) => {
                       // For patients: appointment has doctor, for doctors: appointment has patient
                       const otherPerson = userType === "patient" ? appointment.doctor : appointment.patient;
                       const personName = otherPerson?.user?.name || "Unknown";
@@ -183,6 +203,13 @@ export default function AppointmentsPage() {
                         </div>
                       );
                     })}
+                    {hasMore && (
+                      <div className="flex justify-center">
+                        <Button variant="outline" disabled={isLoadingMore} onClick={() => setSize(size + 1)}>
+                          {isLoadingMore ? "Loading..." : "Load older appointments"}
+                        </Button>
+                      </div>
+                    )}
                   </div>
                 ) : (
                   <p className="text-muted-foreground text-center py-8">No appointments found</p>
@@ -1,7 +1,7 @@
 "use client";
 
 import { useRouter } from "next/navigation";
-import useSWR from "swr";
+import useSWRInfinite from "swr/infinite";
 import { Header } from "~/components/Header";
 import { Card, CardContent, CardHeader, CardTitle } from "~/components/ui/card";
 import { Badge } from "~/components/ui/badge";
@@ -11,7 +11,7 @@ import { User, Calendar as CalendarIcon, Clock, MapPin } from "lucide-react";
 import { useAuth } from "~/lib/AuthContext";
 import { API_URL, getAuthHeader } from "~/lib/auth";
 import { format, parseISO, startOfDay, isSameDay, addDays } from "date-fns";
-import { useState } from "react";
+import { useEffect, useState } from "react";
 import { Button } from "~/components/ui/button";
 import Link from "next/link";
 
@@ -25,11 +25,26 @@ export default function CalendarPage() {
   const router = useRouter();
   const [selectedDate, setSelectedDate] = useState(new Date());
 
-  // Fetch dashboard data which includes appointments
-  const { data, error, isLoading } = useSWR(
-    user?.role === "DOCTOR" ? "/me/dashboard" : null,
+  // Fetch only the appointments in the visible week, following each page's cursor
+  const [rangeStart] = useState(() => startOfDay(new Date()));
+  const { data, error, isLoading, size, setSize } = useSWRInfinite(
+    (pageIndex: number, previousPage: any) => {
+      if (user?.role !== "DOCTOR") return null;
+      if (previousPage && !previousPage.nextCursor) return null;
+      const params = new URLSearchParams({
+        from: rangeStart.toISOString(),
+        to: addDays(rangeStart, 7).toISOString(),
+        limit: "200",
+      });
+      if (pageIndex > 0) params.set("cursor", previousPage.nextCursor);
+      return `/appointments?${params.toString()}`;
+    },
     fetcher
   );
+  const nextCursor = data?.[data.length - 1]?.nextCursor;
+  useEffect(() => {
+    if (nextCursor && data?.length === size) setSize(size + 1);
+  }, [nextCursor, data?.length, size, setSize]);
 
   if (loading) {
     return (
@@ -61,8 +76,7 @@ export default function CalendarPage() {
   const userName = user.name ?? "User";
   const userType = "doctor";
 
-  // Get all appointments from dashboard data
-  const allAppointments = data?.allAppointments || [];
+  const allAppointments = data?.flatMap((page: any) => page.items ?? []) ?? [];
   
   // Group appointments by date
   const appointmentsByDate: Record<string, any[]> = {};
@@ -1,10 +1,11 @@
 "use client";
 
 import { useRouter } from "next/navigation";
-import useSWR from "swr";
+import useSWRInfinite from "swr/infinite";
 import { Header } from "~/components/Header";
 import { Card, CardContent, CardHeader, CardTitle } from "~/components/ui/card";
 import { Input } from "~/components/ui/input";
+import { Button } from "~/components/ui/button";
 import { Badge } from "~/components/ui/badge";
 import { Avatar, AvatarFallback } from "~/components/ui/avatar";
 import { Skeleton } from "~/components/ui/skeleton";
@@ -24,9 +25,17 @@ export default function PatientsPage() {
   const router = useRouter();
   const [searchQuery, setSearchQuery] = useState("");
   
-  // Fetch dashboard data which includes patients
-  const { data, error, isLoading } = useSWR(
-    user?.role === "DOCTOR" ? "/me/dashboard" : null,
+  // Fetch the roster a page at a time; each page carries the cursor for the next
+  const { data, error, isLoading, size, setSize } = useSWRInfinite(
+    (pageIndex: number, previousPage: any) => {
+      if (user?.role !== "DOCTOR") return null;
+      if (previousPage && !previousPage.nextCursor) return null;
+      const params = new URLSearchParams();
+      if (searchQuery) params.set("search", searchQuery);
+      if (pageIndex > 0) params.set("cursor", previousPage.nextCursor);
+      const query = params.toString();
+      return `/me/patients${query ? `?${query}` : ""}`;
+    },
     fetcher
   );
 
@@ -60,17 +69,9 @@ export default function PatientsPage() {
   const userName = user.name ?? "User";
   const userType = "doctor";
 
-  // Get patients from dashboard data
-  const patients = data?.patients || [];
-  
-  // Also get all appointments to find last visit and upcoming appointments
-  const allAppointments = data?.allAppointments || [];
-
-  const filteredPatients = patients.filter(
-    (patient: any) =>
-      patient.user.name.toLowerCase().includes(searchQuery.toLowerCase()) ||
-      patient.user.email.toLowerCase().includes(searchQuery.toLowerCase())
-  );
+  // Search is applied by the API; last visit and next appointment come with each patient
+  const filteredPatients = data ? data.flatMap((page: any) => page.items || []) : [];
+  const hasMore = Boolean(data?.[data.length - 1]?.nextCursor);
 
   return (
     <div className="min-h-screen bg-background">
@@ -104,31 +105,8 @@ export default function PatientsPage() {
             ))
           ) : filteredPatients.length > 0 ? (
             filteredPatients.map((patient: any) => {
-              // Find appointments for this patient
-              const patientAppointments = allAppointments.filter(
-                (appt: any) => appt.patient && appt.patient.id === patient.id
-              );
-              
-              // Find last completed appointment
-              const now = new Date();
-              const pastAppointments = patientAppointments.filter(
-                (appt: any) => new Date(appt.appointmentDate) < now
-              );
-              const lastVisit = pastAppointments.length > 0 
-                ? pastAppointments.sort((a: any, b: any) => 
-                    new Date(b.appointmentDate).getTime() - new Date(a.appointmentDate).getTime()
-                  )[0]
-                : null;
-              
-              // Find next upcoming appointment
-              const futureAppointments = patientAppointments.filter(
-                (appt: any) => new Date(appt.appointmentDate) >= now
-              );
-              const upcomingAppointment = futureAppointments.length > 0
-                ? futureAppointments.sort((a: any, b: any) =>
-                    new Date(a.appointmentDate).getTime() - new Date(b.appointmentDate).getTime()
-                  )[0]
-                : null;
+              const lastVisit = patient.lastVisit;
+              const upcomingAppointment = patient.nextAppointment;
               
               return (
                 <Card key={patient.id} className="hover:shadow-md transition-shadow cursor-pointer">
@@ -147,12 +125,12 @@ export default function PatientsPage() {
                             {lastVisit && (
                               <div className="flex items-center text-sm text-muted-foreground">
                                 <Calendar className="h-4 w-4 mr-1" />
-                                Last visit: {format(new Date(lastVisit.appointmentDate), "MMM d, yyyy")}
+                                Last visit: {format(new Date(lastVisit), "MMM d, yyyy")}
                               </div>
                             )}
                             {upcomingAppointment && (
                               <Badge variant="secondary">
-                                Next: {format(new Date(upcomingAppointment.appointmentDate), "MMM d, yyyy")}
+                                Next: {format(new Date(upcomingAppointment), "MMM d, yyyy")}
                               </Badge>
                             )}
                           </div>
@@ -175,6 +153,13 @@ export default function PatientsPage() {
               </CardContent>
             </Card>
           )}
+          {hasMore && (
+            <div className="flex justify-center">
+              <Button variant="outline" onClick={() => setSize(size + 1)}>
+                Load more patients
+              </Button>
+            </div>
+          )}
         </div>
       </main>
     </div>
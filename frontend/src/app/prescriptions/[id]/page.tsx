@@ -40,11 +40,16 @@ export default function PrescriptionPage() {
   const { toast } = useToast();
   const appointmentId = params.id as string;
 
-  // Fetch all appointments to find this one
-  const { data, error, isLoading } = useSWR(
-    user?.role === "DOCTOR" ? "/me/dashboard" : null,
+  // Fetch this appointment, and upcoming ones for the follow-up list
+  const { data: appointmentData, isLoading: isLoadingAppointment } = useSWR(
+    user?.role === "DOCTOR" && appointmentId ? `/appointments/${appointmentId}` : null,
     fetcher
   );
+  const { data, isLoading: isLoadingDashboard } = useSWR(
+    user?.role === "DOCTOR" ? "/me/dashboard?sections=upcomingAppointments" : null,
+    fetcher
+  );
+  const isLoading = isLoadingAppointment || isLoadingDashboard;
 
   // Fetch existing prescriptions for this appointment
   const { data: prescriptions, mutate: mutatePrescriptions } = useSWR(
@@ -77,8 +82,8 @@ export default function PrescriptionPage() {
   // Get user info and appointment data
   const userName = user?.name ?? "User";
   const userType = "doctor";
-  const allAppointments = data?.allAppointments || [];
-  const appointment = allAppointments.find((appt: any) => appt.id === appointmentId);
+  // A 404 comes back as { detail }, not an appointment
+  const appointment = appointmentData?.id ? appointmentData : undefined;
 
   // Handler functions
   const handleSubmit = async (e: React.FormEvent) => {
@@ -18,7 +18,10 @@ const fetcher = (url: string) =>
 export default function RecordsPage() {
   const { user, loading } = useAuth();
   const router = useRouter();
-  const { data, error, isLoading } = useSWR('/me/dashboard', fetcher);
+  const { data, error, isLoading } = useSWR(
+    user && user.role !== "DOCTOR" ? '/me/dashboard?sections=activePrescriptions' : null,
+    fetcher
+  );
 
   if (loading) {
     return (
@@ -80,7 +80,8 @@ export function BookAppointmentForm({ onFormSubmit }: BookAppointmentFormProps)
       });
 
       if (response.ok) {
-        mutate("/me/dashboard");
+        // Revalidate every dashboard view, whichever sections it requested
+        mutate((key) => typeof key === "string" && key.startsWith("/me/dashboard"));
         onFormSubmit();
       } else {
         // Handle error, e.g., show a toast notification
@@ -21,7 +21,7 @@ interface DoctorDashboardProps {
 }
 
 export const DoctorDashboard = ({ userName = "Doctor" }: DoctorDashboardProps) => {
-  const { data, error, isLoading } = useSWR('/me/dashboard', fetcher);
+  const { data, error, isLoading } = useSWR('/me/dashboard?sections=todaySchedule,stats', fetcher);
 
   if (isLoading) {
     return (
@@ -28,7 +28,10 @@ interface NotificationPanelProps {
 
 export const NotificationPanel = ({ userType }: NotificationPanelProps) => {
   const [open, setOpen] = useState(false);
-  const { data, error, isLoading } = useSWR("/me/dashboard", fetcher);
+  const { data, error, isLoading } = useSWR(
+    `/me/dashboard?sections=${userType === "patient" ? "upcomingAppointments" : "todaySchedule"}`,
+    fetcher
+  );
 
   const upcomingAppointments = data?.upcomingAppointments || [];
   const todaySchedule = data?.todaySchedule || [];
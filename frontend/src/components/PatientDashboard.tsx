@@ -23,7 +23,7 @@ interface PatientDashboardProps {
 }
 
 export const PatientDashboard = ({ userName = "User" }: PatientDashboardProps) => {
-  const { data, error, isLoading } = useSWR('/me/dashboard', fetcher);
+  const { data, error, isLoading } = useSWR('/me/dashboard?sections=upcomingAppointments,recentVisits,activePrescriptions', fetcher);
   const [isFormOpen, setIsFormOpen] = useState(false);
 
   if (isLoading) {